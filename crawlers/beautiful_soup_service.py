@@ -1,123 +1,149 @@
-from typing import List
+from typing import List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
 
-from bs4 import BeautifulSoup, element
+from bs4 import BeautifulSoup, SoupStrainer, element
 
-from constants import BUZZ_THREAD_THRESHOLD
+from constants import BUZZ_THREAD_THRESHOLD, REDDIT_LISTING_ID
+from models import RedditThread
+
+LISTING_STRAINER = SoupStrainer(id=REDDIT_LISTING_ID)
 
 
 class BeautifulSoupService:
-    def __init__(self, page: str) -> None:
+    def __init__(self, page: str, parser: str = "html.parser") -> None:
         """Initializes the Beautifulsoup service.
 
+        Only the threads listing (the `sitetable linklisting` div) of the page is parsed.
+
         Args:
             page (str): The html page.
+            parser (str, optional): The BeautifulSoup tree builder ("html.parser" or "lxml").
+            Defaults to "html.parser".
         """
-        self.soup = BeautifulSoup(page, "html.parser")
+        self.soup = BeautifulSoup(page, parser, parse_only=LISTING_STRAINER)
 
     def _get_reddit_threads(self) -> List[element.Tag]:
         """Get the list of threads in reddit page.
 
         Returns:
-            List[element.Tag]: The list of threads in a reddit page.
+            List[element.Tag]: The list of threads in a reddit page (empty when the page has no
+            listing, eg. the over 18 gate or a banned subreddit).
         """
         site_table = self.soup.find(class_="sitetable linklisting")
+        if site_table is None:
+            return []
         return site_table.findAll("div", {"class": "thing"})
 
-    def _get_reddit_thread_title(self, reddit_thread: element.Tag) -> str:
-        """Get the title of a reddit thread.
-
-        Args:
-            reddit_thread (element.Tag): The reddit thread Tag.
+    def get_next_page_cursor(self) -> Optional[str]:
+        """Get the cursor (`after` parameter) of the next listing page.
 
         Returns:
-            str: The title of the thread.
+            Optional[str]: The fullname of the last thread of the page or None if it is the last page.
         """
-        title = reddit_thread.find_all("a", {"class": "title"})
-        return title[0].contents[0]
+        next_button = self.soup.find("span", {"class": "next-button"})
+        next_link = next_button.find("a") if next_button else None
+        if next_link is None:
+            return None
+        return parse_qs(urlparse(next_link.get("href", "")).query).get("after", [None])[
+            0
+        ]
 
     def _get_reddit_thread_score(self, reddit_thread: element.Tag) -> int:
         """Get the score of a reddit thread.
 
+        The `data-score` attribute of the thread is used; the score div is only searched when
+        the attribute is missing.
+
         Args:
             reddit_thread (element.Tag): The reddit thread Tag.
 
         Returns:
             int: The score of the thread or None if not score found.
         """
-        score = reddit_thread.find_all("div", {"class": "score unvoted"})
-        if "•" in score[0]:
-            return 0
+        score = reddit_thread.get("data-score")
+        if score is None:
+            score_div = reddit_thread.find("div", {"class": "score unvoted"})
+            if score_div is None or "•" in score_div:
+                return 0
+            score = score_div.get("title")
         try:
-            return int(score[0].get("title"))
+            return int(score)
         except (ValueError, TypeError):
-            import pdb
-
-            pdb.set_trace()
             print(
-                f"Impossible to find score for thread {self._get_reddit_thread_title(reddit_thread)}"
+                f"Impossible to find score for thread {reddit_thread.get('data-permalink')}"
             )
             return None
 
-    def _get_reddit_thread_link(self, reddit_thread: element.Tag) -> str:
-        """Get the link (permalink) of a reddit thread.
+    def _get_reddit_thread_rank_and_title(
+        self, reddit_thread: element.Tag
+    ) -> Tuple[str, str]:
+        """Get the rank and the title of a reddit thread, in a single traversal of the thread.
 
         Args:
             reddit_thread (element.Tag): The reddit thread Tag.
 
         Returns:
-            str: The link (permalink) of the thread.
+            Tuple[str, str]: The rank and the title of the thread.
         """
-        return reddit_thread.get("data-permalink")
-
-    def _get_reddit_thread_rank(self, reddit_thread: element.Tag) -> str:
-        """Get the rank of a reddit thread
+        rank = title = None
+        for node in reddit_thread.descendants:
+            if not isinstance(node, element.Tag):
+                continue
+            if rank is None and node.name == "span" and "rank" in node.get("class", ()):
+                rank = str(node.contents[0]) if node.contents else ""
+            elif (
+                title is None and node.name == "a" and "title" in node.get("class", ())
+            ):
+                title = str(node.contents[0]) if node.contents else ""
+            if rank is not None and title is not None:
+                break
+        return rank, title
+
+    def _extract_reddit_thread(
+        self, reddit_thread: element.Tag, threshold: int
+    ) -> Optional[RedditThread]:
+        """Extract a reddit thread, if it is a buzz thread.
+
+        The score is read first, so the threads below the threshold are rejected before any
+        other field is searched.
 
         Args:
             reddit_thread (element.Tag): The reddit thread Tag.
+            threshold (int): The minimum score of a buzz thread.
 
         Returns:
-            str: The rank of the thread.
+            Optional[RedditThread]: The thread or None if it is not a buzz thread.
         """
-        rank = reddit_thread.find_all("span", {"class": "rank"})
-        return rank[0].contents[0]
-
-    def _get_reddit_thread_subreddit(self, reddit_thread: element.Tag) -> str:
-        """Get the subreddit of a reddit thread.
+        reddit_thread_score = self._get_reddit_thread_score(reddit_thread)
+        if not reddit_thread_score or reddit_thread_score < threshold:
+            return None
+        reddit_thread_rank, reddit_thread_title = (
+            self._get_reddit_thread_rank_and_title(reddit_thread)
+        )
+        reddit_thread_link = reddit_thread.get("data-permalink")
+        return RedditThread(
+            rank=reddit_thread_rank,
+            score=reddit_thread_score,
+            subreddit=reddit_thread.get("data-subreddit"),
+            title=reddit_thread_title,
+            comments_link=reddit_thread_link,
+            thread_link=reddit_thread_link,
+        )
+
+    def get_reddit_buzz_threads(
+        self, threshold: int = BUZZ_THREAD_THRESHOLD
+    ) -> List[RedditThread]:
+        """Get the list of buzz threads (score greater than threshold - default is 5000).
 
         Args:
-            reddit_thread (element.Tag): The reddit thread Tag.
-
-        Returns:
-            str: The subreddit of the thread.
-        """
-        return reddit_thread.get("data-subreddit")
-
-    def get_reddit_buzz_threads(self) -> List[dict]:
-        """Get the list of buzz threads (score greater than threshold - default is 5000).
+            threshold (int, optional): The minimum score of a buzz thread. Defaults to BUZZ_THREAD_THRESHOLD.
 
         Returns:
-            List[dict]: A list with all threads that satisfies the requirement of a buzz thread.
+            List[RedditThread]: A list with all threads that satisfies the requirement of a buzz thread.
         """
         reddit_buzz_threads_list = []
-        reddit_threads = self._get_reddit_threads()
-        for reddit_thread in reddit_threads:
-            reddit_thread_score = self._get_reddit_thread_score(reddit_thread)
-            if reddit_thread_score and reddit_thread_score >= BUZZ_THREAD_THRESHOLD:
-                reddit_thread_title = self._get_reddit_thread_title(reddit_thread)
-                reddit_link_to_thread = (
-                    reddit_link_to_comments
-                ) = self._get_reddit_thread_link(reddit_thread)
-                reddit_thread_subreddit = self._get_reddit_thread_subreddit(
-                    reddit_thread
-                )
-                reddit_thread_rank = self._get_reddit_thread_rank(reddit_thread)
-                reddit_buzz_thread = {
-                    "rank": reddit_thread_rank,
-                    "score": reddit_thread_score,
-                    "subreddit": reddit_thread_subreddit,
-                    "title": reddit_thread_title,
-                    "comments_link": reddit_link_to_comments,
-                    "thread_link": reddit_link_to_thread,
-                }
+        for reddit_thread in self._get_reddit_threads():
+            reddit_buzz_thread = self._extract_reddit_thread(reddit_thread, threshold)
+            if reddit_buzz_thread is not None:
                 reddit_buzz_threads_list.append(reddit_buzz_thread)
         return reddit_buzz_threads_list
@@ -1,5 +1,38 @@
 START_WAITING_TIME = 30
+MAXIMUM_WAITING_TIME = 300
 MAXIMUM_TRIES = 5
+DEFAULT_CONCURRENCY = 8
+HTTP_POOL_SIZE = 32
+REQUESTS_PER_SECOND_PER_HOST = 1
+REQUESTS_BURST_PER_HOST = 10
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+REQUEST_TIMEOUT = 30
+STREAMING_CHUNK_SIZE = 16 * 1024
+RESPONSE_CACHE_TTL = 60
+RESPONSE_CACHE_MAXIMUM_AGE = 24 * 60 * 60
+RESPONSE_CACHE_SIZE = 512
+PARSED_THREADS_CACHE_SIZE = 512
 REDDIT_BASE_ADDRESS = "https://old.reddit.com"
 BUZZ_THREAD_THRESHOLD = 5000
+REDDIT_LISTING_ID = "siteTable"
+PARSER_BACKENDS = ("selectolax", "lxml", "html.parser")
+DEFAULT_PARSER_BACKEND = "auto"
+REDDIT_SORTS = ("hot", "new", "rising", "top", "controversial")
+SCORE_SORTED_LISTINGS = ("top",)
+DEFAULT_SORT = "hot"
+THREADS_PER_PAGE = 25
+DEFAULT_MAXIMUM_PAGES = 4
+DEFAULT_MULTIREDDIT_SIZE = 10
+LISTING_BACKENDS = ("json", "html")
+DEFAULT_LISTING_BACKEND = "json"
+OUTPUT_FORMATS = ("text", "jsonl", "csv", "sqlite")
+OUTPUT_BUFFER_SIZE = 1024 * 1024
+THREAD_INDEX_FILENAME = "threads_index.db"
+DAEMON_INTERVAL = 5 * 60
+DAEMON_STATE_FILENAME = "crawler_state.db"
+DAEMON_RESULTS_MAXIMUM_AGE = 2 * DAEMON_INTERVAL
+DAEMON_STATE_MAXIMUM_AGE = 7 * 24 * 60 * 60
 TELEGRAM_API_KEY = "INSERT-YOUR-KEY-HERE"
+TELEGRAM_WORKERS = 8
+TELEGRAM_MESSAGE_MAXIMUM_LENGTH = 4096
+TELEGRAM_THREAD_INDEX_FILENAME = None
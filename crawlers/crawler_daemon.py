@@ -0,0 +1,260 @@
+import argparse
+from collections import defaultdict
+from contextlib import nullcontext
+from datetime import datetime
+from time import monotonic, sleep, time
+from typing import List, Optional
+
+from constants import (
+    DAEMON_INTERVAL,
+    DAEMON_STATE_FILENAME,
+    DAEMON_STATE_MAXIMUM_AGE,
+    DEFAULT_CONCURRENCY,
+    DEFAULT_LISTING_BACKEND,
+    DEFAULT_MAXIMUM_PAGES,
+    DEFAULT_MULTIREDDIT_SIZE,
+    DEFAULT_PARSER_BACKEND,
+    DEFAULT_SORT,
+    LISTING_BACKENDS,
+    OUTPUT_FORMATS,
+    PARSER_BACKENDS,
+    REDDIT_SORTS,
+    THREAD_INDEX_FILENAME,
+)
+from models import CrawlerOptions, RedditThread
+from output_sinks import OutputSink, create_output_sink
+from repositories import utils_repository
+from scrapper import iter_crawler_reddit_pages
+from thread_index import thread_index
+from thread_state_store import ThreadStateStore
+
+
+class CrawlerDaemon:
+    def __init__(
+        self,
+        subreddits: str,
+        state_store: ThreadStateStore,
+        interval: float = DAEMON_INTERVAL,
+        options: CrawlerOptions = CrawlerOptions(),
+        state_maximum_age: float = DAEMON_STATE_MAXIMUM_AGE,
+    ) -> None:
+        """Initializes the crawler daemon, that crawls a set of subreddits on a schedule.
+
+        Args:
+            subreddits (str): The subreddits to crawl, separated by ';'.
+            state_store (ThreadStateStore): The store with the last seen state of the threads.
+            interval (float, optional): Seconds between the start of two crawls. Defaults to DAEMON_INTERVAL.
+            options (CrawlerOptions, optional): The crawler options (the concurrency bounds the
+            subreddits crawled at the same time). Defaults to CrawlerOptions().
+            state_maximum_age (float, optional): Seconds a thread not seen again is kept in the
+            state store. Defaults to DAEMON_STATE_MAXIMUM_AGE.
+        """
+        self.list_of_subreddits = utils_repository.split_string(
+            utils_repository.normalize_subreddits(subreddits)
+        )
+        self.state_store = state_store
+        self.interval = interval
+        self.options = options
+        self.state_maximum_age = state_maximum_age
+
+    def crawl_once(self) -> List[RedditThread]:
+        """Crawl all subreddits once and save their buzz threads in the state store.
+
+        Subreddits that could not be fetched keep their previous state, and the threads not
+        seen for longer than the state maximum age are pruned from the store.
+
+        Returns:
+            List[RedditThread]: The buzz threads that are new or changed since the last crawl.
+        """
+        crawled_at = time()
+        subreddits_buzz_threads = defaultdict(list)
+        for subreddit_position, page_threads in iter_crawler_reddit_pages(
+            ";".join(self.list_of_subreddits), self.options
+        ):
+            subreddits_buzz_threads[subreddit_position].extend(page_threads)
+        changed_threads = []
+        for subreddit_position in sorted(subreddits_buzz_threads):
+            changed_threads.extend(
+                self.state_store.update_subreddit(
+                    self.list_of_subreddits[subreddit_position],
+                    subreddits_buzz_threads[subreddit_position],
+                    crawled_at,
+                )
+            )
+        self.state_store.prune(self.state_maximum_age, crawled_at)
+        return changed_threads
+
+    def run_forever(self, output_sink: Optional[OutputSink] = None) -> None:
+        """Crawl the subreddits every interval, showing (and saving) the new or changed buzz threads.
+
+        A crawl that fails (eg. a request, parsing or database error) is logged and tried again
+        in the next cycle, so a single bad cycle does not stop the daemon.
+
+        Args:
+            output_sink (Optional[OutputSink], optional): The sink to save the new or changed
+            threads. Defaults to None.
+        """
+        while True:
+            cycle_start = monotonic()
+            try:
+                changed_threads = self.crawl_once()
+            except Exception as error:
+                print(f"{datetime.now()} - Crawl failed. Details: {error!r}.")
+            else:
+                print(
+                    f"{datetime.now()} - {len(changed_threads)} new or changed buzz threads."
+                )
+                if changed_threads:
+                    utils_repository.cli_show_results(changed_threads, output_sink)
+                    if output_sink is not None:
+                        output_sink.flush()
+            sleep(max(0.0, self.interval - (monotonic() - cycle_start)))
+
+
+def main(
+    subreddits: str,
+    interval: float = DAEMON_INTERVAL,
+    state_filename: str = DAEMON_STATE_FILENAME,
+    filename: str = None,
+    output_format: str = "text",
+    options: CrawlerOptions = CrawlerOptions(),
+    index_filename: str = None,
+) -> None:
+    """Run the crawler daemon until it is interrupted.
+
+    Args:
+        subreddits (str): List of subreddits to crawl, separeted by ';'.
+        interval (float, optional): Seconds between the start of two crawls. Defaults to DAEMON_INTERVAL.
+        state_filename (str, optional): SQLite file with the threads state. Defaults to DAEMON_STATE_FILENAME.
+        filename (str, optional): The filename to save the new or changed threads. Defaults to None.
+        output_format (str, optional): The format of the output file. Defaults to "text".
+        options (CrawlerOptions, optional): The crawler options. Defaults to CrawlerOptions().
+        index_filename (str, optional): SQLite file where the crawled threads are indexed.
+        Defaults to None (no index).
+    """
+    if index_filename:
+        thread_index.open_database(index_filename)
+    state_store = ThreadStateStore(state_filename)
+    crawler_daemon = CrawlerDaemon(subreddits, state_store, interval, options)
+    try:
+        with (
+            create_output_sink(filename, output_format) if filename else nullcontext()
+        ) as output_sink:
+            crawler_daemon.run_forever(output_sink)
+    except KeyboardInterrupt:
+        print("Stopping the crawler daemon.")
+    finally:
+        state_store.close()
+        thread_index.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Idwall challenge - crawler daemon")
+    parser.add_argument(
+        "subreddits",
+        type=str,
+        help="A list with subreddits to crawler, separeted by ';' (eg. 'askreddit;worldnews;cats').",
+    )
+    parser.add_argument(
+        "-i",
+        "--interval",
+        type=float,
+        default=DAEMON_INTERVAL,
+        help="Seconds between the start of two crawls.",
+    )
+    parser.add_argument(
+        "-d",
+        "--state_file",
+        default=DAEMON_STATE_FILENAME,
+        help="SQLite file with the last seen state of the threads (read by the telegram bot).",
+    )
+    parser.add_argument(
+        "-f",
+        "--output_filename",
+        default=None,
+        help="The output filename to save the new or changed threads.",
+    )
+    parser.add_argument(
+        "-o",
+        "--output_format",
+        choices=OUTPUT_FORMATS,
+        default="text",
+        help="The format of the output file.",
+    )
+    parser.add_argument(
+        "-c",
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help="Maximum number of subreddits fetched at the same time.",
+    )
+    parser.add_argument(
+        "-p",
+        "--parser",
+        choices=("auto",) + PARSER_BACKENDS,
+        default=DEFAULT_PARSER_BACKEND,
+        help="The HTML parser backend (auto uses the fastest installed one).",
+    )
+    parser.add_argument(
+        "-n",
+        "--pages",
+        type=int,
+        default=DEFAULT_MAXIMUM_PAGES,
+        help="Maximum number of listing pages crawled in each subreddit.",
+    )
+    parser.add_argument(
+        "-s",
+        "--sort",
+        choices=REDDIT_SORTS,
+        default=DEFAULT_SORT,
+        help="The listing sort.",
+    )
+    parser.add_argument(
+        "-b",
+        "--backend",
+        choices=LISTING_BACKENDS,
+        default=DEFAULT_LISTING_BACKEND,
+        help="Fetch the JSON listings (falling back to HTML) or the HTML listings.",
+    )
+    parser.add_argument(
+        "-m",
+        "--multireddit_size",
+        type=int,
+        default=DEFAULT_MULTIREDDIT_SIZE,
+        help="Maximum number of subreddits fetched together as a multireddit ('a+b+c').",
+    )
+    parser.add_argument(
+        "-t",
+        "--stream",
+        action="store_true",
+        help="Parse the HTML listings while they are downloaded (requires lxml).",
+    )
+    parser.add_argument(
+        "-x",
+        "--index_file",
+        nargs="?",
+        const=THREAD_INDEX_FILENAME,
+        default=None,
+        help=f"Index the crawled threads in a SQLite file (default: {THREAD_INDEX_FILENAME}).",
+    )
+    args = parser.parse_args()
+    if args.concurrency < 1:
+        parser.error(f"Concurrency should be positive! Received {args.concurrency}.")
+
+    main(
+        args.subreddits,
+        args.interval,
+        args.state_file,
+        args.output_filename,
+        args.output_format,
+        CrawlerOptions(
+            args.concurrency,
+            args.parser,
+            args.pages,
+            args.sort,
+            args.backend,
+            args.multireddit_size,
+            args.stream,
+        ),
+        args.index_file,
+    )
@@ -0,0 +1,81 @@
+from typing import Optional, Union
+
+from beautiful_soup_service import BeautifulSoupService
+from constants import BUZZ_THREAD_THRESHOLD, DEFAULT_PARSER_BACKEND, PARSER_BACKENDS
+
+try:
+    from selectolax_service import SelectolaxService
+except ImportError:
+    SelectolaxService = None
+
+try:
+    import lxml
+except ImportError:
+    lxml = None
+
+try:
+    from streaming_html_service import StreamingHtmlService
+except ImportError:
+    StreamingHtmlService = None
+
+AVAILABLE_PARSER_BACKENDS = {
+    "selectolax": SelectolaxService is not None,
+    "lxml": lxml is not None,
+    "html.parser": True,
+}
+
+
+def get_parser_backend(parser_backend: str = DEFAULT_PARSER_BACKEND) -> str:
+    """Get the parser backend to be used, falling back to the next available one.
+
+    Args:
+        parser_backend (str, optional): The wanted backend ("auto" or one of PARSER_BACKENDS).
+        Defaults to DEFAULT_PARSER_BACKEND.
+
+    Returns:
+        str: The wanted backend, if installed, else the first installed one after it in
+        PARSER_BACKENDS (the fastest first).
+    """
+    first_backend = (
+        0 if parser_backend == "auto" else PARSER_BACKENDS.index(parser_backend)
+    )
+    for backend in PARSER_BACKENDS[first_backend:]:
+        if AVAILABLE_PARSER_BACKENDS[backend]:
+            return backend
+    return "html.parser"
+
+
+def create_html_service(
+    page: str, parser_backend: str = DEFAULT_PARSER_BACKEND
+) -> Union[BeautifulSoupService, "SelectolaxService"]:
+    """Create the service that extracts the buzz threads of a page.
+
+    Args:
+        page (str): The html page.
+        parser_backend (str, optional): The wanted backend ("auto" or one of PARSER_BACKENDS).
+        Defaults to DEFAULT_PARSER_BACKEND.
+
+    Returns:
+        Union[BeautifulSoupService, SelectolaxService]: The service of the available backend.
+    """
+    parser_backend = get_parser_backend(parser_backend)
+    if parser_backend == "selectolax":
+        return SelectolaxService(page)
+    return BeautifulSoupService(page, parser_backend)
+
+
+def create_streaming_html_service(
+    threshold: int = BUZZ_THREAD_THRESHOLD,
+) -> Optional["StreamingHtmlService"]:
+    """Create the service that extracts the buzz threads of a page while it is downloaded.
+
+    Args:
+        threshold (int, optional): The minimum score of the extracted threads.
+        Defaults to BUZZ_THREAD_THRESHOLD.
+
+    Returns:
+        Optional[StreamingHtmlService]: The streaming service or None if lxml is not installed.
+    """
+    if StreamingHtmlService is None:
+        return None
+    return StreamingHtmlService(threshold)
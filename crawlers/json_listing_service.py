@@ -0,0 +1,70 @@
+import json
+from typing import List, Optional
+
+from constants import BUZZ_THREAD_THRESHOLD
+from models import RedditThread
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class JsonListingService:
+    def __init__(self, page: str, first_rank: int = 1) -> None:
+        """Initializes the JSON listing service, that extracts the threads of a `/.json` listing
+        without building any HTML tree.
+
+        Args:
+            page (str): The JSON listing.
+            first_rank (int, optional): The rank of the first thread of the page (the JSON has no
+            rank, so it is numbered like the HTML listing). Defaults to 1.
+
+        Raises:
+            ValueError: If the page is not a JSON listing.
+        """
+        listing = orjson.loads(page) if orjson is not None else json.loads(page)
+        try:
+            self.listing_data = listing["data"]
+            self.reddit_threads = self.listing_data["children"]
+        except (KeyError, TypeError):
+            raise ValueError("The page is not a reddit JSON listing.")
+        self.first_rank = first_rank
+
+    def get_next_page_cursor(self) -> Optional[str]:
+        """Get the cursor (`after` parameter) of the next listing page.
+
+        Returns:
+            Optional[str]: The fullname of the last thread of the page or None if it is the last page.
+        """
+        return self.listing_data.get("after")
+
+    def get_reddit_buzz_threads(
+        self, threshold: int = BUZZ_THREAD_THRESHOLD
+    ) -> List[RedditThread]:
+        """Get the list of buzz threads (score greater than threshold - default is 5000).
+
+        Args:
+            threshold (int, optional): The minimum score of a buzz thread. Defaults to BUZZ_THREAD_THRESHOLD.
+
+        Returns:
+            List[RedditThread]: A list with all threads that satisfies the requirement of a buzz thread.
+        """
+        reddit_buzz_threads_list = []
+        for thread_position, reddit_thread in enumerate(self.reddit_threads):
+            thread_data = reddit_thread.get("data", {})
+            reddit_thread_score = thread_data.get("score")
+            if not reddit_thread_score or reddit_thread_score < threshold:
+                continue
+            reddit_thread_link = thread_data.get("permalink")
+            reddit_buzz_threads_list.append(
+                RedditThread(
+                    rank=str(self.first_rank + thread_position),
+                    score=reddit_thread_score,
+                    subreddit=thread_data.get("subreddit"),
+                    title=thread_data.get("title"),
+                    comments_link=reddit_thread_link,
+                    thread_link=reddit_thread_link,
+                )
+            )
+        return reddit_buzz_threads_list
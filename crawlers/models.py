@@ -0,0 +1,44 @@
+from typing import Any, NamedTuple, Optional, Tuple
+
+from constants import (
+    DEFAULT_CONCURRENCY,
+    DEFAULT_LISTING_BACKEND,
+    DEFAULT_MAXIMUM_PAGES,
+    DEFAULT_MULTIREDDIT_SIZE,
+    DEFAULT_PARSER_BACKEND,
+    DEFAULT_SORT,
+)
+
+
+class RedditThread(NamedTuple):
+    rank: str
+    score: int
+    subreddit: str
+    title: str
+    comments_link: str
+    thread_link: str
+
+
+class ParsedPage(NamedTuple):
+    threads: Tuple[RedditThread, ...]
+    next_page_cursor: Optional[str]
+
+
+class FetchedPage(NamedTuple):
+    request_address: str
+    response: str
+    listing_backend: str = "html"
+    after: Optional[str] = None
+    count: int = 0
+    listing_service: Optional[Any] = None
+
+
+class CrawlerOptions(NamedTuple):
+    concurrency: int = DEFAULT_CONCURRENCY
+    parser_backend: str = DEFAULT_PARSER_BACKEND
+    maximum_pages: int = DEFAULT_MAXIMUM_PAGES
+    sort: str = DEFAULT_SORT
+    listing_backend: str = DEFAULT_LISTING_BACKEND
+    multireddit_size: int = DEFAULT_MULTIREDDIT_SIZE
+    stream_html: bool = False
+    limit: Optional[int] = None
@@ -0,0 +1,184 @@
+import csv
+import json
+import sqlite3
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import List, Optional
+
+from constants import OUTPUT_BUFFER_SIZE, OUTPUT_FORMATS
+from models import RedditThread
+from repositories import utils_repository
+
+
+class OutputSink(ABC):
+    def __init__(self, filename: str) -> None:
+        """Initializes an output sink, that keeps a single handle to the output file during a run.
+
+        Sinks are context managers: the output is flushed and closed on exit.
+
+        Args:
+            filename (str): The output filename.
+        """
+        self.filename = filename
+
+    @abstractmethod
+    def write(self, buzz_thread_list: List[RedditThread]) -> None:
+        """Write a batch of threads.
+
+        Args:
+            buzz_thread_list (List[RedditThread]): The threads.
+        """
+
+    @abstractmethod
+    def flush(self) -> None:
+        """Flush the written threads to the output."""
+
+    @abstractmethod
+    def close(self) -> None:
+        """Flush and close the output."""
+
+    def __enter__(self) -> "OutputSink":
+        return self
+
+    def __exit__(self, *exception_info) -> None:
+        self.close()
+
+
+class TextOutputSink(OutputSink):
+    def __init__(self, filename: str, newline: Optional[str] = None) -> None:
+        """Initializes the text sink, appending the threads in the same format shown in the CLI.
+
+        Args:
+            filename (str): The output filename.
+            newline (Optional[str], optional): The newline mode of the output file. Defaults to
+            None (universal newlines).
+        """
+        super().__init__(filename)
+        self.output_file = open(
+            filename, "a", buffering=OUTPUT_BUFFER_SIZE, newline=newline
+        )
+
+    def write(self, buzz_thread_list: List[RedditThread]) -> None:
+        """Write a batch of threads, with a single write call.
+
+        Args:
+            buzz_thread_list (List[RedditThread]): The threads.
+        """
+        self.output_file.write(
+            "".join(
+                f"{'-'*70}\n{utils_repository.format_thread_text(reddit_thread)}\n"
+                for reddit_thread in buzz_thread_list
+            )
+        )
+
+    def flush(self) -> None:
+        """Flush the written threads to the output file."""
+        self.output_file.flush()
+
+    def close(self) -> None:
+        """Flush and close the output file."""
+        self.output_file.close()
+
+
+class JsonLinesOutputSink(TextOutputSink):
+    def write(self, buzz_thread_list: List[RedditThread]) -> None:
+        """Write a batch of threads, one JSON object per line.
+
+        Args:
+            buzz_thread_list (List[RedditThread]): The threads.
+        """
+        self.output_file.write(
+            "".join(
+                f"{json.dumps(reddit_thread._asdict(), ensure_ascii=False)}\n"
+                for reddit_thread in buzz_thread_list
+            )
+        )
+
+
+class CsvOutputSink(TextOutputSink):
+    def __init__(self, filename: str) -> None:
+        """Initializes the CSV sink, writing the header when the file is new.
+
+        The file is opened without newline translation, as required by the csv module.
+
+        Args:
+            filename (str): The output filename.
+        """
+        super().__init__(filename, newline="")
+        self.csv_writer = csv.writer(self.output_file)
+        if self.output_file.tell() == 0:
+            self.csv_writer.writerow(RedditThread._fields)
+
+    def write(self, buzz_thread_list: List[RedditThread]) -> None:
+        """Write a batch of threads, one row per thread.
+
+        Args:
+            buzz_thread_list (List[RedditThread]): The threads.
+        """
+        self.csv_writer.writerows(buzz_thread_list)
+
+
+class SqliteOutputSink(OutputSink):
+    def __init__(self, filename: str) -> None:
+        """Initializes the SQLite sink, that saves all threads of a run in a single transaction
+        (or one per `flush` call).
+
+        Args:
+            filename (str): The SQLite database filename.
+        """
+        super().__init__(filename)
+        self.connection = sqlite3.connect(filename)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS threads ("
+            "rank TEXT, score INTEGER, subreddit TEXT, title TEXT, "
+            "comments_link TEXT, thread_link TEXT, crawled_at TEXT)"
+        )
+        self.crawled_at = datetime.now().isoformat()
+
+    def write(self, buzz_thread_list: List[RedditThread]) -> None:
+        """Insert a batch of threads.
+
+        Args:
+            buzz_thread_list (List[RedditThread]): The threads.
+        """
+        self.connection.executemany(
+            "INSERT INTO threads VALUES (?, ?, ?, ?, ?, ?, ?)",
+            ((*reddit_thread, self.crawled_at) for reddit_thread in buzz_thread_list),
+        )
+
+    def flush(self) -> None:
+        """Commit the written threads."""
+        self.connection.commit()
+
+    def close(self) -> None:
+        """Commit the run transaction and close the database."""
+        self.connection.commit()
+        self.connection.close()
+
+
+OUTPUT_SINKS = {
+    "text": TextOutputSink,
+    "jsonl": JsonLinesOutputSink,
+    "csv": CsvOutputSink,
+    "sqlite": SqliteOutputSink,
+}
+
+
+def create_output_sink(filename: str, output_format: str = "text") -> OutputSink:
+    """Create the output sink of a format.
+
+    Args:
+        filename (str): The output filename.
+        output_format (str, optional): The output format (one of OUTPUT_FORMATS). Defaults to "text".
+
+    Raises:
+        ValueError: If the output format is unknown.
+
+    Returns:
+        OutputSink: The output sink.
+    """
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(
+            f"Unknown output format {output_format} (options: {', '.join(OUTPUT_FORMATS)})."
+        )
+    return OUTPUT_SINKS[output_format](filename)
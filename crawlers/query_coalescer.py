@@ -0,0 +1,127 @@
+from threading import Condition, Lock, Thread
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+
+class SharedStream:
+    def __init__(self) -> None:
+        """Initializes a stream of results that can be read, from the start, by many threads."""
+        self.items: List[Any] = []
+        self.finished = False
+        self.error: Optional[Exception] = None
+        self.condition = Condition()
+
+    def append(self, item: Any) -> None:
+        """Add a result to the stream, waking up its readers.
+
+        Args:
+            item (Any): The result.
+        """
+        with self.condition:
+            self.items.append(item)
+            self.condition.notify_all()
+
+    def finish(self, error: Optional[Exception] = None) -> None:
+        """Mark the stream as finished.
+
+        Args:
+            error (Optional[Exception], optional): The error that interrupted the stream, raised to
+            its readers. Defaults to None.
+        """
+        with self.condition:
+            self.finished = True
+            self.error = error
+            self.condition.notify_all()
+
+    def __iter__(self) -> Iterator[Any]:
+        """Read the stream results, from the first one, waiting for the next ones.
+
+        Raises:
+            Exception: The error that interrupted the stream.
+
+        Yields:
+            Iterator[Any]: The results.
+        """
+        position = 0
+        while True:
+            with self.condition:
+                self.condition.wait_for(
+                    lambda: position < len(self.items) or self.finished
+                )
+                if position < len(self.items):
+                    item = self.items[position]
+                elif self.error is not None:
+                    raise self.error
+                else:
+                    return
+            position += 1
+            yield item
+
+
+class QueryCoalescer:
+    def __init__(self) -> None:
+        """Initializes the query coalescer, that shares a single execution between identical
+        queries made at the same time (eg. the same subreddits asked in different chats).
+        """
+        self.in_flight_queries: Dict[str, SharedStream] = {}
+        self.lock = Lock()
+
+    def _produce(
+        self,
+        key: str,
+        shared_stream: SharedStream,
+        function: Callable[..., Iterator[Any]],
+        args: Tuple[Any, ...],
+    ) -> None:
+        """Run a query, putting its results in the stream read by the identical queries.
+
+        Runs in its own thread, so the query advances independently of its readers (a slow or
+        failed reader does not delay or cut the results of the others), and an error of the
+        query is raised to all readers.
+
+        Args:
+            key (str): The normalized query.
+            shared_stream (SharedStream): The stream read by the identical queries.
+            function (Callable[..., Iterator[Any]]): The function that executes the query.
+            args (Tuple[Any, ...]): The function arguments.
+        """
+        error = None
+        try:
+            for item in function(*args):
+                shared_stream.append(item)
+        except Exception as query_error:
+            error = query_error
+        finally:
+            with self.lock:
+                del self.in_flight_queries[key]
+            shared_stream.finish(error)
+
+    def stream(
+        self, key: str, function: Callable[..., Iterator[Any]], *args: Any
+    ) -> Iterator[Any]:
+        """Run a query that yields results, or read the results of the identical query already
+        running (from its first result, as they are produced).
+
+        Every caller, including the one that started the query, reads the shared stream, and
+        an error of the query is raised to each of them.
+
+        Args:
+            key (str): The normalized query.
+            function (Callable[..., Iterator[Any]]): The function that executes the query.
+            args (Any): The function arguments.
+
+        Returns:
+            Iterator[Any]: The query results.
+        """
+        with self.lock:
+            shared_stream = self.in_flight_queries.get(key)
+            if shared_stream is None:
+                shared_stream = self.in_flight_queries[key] = SharedStream()
+                Thread(
+                    target=self._produce,
+                    args=(key, shared_stream, function, args),
+                    daemon=True,
+                ).start()
+        return iter(shared_stream)
+
+
+query_coalescer = QueryCoalescer()
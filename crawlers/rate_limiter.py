@@ -0,0 +1,183 @@
+import random
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from threading import Lock
+from time import monotonic, sleep
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+from constants import (
+    MAXIMUM_WAITING_TIME,
+    REQUESTS_BURST_PER_HOST,
+    REQUESTS_PER_SECOND_PER_HOST,
+    START_WAITING_TIME,
+)
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: int) -> None:
+        """Initializes a token bucket, that allows `rate` requests per second with bursts of `capacity`.
+
+        Args:
+            rate (float): Number of tokens added to the bucket per second.
+            capacity (int): Maximum number of tokens in the bucket.
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.last_refill = monotonic()
+        self.paused_until = 0.0
+        self.lock = Lock()
+
+    def _reserve_token(self) -> float:
+        """Take a token from the bucket, when there is one available.
+
+        Returns:
+            float: 0 if a token was taken, else the seconds until the next token is available.
+        """
+        with self.lock:
+            now = monotonic()
+            if now < self.paused_until:
+                return self.paused_until - now
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self.last_refill) * self.rate
+            )
+            self.last_refill = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0
+            return (1 - self.tokens) / self.rate
+
+    def pause(self, seconds: float) -> None:
+        """Drain the bucket and stop giving tokens for some time (eg. after a 429 response), so
+        every thread using the bucket waits.
+
+        Args:
+            seconds (float): The pause duration.
+        """
+        with self.lock:
+            self.paused_until = max(self.paused_until, monotonic() + seconds)
+            self.tokens = 0.0
+            self.last_refill = self.paused_until
+
+    def acquire(self) -> None:
+        """Wait until a token is available and take it. Only the calling thread waits."""
+        waiting_time = self._reserve_token()
+        while waiting_time > 0:
+            sleep(waiting_time)
+            waiting_time = self._reserve_token()
+
+
+class HostRateLimiter:
+    def __init__(
+        self,
+        rate: float = REQUESTS_PER_SECOND_PER_HOST,
+        capacity: int = REQUESTS_BURST_PER_HOST,
+    ) -> None:
+        """Initializes the rate limiter, with a token bucket per host.
+
+        Args:
+            rate (float, optional): Requests per second allowed for each host. Defaults to REQUESTS_PER_SECOND_PER_HOST.
+            capacity (int, optional): Burst of requests allowed for each host. Defaults to REQUESTS_BURST_PER_HOST.
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.lock = Lock()
+
+    def _get_bucket(self, url: str) -> TokenBucket:
+        """Get the token bucket of the host of an URL, creating it when needed.
+
+        Args:
+            url (str): The URL.
+
+        Returns:
+            TokenBucket: The host bucket.
+        """
+        host = urlparse(url).netloc
+        with self.lock:
+            bucket = self.buckets.get(host)
+            if bucket is None:
+                bucket = self.buckets[host] = TokenBucket(self.rate, self.capacity)
+        return bucket
+
+    def acquire(self, url: str) -> None:
+        """Wait until a request to the host of the URL is allowed.
+
+        Args:
+            url (str): The URL to be requested.
+        """
+        self._get_bucket(url).acquire()
+
+    def pause(self, url: str, seconds: float) -> None:
+        """Stop the requests to the host of the URL for some time, in every thread.
+
+        Args:
+            url (str): The URL of the throttled host.
+            seconds (float): The pause duration.
+        """
+        self._get_bucket(url).pause(seconds)
+
+
+class RetryScheduler:
+    def __init__(
+        self,
+        start_waiting_time: float = START_WAITING_TIME,
+        maximum_waiting_time: float = MAXIMUM_WAITING_TIME,
+    ) -> None:
+        """Initializes the retry scheduler.
+
+        Args:
+            start_waiting_time (float, optional): Base of the exponential backoff, in seconds.
+            Defaults to START_WAITING_TIME.
+            maximum_waiting_time (float, optional): Maximum waiting time between two tries, in seconds.
+            Defaults to MAXIMUM_WAITING_TIME.
+        """
+        self.start_waiting_time = start_waiting_time
+        self.maximum_waiting_time = maximum_waiting_time
+
+    def _parse_retry_after(self, retry_after: Optional[str]) -> Optional[float]:
+        """Parse a Retry-After header, that can be a number of seconds or an HTTP date.
+
+        Args:
+            retry_after (Optional[str]): The header value.
+
+        Returns:
+            Optional[float]: The seconds to wait or None if the header is missing or invalid.
+        """
+        if not retry_after:
+            return None
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            pass
+        try:
+            retry_date = parsedate_to_datetime(retry_after)
+        except (TypeError, ValueError):
+            return None
+        return max(0.0, (retry_date - datetime.now(retry_date.tzinfo)).total_seconds())
+
+    def get_waiting_time(
+        self, requests_tried: int, retry_after: Optional[str] = None
+    ) -> float:
+        """Get the time to wait before the next try.
+
+        The Retry-After header is honoured when present; otherwise the waiting time grows
+        exponentially with the number of tries, with a random jitter (between half and the full
+        backoff), so the retries of many requests are not synchronized.
+
+        Args:
+            requests_tried (int): Number of previous tried requests.
+            retry_after (Optional[str], optional): The Retry-After header of the response. Defaults to None.
+
+        Returns:
+            float: The seconds to wait.
+        """
+        retry_after_seconds = self._parse_retry_after(retry_after)
+        if retry_after_seconds is not None:
+            return min(retry_after_seconds, self.maximum_waiting_time)
+        backoff = min(
+            self.maximum_waiting_time,
+            self.start_waiting_time * 2 ** (requests_tried - 1),
+        )
+        return random.uniform(backoff / 2, backoff)
@@ -1,10 +1,33 @@
 from datetime import datetime
 from time import sleep
-from typing import List
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
 
-from constants import MAXIMUM_TRIES, REDDIT_BASE_ADDRESS, START_WAITING_TIME
+from constants import (
+    DEFAULT_MULTIREDDIT_SIZE,
+    DEFAULT_SORT,
+    HTTP_POOL_SIZE,
+    MAXIMUM_TRIES,
+    REDDIT_BASE_ADDRESS,
+    REQUEST_TIMEOUT,
+    RETRY_STATUS_CODES,
+    STREAMING_CHUNK_SIZE,
+    TELEGRAM_MESSAGE_MAXIMUM_LENGTH,
+)
+from models import RedditThread
+from rate_limiter import HostRateLimiter, RetryScheduler
+from response_cache import CachedResponse, ResponseCache
+
+if TYPE_CHECKING:
+    from output_sinks import OutputSink
+
+RETRY_EXCEPTIONS = (
+    requests.ConnectionError,
+    requests.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+)
 
 
 class UtilsRepository:
@@ -20,45 +43,41 @@ class UtilsRepository:
         """
         return string_to_separate.split(separator)
 
-    def _print_thread_cli(self, reddit_thread: dict) -> None:
-        """Print the crawler results to terminal.
+    def format_thread_text(self, reddit_thread: RedditThread) -> str:
+        """Format a thread as the text shown in the CLI and in telegram.
 
         Args:
-            reddit_thread (dict): The reddit thread informations.
+            reddit_thread (RedditThread): The reddit thread informations.
+
+        Returns:
+            str: The formatted thread.
         """
-        print(f"{reddit_thread.get('rank')} - {reddit_thread.get('title')}")
-        print(f"{'-':>5} Score.........: {reddit_thread.get('score')}")
-        print(f"{'-':>5} Subreddit.....: {reddit_thread.get('subreddit')}")
-        print(
-            f"{'-':>5} Comments link.: {REDDIT_BASE_ADDRESS}{reddit_thread.get('comments_link')}"
-        )
-        print(
-            f"{'-':>5} Thread link...: {REDDIT_BASE_ADDRESS}{reddit_thread.get('thread_link')}"
+        return (
+            f"{reddit_thread.rank} - {reddit_thread.title}\n"
+            f"{'-':>5} Score.........: {reddit_thread.score}\n"
+            f"{'-':>5} Subreddit.....: {reddit_thread.subreddit}\n"
+            f"{'-':>5} Comments link.: {REDDIT_BASE_ADDRESS}{reddit_thread.comments_link}\n"
+            f"{'-':>5} Thread link...: {REDDIT_BASE_ADDRESS}{reddit_thread.thread_link}"
         )
 
-    def _return_text_formatted_to_telegram(self, reddit_thread: dict) -> str:
+    def _return_text_formatted_to_telegram(self, reddit_thread: RedditThread) -> str:
         """Returns a formatted text to show in telegram.
 
         Args:
-            reddit_thread (dict): The reddit thread informations.
+            reddit_thread (RedditThread): The reddit thread informations.
 
         Returns:
             str: The text to be returned to telegram.
         """
-        message = (
-            f"{reddit_thread.get('rank')} - {reddit_thread.get('title')}\n"
-            f"{'-':>5} Score.........: {reddit_thread.get('score')}\n"
-            f"{'-':>5} Subreddit.....: {reddit_thread.get('subreddit')}\n"
-            f"{'-':>5} Comments link.: {REDDIT_BASE_ADDRESS}{reddit_thread.get('comments_link')}\n"
-            f"{'-':>5} Thread link...: {REDDIT_BASE_ADDRESS}{reddit_thread.get('thread_link')}"
-        )
-        return message
+        return self.format_thread_text(reddit_thread)
 
-    def create_list_of_messages_to_telegram(self, buzz_thread_list: List[dict]) -> str:
+    def create_list_of_messages_to_telegram(
+        self, buzz_thread_list: List[RedditThread]
+    ) -> str:
         """Create list of messages with buzzer threads list.
 
         Args:
-            buzz_thread_list (List[dict]): The buzzer threads list.
+            buzz_thread_list (List[RedditThread]): The buzzer threads list.
 
         Returns:
             str: A list with the telegram messages.
@@ -69,101 +88,366 @@ class UtilsRepository:
         ]
         return telegram_messages
 
-    def _save_thread_to_file(self, reddit_thread: dict, filename: str):
-        """Write the crawler results to a file.
+    def batch_telegram_messages(
+        self,
+        telegram_messages: List[str],
+        maximum_length: int = TELEGRAM_MESSAGE_MAXIMUM_LENGTH,
+    ) -> List[str]:
+        """Join the telegram messages in as few messages as possible, within the size limit.
 
         Args:
-            reddit_thread (dict): The reddit thread information.
-            filename (str): The filename to save the informations.
+            telegram_messages (List[str]): The telegram messages.
+            maximum_length (int, optional): Maximum length of a message.
+            Defaults to TELEGRAM_MESSAGE_MAXIMUM_LENGTH.
+
+        Returns:
+            List[str]: The batched messages (a message longer than the limit is splitted).
         """
-        with open(filename, "a") as file:
-            file.write(f"{'-'*70}\n")
-            file.write(f"{reddit_thread.get('rank')} - {reddit_thread.get('title')}\n")
-            file.write(f"{'-':>5} Score.........: {reddit_thread.get('score')}\n")
-            file.write(f"{'-':>5} Subreddit.....: {reddit_thread.get('subreddit')}\n")
-            file.write(
-                f"{'-':>5} Comments link.: {REDDIT_BASE_ADDRESS}{reddit_thread.get('comments_link')}\n"
-            )
-            file.write(
-                f"{'-':>5} Thread link...: {REDDIT_BASE_ADDRESS}{reddit_thread.get('thread_link')}\n"
-            )
+        separator = "\n\n"
+        batched_messages = []
+        current_batch = ""
+        for telegram_message in telegram_messages:
+            for message_start in range(0, len(telegram_message), maximum_length):
+                message_part = telegram_message[
+                    message_start : message_start + maximum_length
+                ]
+                if not current_batch:
+                    current_batch = message_part
+                elif (
+                    len(current_batch) + len(separator) + len(message_part)
+                    <= maximum_length
+                ):
+                    current_batch = f"{current_batch}{separator}{message_part}"
+                else:
+                    batched_messages.append(current_batch)
+                    current_batch = message_part
+        if current_batch:
+            batched_messages.append(current_batch)
+        return batched_messages
+
+    def normalize_subreddits(self, subreddits: str) -> str:
+        """Normalize a list of subreddits, so identical queries have the same text.
+
+        Args:
+            subreddits (str): The subreddits, separated by ';'.
+
+        Returns:
+            str: The lowercase subreddits, without whitespaces, empty names and duplicates.
+        """
+        normalized_subreddits = (
+            subreddit.strip().lower() for subreddit in self.split_string(subreddits)
+        )
+        return ";".join(dict.fromkeys(filter(None, normalized_subreddits)))
+
+    def plan_multireddit_batches(
+        self, subreddits: str, multireddit_size: int = DEFAULT_MULTIREDDIT_SIZE
+    ) -> List[Dict[str, int]]:
+        """Group the subreddits in multireddits ('a+b+c'), so each group is fetched once.
+
+        The subreddits are normalized (and deduplicated) before being grouped.
+
+        Args:
+            subreddits (str): The subreddits, separated by ';'.
+            multireddit_size (int, optional): Maximum number of subreddits in a multireddit.
+            Defaults to DEFAULT_MULTIREDDIT_SIZE.
+
+        Returns:
+            List[Dict[str, int]]: The batches, mapping each subreddit to its position in the
+            normalized list of subreddits.
+        """
+        normalized_subreddits = self.normalize_subreddits(subreddits)
+        if not normalized_subreddits:
+            return []
+        list_of_subreddits = self.split_string(normalized_subreddits)
+        multireddit_size = max(1, multireddit_size)
+        return [
+            {
+                subreddit: subreddit_position
+                for subreddit_position, subreddit in enumerate(
+                    list_of_subreddits[batch_start : batch_start + multireddit_size],
+                    batch_start,
+                )
+            }
+            for batch_start in range(0, len(list_of_subreddits), multireddit_size)
+        ]
 
     def cli_show_results(
         self,
-        buzz_thread_list: List[dict],
-        filename: str = None,
+        buzz_thread_list: List[RedditThread],
+        output_sink: Optional["OutputSink"] = None,
     ) -> None:
         """Show the results of the crawler.
 
         Args:
-            buzz_thread_list (List[dict]): The list with the reddit threads.
-            filename (str, optional): The filename to save the informations.. Defaults to None.
+            buzz_thread_list (List[RedditThread]): The list with the reddit threads.
+            output_sink (OutputSink, optional): The sink to save the informations. Defaults to None.
         """
-        for buzz_thread in buzz_thread_list:
-            self._print_thread_cli(buzz_thread)
-            if filename:
-                self._save_thread_to_file(buzz_thread, filename)
+        print(
+            "\n".join(
+                self.format_thread_text(buzz_thread) for buzz_thread in buzz_thread_list
+            )
+        )
+        if output_sink is not None:
+            output_sink.write(buzz_thread_list)
 
-    def create_subreddit_url(self, subreddit: str) -> str:
+    def create_subreddit_url(
+        self,
+        subreddit: str,
+        sort: str = DEFAULT_SORT,
+        after: str = None,
+        count: int = 0,
+        json_listing: bool = False,
+    ) -> str:
         """Create the subreddit URL.
 
         Args:
-            subreddit (str): The subreddit address.
+            subreddit (str): The subreddit address (or a multireddit, eg. 'a+b+c').
+            sort (str, optional): The listing sort (one of REDDIT_SORTS). Defaults to DEFAULT_SORT.
+            after (str, optional): The cursor of the listing page (fullname of the previous
+            page last thread). Defaults to None (first page).
+            count (int, optional): Number of threads in the previous pages, used by reddit to
+            number the threads. Defaults to 0.
+            json_listing (bool, optional): Create the URL of the JSON listing. Defaults to False.
 
         Returns:
             str: The subreddit complete URL.
         """
-        return f"{REDDIT_BASE_ADDRESS}/r/{subreddit}"
+        subreddit_url = f"{REDDIT_BASE_ADDRESS}/r/{subreddit}"
+        if sort != "hot":
+            subreddit_url = f"{subreddit_url}/{sort}"
+        if json_listing:
+            subreddit_url = f"{subreddit_url}/.json"
+        elif after:
+            subreddit_url = f"{subreddit_url}/"
+        if after:
+            subreddit_url = f"{subreddit_url}?count={count}&after={after}"
+        return subreddit_url
 
 
 class RequestsRepository:
-    def __init__(self) -> None:
+    def __init__(self, pool_size: int = HTTP_POOL_SIZE) -> None:
+        """Initializes the requests repository, with a keep-alive connection pool shared by all requests.
+
+        Args:
+            pool_size (int, optional): Maximum number of connections kept per host. Defaults to HTTP_POOL_SIZE.
+        """
         self.headers = {
             "user-agent": "Mozilla/5.0 (X11; Linux x86_64) Chrome/100.0.4896.79 Safari/537.36"
         }
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.rate_limiter = HostRateLimiter()
+        self.retry_scheduler = RetryScheduler()
+        self.response_cache = ResponseCache()
+
+    def _handle_retry_status_code(
+        self, url: str, response: requests.Response, requests_tried: int
+    ) -> None:
+        """Handle TOO MANY REQUESTS (and temporary server) errors in requests.
 
-    def _handle_status_code_429(self, requests_tried: int) -> None:
-        """Handle TOO MANY REQUESTS error in requests.
+        Waits the time given by the Retry-After header or an exponential backoff with jitter.
+        On 429 (or with a Retry-After header) the whole host is paused, so no thread keeps
+        requesting the throttled host; other server errors only delay the current request.
 
         Args:
+            url (str): The requested URL.
+            response (requests.Response): The response with the error.
             requests_tried (int): Number of previous tried requests.
         """
-        print(f"Error in reddit response. Details: status_code ({429}).")
-        wait_time = START_WAITING_TIME * requests_tried
-        print(f"{datetime.now()} - Waiting {wait_time} seconds until next request.")
+        print(
+            f"Error in reddit response to {url}. Details: status_code ({response.status_code})."
+        )
+        retry_after = response.headers.get("Retry-After")
+        wait_time = self.retry_scheduler.get_waiting_time(requests_tried, retry_after)
+        print(f"{datetime.now()} - Waiting {wait_time:.1f} seconds until next request.")
+        if response.status_code == 429 or retry_after:
+            self.rate_limiter.pause(url, wait_time)
+        else:
+            sleep(wait_time)
+
+    def _handle_retry_exception(
+        self, url: str, exception: requests.RequestException, requests_tried: int
+    ) -> None:
+        """Handle network errors (connection errors, timeouts and broken bodies) in requests.
+
+        Waits (only the current thread) an exponential backoff with jitter.
+
+        Args:
+            url (str): The requested URL.
+            exception (requests.RequestException): The network error.
+            requests_tried (int): Number of previous tried requests.
+        """
+        print(f"Error during GET request to {url}. Details: {exception!r}.")
+        wait_time = self.retry_scheduler.get_waiting_time(requests_tried)
+        print(f"{datetime.now()} - Waiting {wait_time:.1f} seconds until next request.")
         sleep(wait_time)
 
-    def make_get_request(self, url: str, maximum_tries: int = MAXIMUM_TRIES) -> str:
-        """Make a get request and handle the results.
+    def _get_response(
+        self,
+        url: str,
+        cached_response: Optional[CachedResponse],
+        maximum_tries: int,
+        stream: bool = False,
+    ) -> Optional[requests.Response]:
+        """Make a get request, trying again the ones that fail with a status code in
+        RETRY_STATUS_CODES or with a network error (RETRY_EXCEPTIONS).
+
+        The requests to each host are limited by a token bucket, and a cached response is
+        revalidated with a conditional request. Each request times out after REQUEST_TIMEOUT
+        seconds without data.
 
         Args:
             url (str): The URL to do the GET request.
-            maximum_tries (int, optional): Maximum number of request tries. Defaults to MAXIMUM_TRIES.
+            cached_response (Optional[CachedResponse]): The cached response to revalidate.
+            maximum_tries (int): Maximum number of request tries.
+            stream (bool, optional): Do not download the body before returning. Defaults to False.
 
         Returns:
-            str: The request response text.
+            Optional[requests.Response]: The 200 (or 304 Not Modified) response or None if it
+            was not possible to get it.
         """
-        requests_tried = 1
-        status_code = None
-        while requests_tried < maximum_tries and status_code != 200:
+        conditional_headers = self.response_cache.get_conditional_headers(
+            cached_response
+        )
+        for requests_tried in range(1, maximum_tries + 1):
+            self.rate_limiter.acquire(url)
             print(f"Trying to make GET request to {url}.")
-            response = requests.get(url, headers=self.headers)
-            status_code = response.status_code
-            if status_code == 429:
-                self._handle_status_code_429(requests_tried)
-            elif status_code != 200:
-                print(
-                    f"Error {response.status_code} during GET request to {url}. Exiting."
+            try:
+                response = self.session.get(
+                    url,
+                    headers=conditional_headers,
+                    stream=stream,
+                    timeout=REQUEST_TIMEOUT,
                 )
-                exit(2)
-            requests_tried += 1
-        if status_code != 200:
-            print(
-                "It was not possible to make GET request to {reddit_address}. Exiting."
-            )
-            exit(3)
+            except RETRY_EXCEPTIONS as exception:
+                if requests_tried < maximum_tries:
+                    self._handle_retry_exception(url, exception, requests_tried)
+                else:
+                    print(f"Error during GET request to {url}. Details: {exception!r}.")
+                continue
+            status_code = response.status_code
+            if status_code == 200 or (
+                status_code == 304 and cached_response is not None
+            ):
+                return response
+            response.close()
+            if status_code not in RETRY_STATUS_CODES:
+                print(f"Error {response.status_code} during GET request to {url}.")
+                return None
+            if requests_tried < maximum_tries:
+                self._handle_retry_status_code(url, response, requests_tried)
+        print(f"It was not possible to make GET request to {url}.")
+        return None
+
+    def _is_body_complete(self, response: requests.Response) -> bool:
+        """Check if a streamed body was completely downloaded (urllib3 does not raise when a
+        connection is closed before the Content-Length is reached).
+
+        Args:
+            response (requests.Response): The streamed response, after its body was read.
+
+        Returns:
+            bool: False if fewer bytes than the Content-Length were received.
+        """
+        content_length = response.headers.get("Content-Length", "")
+        return not content_length.isdigit() or response.raw.tell() >= int(
+            content_length
+        )
+
+    def make_get_request(
+        self, url: str, maximum_tries: int = MAXIMUM_TRIES, use_cache: bool = True
+    ) -> Optional[str]:
+        """Make a get request and handle the results.
+
+        The requests to each host are limited by a token bucket and the ones that fail with
+        a status code in RETRY_STATUS_CODES are tried again later.
+
+        Responses younger than the cache TTL are returned without requests; older cached
+        responses are revalidated with a conditional request and reused on 304 Not Modified.
+
+        Args:
+            url (str): The URL to do the GET request.
+            maximum_tries (int, optional): Maximum number of request tries. Defaults to MAXIMUM_TRIES.
+            use_cache (bool, optional): Use the response cache. Defaults to True.
+
+        Returns:
+            Optional[str]: The request response text or None if it was not possible to get it.
+        """
+        cached_response = self.response_cache.get(url) if use_cache else None
+        if cached_response is not None and self.response_cache.is_fresh(
+            cached_response
+        ):
+            return cached_response.text
+        response = self._get_response(url, cached_response, maximum_tries)
+        if response is None:
+            return None
+        if response.status_code == 304:
+            self.response_cache.refresh(url, cached_response)
+            return cached_response.text
+        if use_cache:
+            self.response_cache.set(url, response.text, response.headers)
         return response.text
 
+    def make_streaming_get_request(
+        self,
+        url: str,
+        chunk_consumer: Callable[[str], None],
+        maximum_tries: int = MAXIMUM_TRIES,
+        use_cache: bool = True,
+    ) -> Optional[str]:
+        """Make a get request, passing the body chunks to a consumer as soon as they arrive.
+
+        The requests are limited, tried again and cached as in `make_get_request`. Only a
+        downloaded body is passed to the consumer: a cached response (fresh or revalidated) is
+        just returned, so the caller can check whether it was already parsed. The whole body is
+        still kept, to be cached and returned.
+
+        Args:
+            url (str): The URL to do the GET request.
+            chunk_consumer (Callable[[str], None]): Receives each decoded chunk of the body.
+            maximum_tries (int, optional): Maximum number of request tries. Defaults to MAXIMUM_TRIES.
+            use_cache (bool, optional): Use the response cache. Defaults to True.
+
+        Returns:
+            Optional[str]: The request response text or None if it was not possible to get it
+            (including when the download breaks after the consumer received part of the body).
+        """
+        cached_response = self.response_cache.get(url) if use_cache else None
+        if cached_response is not None and self.response_cache.is_fresh(
+            cached_response
+        ):
+            return cached_response.text
+        response = self._get_response(url, cached_response, maximum_tries, stream=True)
+        if response is None:
+            return None
+        if response.status_code == 304:
+            response.close()
+            self.response_cache.refresh(url, cached_response)
+            return cached_response.text
+        if response.encoding is None:
+            response.encoding = "utf-8"
+        response_chunks = []
+        with response:
+            try:
+                for chunk in response.iter_content(
+                    chunk_size=STREAMING_CHUNK_SIZE, decode_unicode=True
+                ):
+                    chunk_consumer(chunk)
+                    response_chunks.append(chunk)
+            except RETRY_EXCEPTIONS as exception:
+                print(f"Download of {url} interrupted. Details: {exception!r}.")
+                return None
+        if not self._is_body_complete(response):
+            print(f"Download of {url} interrupted before the end of the body.")
+            return None
+        response_text = "".join(response_chunks)
+        if use_cache:
+            self.response_cache.set(url, response_text, response.headers)
+        return response_text
+
 
 utils_repository = UtilsRepository()
 requests_repository = RequestsRepository()
@@ -0,0 +1,239 @@
+import sqlite3
+from hashlib import blake2b
+from threading import Lock
+from time import time
+from typing import Dict, NamedTuple, Optional
+
+from cachetools import LRUCache
+
+from constants import (
+    PARSED_THREADS_CACHE_SIZE,
+    RESPONSE_CACHE_MAXIMUM_AGE,
+    RESPONSE_CACHE_SIZE,
+    RESPONSE_CACHE_TTL,
+)
+from models import ParsedPage
+
+
+class CachedResponse(NamedTuple):
+    text: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    stored_at: float
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        ttl: float = RESPONSE_CACHE_TTL,
+        maximum_size: int = RESPONSE_CACHE_SIZE,
+        maximum_age: float = RESPONSE_CACHE_MAXIMUM_AGE,
+    ) -> None:
+        """Initializes the response cache, an in-memory LRU with an optional SQLite store.
+
+        Responses younger than `ttl` are served without requests. Older ones are kept (up to
+        `maximum_age`) only to be revalidated with their ETag/Last-Modified headers.
+
+        Args:
+            ttl (float, optional): Seconds a response is served without revalidation. Defaults to RESPONSE_CACHE_TTL.
+            maximum_size (int, optional): Maximum number of responses kept in memory. Defaults to RESPONSE_CACHE_SIZE.
+            maximum_age (float, optional): Seconds a response is kept to be revalidated.
+            Defaults to RESPONSE_CACHE_MAXIMUM_AGE.
+        """
+        self.ttl = ttl
+        self.maximum_age = maximum_age
+        self.memory_cache = LRUCache(maxsize=maximum_size)
+        self.connection = None
+        self.lock = Lock()
+
+    def open_database(self, filename: str) -> None:
+        """Use a SQLite file to keep the responses between executions.
+
+        Args:
+            filename (str): The SQLite database filename.
+        """
+        with self.lock:
+            self.connection = sqlite3.connect(filename, check_same_thread=False)
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "url TEXT PRIMARY KEY, text TEXT NOT NULL, etag TEXT, "
+                "last_modified TEXT, stored_at REAL NOT NULL)"
+            )
+            self.connection.execute(
+                "DELETE FROM responses WHERE stored_at < ?",
+                (time() - self.maximum_age,),
+            )
+            self.connection.commit()
+
+    def _load_from_database(self, url: str) -> Optional[CachedResponse]:
+        """Load a response from the SQLite store. Must be called holding the lock.
+
+        Args:
+            url (str): The response URL.
+
+        Returns:
+            Optional[CachedResponse]: The stored response or None.
+        """
+        if self.connection is None:
+            return None
+        row = self.connection.execute(
+            "SELECT text, etag, last_modified, stored_at FROM responses WHERE url = ?",
+            (url,),
+        ).fetchone()
+        return CachedResponse(*row) if row else None
+
+    def _store(self, url: str, cached_response: CachedResponse) -> None:
+        """Keep a response in memory and in the SQLite store. Must be called holding the lock.
+
+        Args:
+            url (str): The response URL.
+            cached_response (CachedResponse): The response.
+        """
+        self.memory_cache[url] = cached_response
+        if self.connection is not None:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                (url, *cached_response),
+            )
+            self.connection.commit()
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        """Get a cached response, fresh or stale.
+
+        Args:
+            url (str): The response URL.
+
+        Returns:
+            Optional[CachedResponse]: The cached response or None if there is none (or it is too old).
+        """
+        with self.lock:
+            cached_response = self.memory_cache.get(url)
+            if cached_response is None:
+                cached_response = self._load_from_database(url)
+                if cached_response is not None:
+                    self.memory_cache[url] = cached_response
+        if cached_response is None:
+            return None
+        if time() - cached_response.stored_at > self.maximum_age:
+            return None
+        return cached_response
+
+    def is_fresh(self, cached_response: CachedResponse) -> bool:
+        """Check if a cached response can be served without revalidation.
+
+        Args:
+            cached_response (CachedResponse): The cached response.
+
+        Returns:
+            bool: True if the response is younger than the TTL.
+        """
+        return time() - cached_response.stored_at <= self.ttl
+
+    def get_conditional_headers(
+        self, cached_response: Optional[CachedResponse]
+    ) -> Dict[str, str]:
+        """Get the headers to revalidate a cached response.
+
+        Args:
+            cached_response (Optional[CachedResponse]): The cached response.
+
+        Returns:
+            Dict[str, str]: The If-None-Match/If-Modified-Since headers (empty without a response).
+        """
+        headers = {}
+        if cached_response is None:
+            return headers
+        if cached_response.etag:
+            headers["If-None-Match"] = cached_response.etag
+        if cached_response.last_modified:
+            headers["If-Modified-Since"] = cached_response.last_modified
+        return headers
+
+    def set(self, url: str, response_text: str, response_headers: dict) -> None:
+        """Cache a response.
+
+        Args:
+            url (str): The response URL.
+            response_text (str): The response text.
+            response_headers (dict): The response headers, with the validators.
+        """
+        with self.lock:
+            self._store(
+                url,
+                CachedResponse(
+                    response_text,
+                    response_headers.get("ETag"),
+                    response_headers.get("Last-Modified"),
+                    time(),
+                ),
+            )
+
+    def refresh(self, url: str, cached_response: CachedResponse) -> None:
+        """Mark a revalidated (304 Not Modified) response as fresh again.
+
+        Args:
+            url (str): The response URL.
+            cached_response (CachedResponse): The revalidated response.
+        """
+        with self.lock:
+            self._store(url, cached_response._replace(stored_at=time()))
+
+
+class ParsedThreadsCache:
+    def __init__(self, maximum_size: int = PARSED_THREADS_CACHE_SIZE) -> None:
+        """Initializes the cache of buzz threads already extracted from the pages.
+
+        The threads are keyed by page URL and score threshold, and are only reused while the
+        fingerprint (a hash of the page content) is the same, so a changed page is parsed again.
+
+        Args:
+            maximum_size (int, optional): Maximum number of pages kept. Defaults to PARSED_THREADS_CACHE_SIZE.
+        """
+        self.memory_cache = LRUCache(maxsize=maximum_size)
+        self.lock = Lock()
+
+    def get_fingerprint(self, page: str) -> str:
+        """Get the fingerprint of a page.
+
+        Args:
+            page (str): The page content.
+
+        Returns:
+            str: The page fingerprint.
+        """
+        return blake2b(page.encode(), digest_size=16).hexdigest()
+
+    def get(self, url: str, threshold: int, fingerprint: str) -> Optional[ParsedPage]:
+        """Get the threads extracted from a page, if the page did not change.
+
+        Args:
+            url (str): The page URL.
+            threshold (int): The buzz threads score threshold.
+            fingerprint (str): The fingerprint of the current page content.
+
+        Returns:
+            Optional[ParsedPage]: The buzz threads and next page cursor or None if the page was
+            not parsed or changed.
+        """
+        with self.lock:
+            cached_page = self.memory_cache.get((url, threshold))
+        if cached_page is None or cached_page[0] != fingerprint:
+            return None
+        return cached_page[1]
+
+    def set(
+        self, url: str, threshold: int, fingerprint: str, parsed_page: ParsedPage
+    ) -> None:
+        """Cache the threads extracted from a page.
+
+        Args:
+            url (str): The page URL.
+            threshold (int): The buzz threads score threshold.
+            fingerprint (str): The fingerprint of the parsed page content.
+            parsed_page (ParsedPage): The buzz threads and next page cursor.
+        """
+        with self.lock:
+            self.memory_cache[(url, threshold)] = (fingerprint, parsed_page)
+
+
+parsed_threads_cache = ParsedThreadsCache()
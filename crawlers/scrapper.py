@@ -1,40 +1,447 @@
 import argparse
-from typing import List
+from collections import defaultdict
+from concurrent.futures import Executor, ThreadPoolExecutor
+from contextlib import nullcontext
+from queue import Queue
+from threading import Event
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
-from beautiful_soup_service import BeautifulSoupService
+from constants import (
+    BUZZ_THREAD_THRESHOLD,
+    DEFAULT_CONCURRENCY,
+    DEFAULT_LISTING_BACKEND,
+    DEFAULT_MAXIMUM_PAGES,
+    DEFAULT_MULTIREDDIT_SIZE,
+    DEFAULT_PARSER_BACKEND,
+    DEFAULT_SORT,
+    LISTING_BACKENDS,
+    OUTPUT_FORMATS,
+    PARSER_BACKENDS,
+    REDDIT_SORTS,
+    SCORE_SORTED_LISTINGS,
+    THREAD_INDEX_FILENAME,
+    THREADS_PER_PAGE,
+)
+from html_services import create_html_service, create_streaming_html_service
+from json_listing_service import JsonListingService
+from models import CrawlerOptions, FetchedPage, ParsedPage, RedditThread
+from output_sinks import create_output_sink
 from repositories import requests_repository, utils_repository
+from response_cache import parsed_threads_cache
+from thread_index import thread_index
+from thread_ranking import TopThreadsRanking
 
 
-def crawler_reddit(subreddits: str) -> List[dict]:
+def _fetch_listing_page(
+    subreddit: str,
+    options: CrawlerOptions,
+    after: str = None,
+    count: int = 0,
+    html_listing: Optional[Event] = None,
+) -> Optional[FetchedPage]:
+    """Fetch a listing page of a subreddit.
+
+    With the JSON listing backend, the JSON listing is requested (it is only decoded when the
+    page is not in the parsed threads cache); the HTML listing is used when it can not be
+    fetched or after a JSON listing of the crawl could not be decoded. In streaming mode (with
+    lxml installed), a downloaded HTML listing is parsed while it is downloaded (and fetched
+    again, without streaming, when the download breaks).
+
+    Args:
+        subreddit (str): The subreddit.
+        options (CrawlerOptions): The crawler options (listing backend, streaming mode and sort).
+        after (str, optional): The cursor of the listing page. Defaults to None (first page).
+        count (int, optional): Number of threads in the previous pages. Defaults to 0.
+        html_listing (Optional[Event], optional): Set when the crawl must use only the HTML
+        listings. Defaults to None.
+
+    Returns:
+        Optional[FetchedPage]: The fetched page or None if it was not possible to fetch it.
+    """
+    if options.listing_backend == "json" and not (
+        html_listing is not None and html_listing.is_set()
+    ):
+        request_address = utils_repository.create_subreddit_url(
+            subreddit, options.sort, after, count, json_listing=True
+        )
+        response = requests_repository.make_get_request(request_address)
+        if response is not None:
+            return FetchedPage(request_address, response, "json", after, count)
+    request_address = utils_repository.create_subreddit_url(
+        subreddit, options.sort, after, count
+    )
+    streaming_service = create_streaming_html_service() if options.stream_html else None
+    if streaming_service is not None:
+        response = requests_repository.make_streaming_get_request(
+            request_address, streaming_service.feed
+        )
+        if response is not None:
+            # A cached response is not fed, so it is parsed only on a parsed threads cache miss.
+            if streaming_service.started:
+                streaming_service.close()
+            else:
+                streaming_service = None
+            return FetchedPage(
+                request_address, response, "html", after, count, streaming_service
+            )
+        if not streaming_service.started:
+            return None
+        print(f"Trying {request_address} again, without streaming.")
+    response = requests_repository.make_get_request(request_address)
+    if response is None:
+        return None
+    return FetchedPage(request_address, response, "html", after, count)
+
+
+def _create_listing_service(
+    fetched_page: FetchedPage, options: CrawlerOptions
+) -> Optional[Any]:
+    """Create the service that extracts the buzz threads of a fetched page.
+
+    Args:
+        fetched_page (FetchedPage): The fetched page.
+        options (CrawlerOptions): The crawler options (parser backend).
+
+    Returns:
+        Optional[Any]: The listing service or None if the JSON listing could not be decoded.
+    """
+    if fetched_page.listing_service is not None:
+        return fetched_page.listing_service
+    if fetched_page.listing_backend == "json":
+        try:
+            return JsonListingService(fetched_page.response, fetched_page.count + 1)
+        except ValueError:
+            print(f"Invalid JSON listing in {fetched_page.request_address}.")
+            return None
+    return create_html_service(fetched_page.response, options.parser_backend)
+
+
+def _iter_subreddit_pages(
+    subreddit: str,
+    options: CrawlerOptions,
+    prefetch_executor: Executor,
+    ranking: Optional[TopThreadsRanking] = None,
+    html_listing: Optional[Event] = None,
+) -> Iterator[Tuple[RedditThread, ...]]:
+    """Go and search the buzz threads of a single subreddit, following the listing pages.
+
+    The pages are fetched as a pipeline: the next page is requested (in the prefetch executor)
+    as soon as its cursor is found, while the threads of the current page are extracted. A
+    page is only parsed (or decoded) when it was not parsed before or its content changed. When
+    a JSON listing can not be decoded, the page is fetched again as HTML and the crawl keeps
+    using the HTML listings.
+
+    On score-sorted listings the crawler stops at the first page without buzz threads, since
+    the next pages can only have lower scores, or, with a ranking, at the first page whose
+    lowest score does not enter the ranking. The pending prefetch is cancelled when the
+    crawler stops (or the generator is closed) before the last page.
+
+    Args:
+        subreddit (str): The subreddit to search.
+        options (CrawlerOptions): The crawler options (parser and listing backends, maximum
+        pages and sort).
+        prefetch_executor (Executor): The executor that fetches the pages.
+        ranking (Optional[TopThreadsRanking], optional): The ranking that receives the buzz
+        threads of each page. Defaults to None.
+        html_listing (Optional[Event], optional): Set when the crawl must use only the HTML
+        listings (shared by the subreddits of a crawl). Defaults to None.
+
+    Yields:
+        Iterator[Tuple[RedditThread, ...]]: The buzzer threads of each page, as soon as the page is parsed.
+    """
+    html_listing = Event() if html_listing is None else html_listing
+    page_future = prefetch_executor.submit(
+        _fetch_listing_page, subreddit, options, html_listing=html_listing
+    )
+    try:
+        for page_number in range(1, options.maximum_pages + 1):
+            fetched_page = page_future.result()
+            # Runs twice at most: an undecodable JSON listing is fetched again as HTML.
+            while fetched_page is not None:
+                fingerprint = parsed_threads_cache.get_fingerprint(
+                    fetched_page.response
+                )
+                parsed_page = parsed_threads_cache.get(
+                    fetched_page.request_address, BUZZ_THREAD_THRESHOLD, fingerprint
+                )
+                if parsed_page is not None:
+                    break
+                listing_service = _create_listing_service(fetched_page, options)
+                if listing_service is not None:
+                    break
+                html_listing.set()
+                fetched_page = _fetch_listing_page(
+                    subreddit,
+                    options,
+                    fetched_page.after,
+                    fetched_page.count,
+                    html_listing,
+                )
+            if fetched_page is None:
+                break
+            if parsed_page is None:
+                next_page_cursor = listing_service.get_next_page_cursor()
+            else:
+                next_page_cursor = parsed_page.next_page_cursor
+
+            page_future = None
+            if next_page_cursor and page_number < options.maximum_pages:
+                page_future = prefetch_executor.submit(
+                    _fetch_listing_page,
+                    subreddit,
+                    options,
+                    next_page_cursor,
+                    page_number * THREADS_PER_PAGE,
+                    html_listing,
+                )
+
+            if parsed_page is None:
+                parsed_page = ParsedPage(
+                    tuple(
+                        listing_service.get_reddit_buzz_threads(BUZZ_THREAD_THRESHOLD)
+                    ),
+                    next_page_cursor,
+                )
+                parsed_threads_cache.set(
+                    fetched_page.request_address,
+                    BUZZ_THREAD_THRESHOLD,
+                    fingerprint,
+                    parsed_page,
+                )
+            if ranking is not None:
+                ranking.push(parsed_page.threads)
+            yield parsed_page.threads
+
+            if options.sort in SCORE_SORTED_LISTINGS and (
+                not parsed_page.threads
+                or (
+                    ranking is not None
+                    and not ranking.can_be_beaten(
+                        min(
+                            reddit_thread.score for reddit_thread in parsed_page.threads
+                        )
+                    )
+                )
+            ):
+                break
+            if page_future is None:
+                break
+    finally:
+        if page_future is not None:
+            page_future.cancel()
+
+
+def _crawler_multireddit(
+    subreddits_positions: Dict[str, int],
+    options: CrawlerOptions,
+    prefetch_executor: Executor,
+    pages_queue: Queue,
+    stop_crawling: Event,
+    ranking: Optional[TopThreadsRanking] = None,
+    html_listing: Optional[Event] = None,
+) -> None:
+    """Crawl a batch of subreddits as a single multireddit ('a+b+c'), putting the buzz threads
+    of each page and subreddit in a queue.
+
+    The threads are attributed back to their subreddits by their `subreddit` field (threads of
+    other subreddits, eg. from '/r/random', or without a subreddit are attributed to the first
+    subreddit of the batch).
+    Every subreddit of the batch gets its (maybe empty) threads of each page, and a None is put
+    in the queue when the batch is finished (even after an error).
+
+    Args:
+        subreddits_positions (Dict[str, int]): The subreddits of the batch and their positions
+        in the list of subreddits.
+        options (CrawlerOptions): The crawler options.
+        prefetch_executor (Executor): The executor that fetches the pages.
+        pages_queue (Queue): The queue that receives (subreddit position, page threads) tuples.
+        stop_crawling (Event): Set when the results are no longer needed.
+        ranking (Optional[TopThreadsRanking], optional): The ranking that receives the buzz
+        threads of each page. Defaults to None.
+        html_listing (Optional[Event], optional): Set when the crawl must use only the HTML
+        listings. Defaults to None.
+    """
+    first_subreddit_position = next(iter(subreddits_positions.values()))
+    try:
+        for page_threads in _iter_subreddit_pages(
+            "+".join(subreddits_positions),
+            options,
+            prefetch_executor,
+            ranking,
+            html_listing,
+        ):
+            if stop_crawling.is_set():
+                break
+            subreddits_threads = {
+                subreddit_position: []
+                for subreddit_position in subreddits_positions.values()
+            }
+            for reddit_thread in page_threads:
+                subreddit_position = subreddits_positions.get(
+                    (reddit_thread.subreddit or "").lower(), first_subreddit_position
+                )
+                subreddits_threads[subreddit_position].append(reddit_thread)
+            for subreddit_position, subreddit_threads in subreddits_threads.items():
+                pages_queue.put((subreddit_position, tuple(subreddit_threads)))
+    finally:
+        pages_queue.put(None)
+
+
+def iter_crawler_reddit_pages(
+    subreddits: str,
+    options: CrawlerOptions = CrawlerOptions(),
+    ranking: Optional[TopThreadsRanking] = None,
+) -> Iterator[Tuple[int, Tuple[RedditThread, ...]]]:
+    """Go and search the reddit threads, yielding the threads of each page as soon as it is parsed.
+
+    The subreddits are normalized, deduplicated and grouped in multireddits of up to
+    `options.multireddit_size` subreddits, each fetched once. The multireddits are fetched in
+    parallel, sharing the keep-alive connections of the requests repository, so the pages come
+    in the order they are parsed. The buzz threads of each page are upserted in the thread index
+    (when its database is open).
+
+    Args:
+        subreddits (str): The subreddits to search.
+        options (CrawlerOptions, optional): The crawler options. Defaults to CrawlerOptions().
+        ranking (Optional[TopThreadsRanking], optional): The ranking that receives the buzz
+        threads of each page (and stops the score-sorted listings early). Defaults to None.
+
+    Yields:
+        Iterator[Tuple[int, Tuple[RedditThread, ...]]]: The subreddit position (in the
+        normalized list of subreddits) and the buzzer threads of each page.
+    """
+    multireddit_batches = utils_repository.plan_multireddit_batches(
+        subreddits, options.multireddit_size
+    )
+    pages_queue = Queue()
+    stop_crawling = Event()
+    html_listing = Event()
+    with ThreadPoolExecutor(max_workers=options.concurrency) as prefetch_executor:
+        with ThreadPoolExecutor(max_workers=options.concurrency) as executor:
+            multireddit_futures = [
+                executor.submit(
+                    _crawler_multireddit,
+                    subreddits_positions,
+                    options,
+                    prefetch_executor,
+                    pages_queue,
+                    stop_crawling,
+                    ranking,
+                    html_listing,
+                )
+                for subreddits_positions in multireddit_batches
+            ]
+            try:
+                running_multireddits = len(multireddit_futures)
+                while running_multireddits > 0:
+                    crawled_page = pages_queue.get()
+                    if crawled_page is None:
+                        running_multireddits -= 1
+                    else:
+                        thread_index.upsert(crawled_page[1])
+                        yield crawled_page
+            finally:
+                stop_crawling.set()
+            for multireddit_future in multireddit_futures:
+                multireddit_future.result()
+
+
+def iter_crawler_reddit(
+    subreddits: str, options: CrawlerOptions = CrawlerOptions()
+) -> Iterator[List[RedditThread]]:
+    """Go and search the reddit threads, yielding the buzz threads of each page as soon as it
+    is parsed (so the first results come after a single fetch).
+
+    Args:
+        subreddits (str): The subreddits to search.
+        options (CrawlerOptions, optional): The crawler options (concurrency, parser backend,
+        maximum pages and sort). Defaults to CrawlerOptions().
+
+    Yields:
+        Iterator[List[RedditThread]]: The buzzer threads of each page (pages without buzz
+        threads are skipped).
+    """
+    for _, page_threads in iter_crawler_reddit_pages(subreddits, options):
+        if page_threads:
+            yield list(page_threads)
+
+
+def crawler_reddit(
+    subreddits: str, options: CrawlerOptions = CrawlerOptions()
+) -> List[RedditThread]:
     """Go and search the reddit threads.
 
+    The subreddits are fetched in parallel, sharing the keep-alive connections of the requests
+    repository, and the results keep the order of the subreddits. With a limit, only the
+    `options.limit` threads with the highest scores (across all subreddits) are returned, from
+    the highest score, ranked from "1".
+
     Args:
         subreddits (str): The subreddits to search.
+        options (CrawlerOptions, optional): The crawler options (concurrency, parser backend,
+        maximum pages, sort and limit). Defaults to CrawlerOptions().
 
     Returns:
-        List[dict]: A list with the buzzer_threads.
+        List[RedditThread]: A list with the buzzer_threads.
     """
-    list_of_subreddits = utils_repository.split_string(subreddits)
-    buzz_threads_list = []
-    for subbredit in list_of_subreddits:
-        request_address = utils_repository.create_subreddit_url(subbredit)
-        response = requests_repository.make_get_request(request_address)
-        beautiful_soup_service = BeautifulSoupService(response)
-        buzz_threads_list.extend(beautiful_soup_service.get_reddit_buzz_threads())
-    return buzz_threads_list
+    if options.limit:
+        ranking = TopThreadsRanking(options.limit)
+        for _ in iter_crawler_reddit_pages(subreddits, options, ranking):
+            pass
+        return ranking.get_top_threads()
+    subreddits_buzz_threads = defaultdict(list)
+    for subreddit_position, page_threads in iter_crawler_reddit_pages(
+        subreddits, options
+    ):
+        subreddits_buzz_threads[subreddit_position].extend(page_threads)
+    return [
+        buzz_thread
+        for subreddit_position in sorted(subreddits_buzz_threads)
+        for buzz_thread in subreddits_buzz_threads[subreddit_position]
+    ]
 
 
-def main(subreddits: str, filename: str = None) -> None:
-    """Executes the scrapper operations.
+def main(
+    subreddits: str,
+    filename: str = None,
+    cache_filename: str = None,
+    options: CrawlerOptions = CrawlerOptions(),
+    output_format: str = "text",
+    index_filename: str = None,
+) -> None:
+    """Executes the scrapper operations, showing the buzz threads of each page as soon as it is
+    parsed (or, with a limit, the top threads once all subreddits are ranked).
 
     Args:
         subreddits (str): List of subreddits to search, separeted by ';'.
         filename (str, optional): The filename to save the results. Defaults to None.
+        cache_filename (str, optional): SQLite file to keep the responses cache between executions.
+        Defaults to None (only in memory).
+        options (CrawlerOptions, optional): The crawler options. Defaults to CrawlerOptions().
+        output_format (str, optional): The format of the output file (one of OUTPUT_FORMATS).
+        Defaults to "text".
+        index_filename (str, optional): SQLite file where the crawled threads are indexed.
+        Defaults to None (no index).
     """
-    buzz_threads_list = crawler_reddit(subreddits)
-    if len(buzz_threads_list) > 0:
-        utils_repository.cli_show_results(buzz_threads_list, filename)
-    else:
+    if cache_filename:
+        requests_repository.response_cache.open_database(cache_filename)
+    if index_filename:
+        thread_index.open_database(index_filename)
+    found_buzz_threads = False
+    with (
+        create_output_sink(filename, output_format) if filename else nullcontext()
+    ) as output_sink:
+        buzz_threads_stream = (
+            [crawler_reddit(subreddits, options)]
+            if options.limit
+            else iter_crawler_reddit(subreddits, options)
+        )
+        for buzz_threads_list in buzz_threads_stream:
+            if not buzz_threads_list:
+                continue
+            utils_repository.cli_show_results(buzz_threads_list, output_sink)
+            found_buzz_threads = True
+    if not found_buzz_threads:
         print("No buzzer threads found for those subreddits!")
 
 
@@ -52,6 +459,101 @@ if __name__ == "__main__":
         default=None,
         help="The output filename to save threads results.",
     )
+    parser.add_argument(
+        "-c",
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help="Maximum number of subreddits fetched at the same time.",
+    )
+    parser.add_argument(
+        "-k",
+        "--cache_file",
+        default=None,
+        help="SQLite file to keep the subreddit pages cache between executions.",
+    )
+    parser.add_argument(
+        "-p",
+        "--parser",
+        choices=("auto",) + PARSER_BACKENDS,
+        default=DEFAULT_PARSER_BACKEND,
+        help="The HTML parser backend (auto uses the fastest installed one).",
+    )
+    parser.add_argument(
+        "-n",
+        "--pages",
+        type=int,
+        default=DEFAULT_MAXIMUM_PAGES,
+        help="Maximum number of listing pages crawled in each subreddit.",
+    )
+    parser.add_argument(
+        "-s",
+        "--sort",
+        choices=REDDIT_SORTS,
+        default=DEFAULT_SORT,
+        help="The listing sort (on 'top' the crawler stops at the first page without buzz threads).",
+    )
+    parser.add_argument(
+        "-b",
+        "--backend",
+        choices=LISTING_BACKENDS,
+        default=DEFAULT_LISTING_BACKEND,
+        help="Fetch the JSON listings (falling back to HTML) or the HTML listings.",
+    )
+    parser.add_argument(
+        "-o",
+        "--output_format",
+        choices=OUTPUT_FORMATS,
+        default="text",
+        help="The format of the output file.",
+    )
+    parser.add_argument(
+        "-m",
+        "--multireddit_size",
+        type=int,
+        default=DEFAULT_MULTIREDDIT_SIZE,
+        help="Maximum number of subreddits fetched together as a multireddit ('a+b+c').",
+    )
+    parser.add_argument(
+        "-t",
+        "--stream",
+        action="store_true",
+        help="Parse the HTML listings while they are downloaded (requires lxml).",
+    )
+    parser.add_argument(
+        "-l",
+        "--limit",
+        type=int,
+        default=None,
+        help="Show only the threads with the highest scores across all subreddits (eg. top 10).",
+    )
+    parser.add_argument(
+        "-x",
+        "--index_file",
+        nargs="?",
+        const=THREAD_INDEX_FILENAME,
+        default=None,
+        help=f"Index the crawled threads in a SQLite file (default: {THREAD_INDEX_FILENAME}), "
+        "searched with 'thread_index.py search'.",
+    )
     args = parser.parse_args()
+    if args.concurrency < 1:
+        parser.error(f"Concurrency should be positive! Received {args.concurrency}.")
 
-    main(args.subreddits, args.output_filename)
+    main(
+        args.subreddits,
+        args.output_filename,
+        args.cache_file,
+        CrawlerOptions(
+            args.concurrency,
+            args.parser,
+            args.pages,
+            args.sort,
+            args.backend,
+            args.multireddit_size,
+            args.stream,
+            args.limit,
+        ),
+        args.output_format,
+        args.index_file,
+    )
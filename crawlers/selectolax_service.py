@@ -0,0 +1,137 @@
+from typing import List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from selectolax.lexbor import LexborHTMLParser, LexborNode
+
+from constants import BUZZ_THREAD_THRESHOLD, REDDIT_LISTING_ID
+from models import RedditThread
+
+
+class SelectolaxService:
+    def __init__(self, page: str) -> None:
+        """Initializes the selectolax service, an alternative to `BeautifulSoupService` that
+        parses the page with the lexbor C HTML parser and finds the elements with CSS selectors.
+
+        Args:
+            page (str): The html page.
+        """
+        self.tree = LexborHTMLParser(page)
+
+    def _get_reddit_threads(self) -> List[LexborNode]:
+        """Get the list of threads in reddit page.
+
+        Returns:
+            List[LexborNode]: The list of threads in a reddit page (empty when the page has no
+            listing, eg. the over 18 gate or a banned subreddit).
+        """
+        site_table = self.tree.css_first(f"#{REDDIT_LISTING_ID}")
+        if site_table is None:
+            return []
+        return site_table.css("div.thing")
+
+    def get_next_page_cursor(self) -> Optional[str]:
+        """Get the cursor (`after` parameter) of the next listing page.
+
+        Returns:
+            Optional[str]: The fullname of the last thread of the page or None if it is the last page.
+        """
+        next_link = self.tree.css_first("span.next-button a")
+        if next_link is None:
+            return None
+        next_page_address = next_link.attributes.get("href") or ""
+        return parse_qs(urlparse(next_page_address).query).get("after", [None])[0]
+
+    def _get_reddit_thread_score(self, reddit_thread: LexborNode) -> int:
+        """Get the score of a reddit thread.
+
+        The `data-score` attribute of the thread is used; the score div is only searched when
+        the attribute is missing.
+
+        Args:
+            reddit_thread (LexborNode): The reddit thread node.
+
+        Returns:
+            int: The score of the thread or None if not score found.
+        """
+        score = reddit_thread.attributes.get("data-score")
+        if score is None:
+            score_div = reddit_thread.css_first("div.score.unvoted")
+            if score_div is None or score_div.text(deep=False) == "•":
+                return 0
+            score = score_div.attributes.get("title")
+        try:
+            return int(score)
+        except (ValueError, TypeError):
+            print(
+                f"Impossible to find score for thread {reddit_thread.attributes.get('data-permalink')}"
+            )
+            return None
+
+    def _get_reddit_thread_rank_and_title(
+        self, reddit_thread: LexborNode
+    ) -> Tuple[str, str]:
+        """Get the rank and the title of a reddit thread, with a single selector query.
+
+        Args:
+            reddit_thread (LexborNode): The reddit thread node.
+
+        Returns:
+            Tuple[str, str]: The rank and the title of the thread.
+        """
+        rank = title = None
+        for node in reddit_thread.css("span.rank, a.title"):
+            if rank is None and node.tag == "span":
+                rank = node.text(deep=False)
+            elif title is None and node.tag == "a":
+                title = node.text(deep=False)
+        return rank, title
+
+    def _extract_reddit_thread(
+        self, reddit_thread: LexborNode, threshold: int
+    ) -> Optional[RedditThread]:
+        """Extract a reddit thread, if it is a buzz thread.
+
+        The score is read first, so the threads below the threshold are rejected before any
+        other field is searched.
+
+        Args:
+            reddit_thread (LexborNode): The reddit thread node.
+            threshold (int): The minimum score of a buzz thread.
+
+        Returns:
+            Optional[RedditThread]: The thread or None if it is not a buzz thread.
+        """
+        reddit_thread_score = self._get_reddit_thread_score(reddit_thread)
+        if not reddit_thread_score or reddit_thread_score < threshold:
+            return None
+        reddit_thread_rank, reddit_thread_title = (
+            self._get_reddit_thread_rank_and_title(reddit_thread)
+        )
+        attributes = reddit_thread.attributes
+        reddit_thread_link = attributes.get("data-permalink")
+        return RedditThread(
+            rank=reddit_thread_rank,
+            score=reddit_thread_score,
+            subreddit=attributes.get("data-subreddit"),
+            title=reddit_thread_title,
+            comments_link=reddit_thread_link,
+            thread_link=reddit_thread_link,
+        )
+
+    def get_reddit_buzz_threads(
+        self, threshold: int = BUZZ_THREAD_THRESHOLD
+    ) -> List[RedditThread]:
+        """Get the list of buzz threads (score greater than threshold - default is 5000).
+
+        Args:
+            threshold (int, optional): The minimum score of a buzz thread. Defaults to BUZZ_THREAD_THRESHOLD.
+
+        Returns:
+            List[RedditThread]: A list with all threads that satisfies the requirement of a buzz thread.
+        """
+        reddit_buzz_threads_list = []
+        for reddit_thread in self._get_reddit_threads():
+            reddit_buzz_thread = self._extract_reddit_thread(reddit_thread, threshold)
+            if reddit_buzz_thread is not None:
+                reddit_buzz_threads_list.append(reddit_buzz_thread)
+        return reddit_buzz_threads_list
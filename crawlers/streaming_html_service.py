@@ -0,0 +1,193 @@
+from typing import List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from lxml import etree
+
+from constants import BUZZ_THREAD_THRESHOLD, REDDIT_LISTING_ID
+from models import RedditThread
+
+
+class StreamingHtmlService:
+    def __init__(self, threshold: int = BUZZ_THREAD_THRESHOLD) -> None:
+        """Initializes the streaming service, an alternative to `BeautifulSoupService` that
+        parses the page incrementally (with the lxml pull parser) while it is downloaded.
+
+        Each thread of the listing is extracted as soon as its closing tag is fed, and then
+        removed from the tree, so the tree of the whole page is never built. The page text is
+        still kept by the requests repository (for the response cache and the fingerprint of
+        the parsed threads cache), and the threads are only used once the page is downloaded.
+
+        Args:
+            threshold (int, optional): The minimum score of the extracted threads (the others
+            are dropped before their rank and title are searched). Defaults to BUZZ_THREAD_THRESHOLD.
+        """
+        self.parser = etree.HTMLPullParser(events=("start", "end"))
+        self.threshold = threshold
+        self.started = False
+        self.inside_listing = False
+        self.reddit_threads: List[RedditThread] = []
+        self.next_page_cursor = None
+
+    def _has_class(self, node: etree._Element, class_name: str) -> bool:
+        """Check if a node has a class.
+
+        Args:
+            node (etree._Element): The node.
+            class_name (str): The class name.
+
+        Returns:
+            bool: True if the class is in the node classes.
+        """
+        return class_name in (node.get("class") or "").split()
+
+    def _get_reddit_thread_score(self, reddit_thread: etree._Element) -> int:
+        """Get the score of a reddit thread.
+
+        The `data-score` attribute of the thread is used; the score div is only searched when
+        the attribute is missing.
+
+        Args:
+            reddit_thread (etree._Element): The reddit thread element.
+
+        Returns:
+            int: The score of the thread or None if not score found.
+        """
+        score = reddit_thread.get("data-score")
+        if score is None:
+            score_div = next(
+                (
+                    node
+                    for node in reddit_thread.iter("div")
+                    if self._has_class(node, "score")
+                    and self._has_class(node, "unvoted")
+                ),
+                None,
+            )
+            if score_div is None or score_div.text == "•":
+                return 0
+            score = score_div.get("title")
+        try:
+            return int(score)
+        except (ValueError, TypeError):
+            print(
+                f"Impossible to find score for thread {reddit_thread.get('data-permalink')}"
+            )
+            return None
+
+    def _get_reddit_thread_rank_and_title(
+        self, reddit_thread: etree._Element
+    ) -> Tuple[str, str]:
+        """Get the rank and the title of a reddit thread, in a single traversal of the thread.
+
+        Args:
+            reddit_thread (etree._Element): The reddit thread element.
+
+        Returns:
+            Tuple[str, str]: The rank and the title of the thread.
+        """
+        rank = title = None
+        for node in reddit_thread.iter("span", "a"):
+            if rank is None and node.tag == "span" and self._has_class(node, "rank"):
+                rank = node.text or ""
+            elif title is None and node.tag == "a" and self._has_class(node, "title"):
+                title = node.text or ""
+            if rank is not None and title is not None:
+                break
+        return rank, title
+
+    def _extract_reddit_thread(self, reddit_thread: etree._Element) -> None:
+        """Extract a closed reddit thread (when it is a buzz thread) and drop it from the tree.
+
+        The score is read first, so the threads below the threshold are rejected before any
+        other field is searched.
+
+        Args:
+            reddit_thread (etree._Element): The reddit thread element.
+        """
+        reddit_thread_score = self._get_reddit_thread_score(reddit_thread)
+        if reddit_thread_score and reddit_thread_score >= self.threshold:
+            reddit_thread_rank, reddit_thread_title = (
+                self._get_reddit_thread_rank_and_title(reddit_thread)
+            )
+            reddit_thread_link = reddit_thread.get("data-permalink")
+            self.reddit_threads.append(
+                RedditThread(
+                    rank=reddit_thread_rank,
+                    score=reddit_thread_score,
+                    subreddit=reddit_thread.get("data-subreddit"),
+                    title=reddit_thread_title,
+                    comments_link=reddit_thread_link,
+                    thread_link=reddit_thread_link,
+                )
+            )
+        reddit_thread.clear()
+        parent = reddit_thread.getparent()
+        while reddit_thread.getprevious() is not None:
+            del parent[0]
+
+    def _set_next_page_cursor(self, next_button: etree._Element) -> None:
+        """Keep the cursor (`after` parameter) of the next listing page.
+
+        Args:
+            next_button (etree._Element): The closed `next-button` span.
+        """
+        next_link = next_button.find(".//a")
+        if next_link is not None:
+            self.next_page_cursor = parse_qs(
+                urlparse(next_link.get("href") or "").query
+            ).get("after", [None])[0]
+
+    def _handle_events(self) -> None:
+        """Handle the parser events of the data fed so far."""
+        for event, node in self.parser.read_events():
+            if node.get("id") == REDDIT_LISTING_ID:
+                self.inside_listing = event == "start"
+            elif event != "end" or not self.inside_listing:
+                continue
+            elif node.tag == "div" and self._has_class(node, "thing"):
+                self._extract_reddit_thread(node)
+            elif node.tag == "span" and self._has_class(node, "next-button"):
+                self._set_next_page_cursor(node)
+
+    def feed(self, chunk: str) -> None:
+        """Parse a chunk of the page, extracting the threads closed in it.
+
+        Args:
+            chunk (str): The next chunk of the html page.
+        """
+        self.started = True
+        self.parser.feed(chunk)
+        self._handle_events()
+
+    def close(self) -> None:
+        """Finish parsing the page."""
+        self.parser.close()
+        self._handle_events()
+
+    def get_next_page_cursor(self) -> Optional[str]:
+        """Get the cursor (`after` parameter) of the next listing page.
+
+        Returns:
+            Optional[str]: The fullname of the last thread of the page or None if it is the last page.
+        """
+        return self.next_page_cursor
+
+    def get_reddit_buzz_threads(
+        self, threshold: int = BUZZ_THREAD_THRESHOLD
+    ) -> List[RedditThread]:
+        """Get the list of buzz threads (score greater than threshold - default is 5000).
+
+        Only the threads with a score above the service threshold were extracted, so a lower
+        threshold returns the same threads.
+
+        Args:
+            threshold (int, optional): The minimum score of a buzz thread. Defaults to BUZZ_THREAD_THRESHOLD.
+
+        Returns:
+            List[RedditThread]: A list with all threads that satisfies the requirement of a buzz thread.
+        """
+        return [
+            reddit_thread
+            for reddit_thread in self.reddit_threads
+            if reddit_thread.score >= threshold
+        ]
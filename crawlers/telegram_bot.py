@@ -1,11 +1,21 @@
 import logging
+from typing import Iterator, List, Optional
 
 from telegram import Update
 from telegram.ext import CallbackContext, CommandHandler, Updater
 
-from constants import TELEGRAM_API_KEY
+from constants import (
+    TELEGRAM_API_KEY,
+    TELEGRAM_THREAD_INDEX_FILENAME,
+    TELEGRAM_WORKERS,
+)
+from models import CrawlerOptions, RedditThread
+from query_coalescer import query_coalescer
 from repositories import utils_repository
-from scrapper import crawler_reddit
+from scrapper import crawler_reddit, iter_crawler_reddit
+from thread_index import thread_index
+from thread_ranking import TopThreadsRanking
+from thread_state_store import ThreadStateStore
 
 logging.basicConfig(
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s", level=logging.INFO
@@ -14,14 +24,80 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def _create_buzz_threads_messages(buzz_thread_list: List[RedditThread]) -> List[str]:
+    """Create the batched telegram messages with the buzzer threads.
+
+    Args:
+        buzz_thread_list (List[RedditThread]): The buzzer threads.
+
+    Returns:
+        List[str]: The telegram messages.
+    """
+    telegram_message_list = utils_repository.create_list_of_messages_to_telegram(
+        buzz_thread_list
+    )
+    return utils_repository.batch_telegram_messages(telegram_message_list)
+
+
+def _iter_buzz_threads_messages(
+    subreddits: str, limit: Optional[int] = None
+) -> Iterator[List[str]]:
+    """Call the crawler and create the batched telegram messages with the buzzer threads of
+    each page, as soon as the page is parsed (or, with a limit, with the top threads once all
+    subreddits are ranked).
+
+    Args:
+        subreddits (str): The normalized subreddits, separated by ';'.
+        limit (Optional[int], optional): Number of top threads to send. Defaults to None (all).
+
+    Yields:
+        Iterator[List[str]]: The telegram messages of each page.
+    """
+    if limit:
+        yield _create_buzz_threads_messages(
+            crawler_reddit(subreddits, CrawlerOptions(limit=limit))
+        )
+        return
+    for buzz_thread_list in iter_crawler_reddit(subreddits):
+        yield _create_buzz_threads_messages(buzz_thread_list)
+
+
+def _rank_top_threads(
+    buzz_thread_list: List[RedditThread], limit: Optional[int]
+) -> List[RedditThread]:
+    """Keep only the top threads of a list, when there is a limit.
+
+    Args:
+        buzz_thread_list (List[RedditThread]): The buzzer threads.
+        limit (Optional[int]): Number of top threads to keep (None keeps all).
+
+    Returns:
+        List[RedditThread]: The top threads, ranked from "1", or all threads without a limit.
+    """
+    if not limit:
+        return buzz_thread_list
+    ranking = TopThreadsRanking(limit)
+    ranking.push(buzz_thread_list)
+    return ranking.get_top_threads()
+
+
 def nada_pra_fazer(update: Update, context: CallbackContext) -> None:
     """Call the crawler and returns the buzzer threads to telegram.
 
+    Runs in the dispatcher worker pool (so a slow crawl does not block the other chats). When
+    the crawler daemon crawled all subreddits recently, its results are sent without crawling;
+    else the crawl is shared with identical queries already running and the buzzer threads are
+    sent as soon as each page is parsed. A number after the subreddits (eg. `/NadaPraFazer
+    programming;dogs 10`) sends only the threads with the highest scores across the subreddits.
+
     Args:
         update (Update): The telegram update object.
         context (CallbackContext): The telegram callback context object.
     """
     subreddits = update.message.text.split()
+    limit = (
+        int(subreddits[2]) if len(subreddits) > 2 and subreddits[2].isdigit() else None
+    )
     if len(subreddits) == 1:
         update.message.reply_text(
             "You don't informed me any subreddit. I will try /r/random, just a moment!"
@@ -32,24 +108,52 @@ def nada_pra_fazer(update: Update, context: CallbackContext) -> None:
         update.message.reply_text(
             "Ok, I will search for the buzzer threads in those subreddits, just a moment!"
         )
-    buzz_thread_list = crawler_reddit(subreddits)
-    telegram_message_list = utils_repository.create_list_of_messages_to_telegram(
-        buzz_thread_list
+    subreddits = utils_repository.normalize_subreddits(subreddits)
+    thread_state_store: ThreadStateStore = context.bot_data["thread_state_store"]
+    fresh_buzz_threads = thread_state_store.get_fresh_buzz_threads(
+        utils_repository.split_string(subreddits)
     )
-    if len(telegram_message_list) == 0:
+    if fresh_buzz_threads is not None:
+        telegram_messages_stream = [
+            _create_buzz_threads_messages(_rank_top_threads(fresh_buzz_threads, limit))
+        ]
+    else:
+        telegram_messages_stream = query_coalescer.stream(
+            f"{subreddits} {limit}" if limit else subreddits,
+            _iter_buzz_threads_messages,
+            subreddits,
+            limit,
+        )
+    found_buzz_threads = False
+    for telegram_message_list in telegram_messages_stream:
+        if not telegram_message_list:
+            continue
+        for telegram_message in telegram_message_list:
+            update.message.reply_text(telegram_message)
+        found_buzz_threads = True
+    if not found_buzz_threads:
         update.message.reply_text(
             "There is no buzzer threads in selected subreddits. Try other subreddits!"
         )
-    for telegram_message in telegram_message_list:
-        update.message.reply_text(telegram_message)
 
 
-def main() -> None:
-    """Start the bot."""
-    updater = Updater(TELEGRAM_API_KEY)
+def main(index_filename: str = TELEGRAM_THREAD_INDEX_FILENAME) -> None:
+    """Start the bot.
+
+    Args:
+        index_filename (str, optional): SQLite file where the threads crawled by the bot are
+        indexed. Defaults to TELEGRAM_THREAD_INDEX_FILENAME (None, no index).
+    """
+    if index_filename:
+        thread_index.open_database(index_filename)
+    updater = Updater(TELEGRAM_API_KEY, workers=TELEGRAM_WORKERS)
 
     dispatcher = updater.dispatcher
-    dispatcher.add_handler(CommandHandler("NadaPraFazer", nada_pra_fazer))
+    thread_state_store = ThreadStateStore()
+    dispatcher.bot_data["thread_state_store"] = thread_state_store
+    dispatcher.add_handler(
+        CommandHandler("NadaPraFazer", nada_pra_fazer, run_async=True)
+    )
 
     updater.start_polling()
 
@@ -57,6 +161,8 @@ def main() -> None:
     # SIGTERM or SIGABRT. This should be used most of the time, since
     # start_polling() is non-blocking and will stop the bot gracefully.
     updater.idle()
+    thread_state_store.close()
+    thread_index.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,124 @@
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from threading import Lock, Thread
+from typing import Dict, Iterator, List, Tuple
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+FIXTURES_DIRECTORY = Path(__file__).resolve().parent / "fixtures"
+
+
+class LocalRedditServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self) -> None:
+        """Initializes a local stand-in for reddit, serving registered responses over keep-alive
+        connections and counting the connections and requests it receives.
+        """
+        super().__init__(("127.0.0.1", 0), LocalRedditRequestHandler)
+        self.responses: Dict[str, List[Tuple[int, Dict[str, str], bytes]]] = {}
+        self.connections = 0
+        self.requests: List[str] = []
+        self.request_headers: List[Dict[str, str]] = []
+        self.lock = Lock()
+
+    @property
+    def base_address(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def add_response(
+        self, path: str, body: str, status: int = 200, headers: Dict[str, str] = None
+    ) -> None:
+        """Queue a response to a path; the last response of a path is repeated.
+
+        Args:
+            path (str): The requested path (with the query).
+            body (str): The response body.
+            status (int, optional): The response status code. Defaults to 200.
+            headers (Dict[str, str], optional): Extra response headers. Defaults to None.
+        """
+        self.responses.setdefault(path, []).append(
+            (status, headers or {}, body.encode())
+        )
+
+    def get_response(
+        self, path: str, headers: Dict[str, str]
+    ) -> Tuple[int, Dict[str, str], bytes]:
+        with self.lock:
+            self.requests.append(path)
+            self.request_headers.append(headers)
+            path_responses = self.responses.get(path)
+            if not path_responses:
+                return 404, {}, b""
+            if len(path_responses) > 1:
+                return path_responses.pop(0)
+            return path_responses[0]
+
+
+class LocalRedditRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self) -> None:
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_GET(self) -> None:
+        status, headers, body = self.server.get_response(
+            self.path, dict(self.headers.items())
+        )
+        self.send_response(status)
+        for header, value in headers.items():
+            self.send_header(header, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def local_server() -> Iterator[LocalRedditServer]:
+    server = LocalRedditServer()
+    server_thread = Thread(target=server.serve_forever, daemon=True)
+    server_thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def reddit_server(local_server, monkeypatch) -> LocalRedditServer:
+    """The local server in place of reddit, with new requests repository and caches."""
+    import repositories
+    import scrapper
+    from response_cache import ParsedThreadsCache
+
+    monkeypatch.setattr(repositories, "REDDIT_BASE_ADDRESS", local_server.base_address)
+    monkeypatch.setattr(
+        scrapper, "requests_repository", repositories.RequestsRepository()
+    )
+    monkeypatch.setattr(scrapper, "parsed_threads_cache", ParsedThreadsCache())
+    return local_server
+
+
+@pytest.fixture
+def listing_page() -> str:
+    with open(FIXTURES_DIRECTORY / "listing.html", encoding="utf-8") as listing_file:
+        return listing_file.read()
+
+
+@pytest.fixture
+def no_listing_page() -> str:
+    with open(FIXTURES_DIRECTORY / "no_listing.html", encoding="utf-8") as page_file:
+        return page_file.read()
+
+
+@pytest.fixture(params=["listing.html", "no_listing.html"])
+def saved_page(request) -> str:
+    with open(FIXTURES_DIRECTORY / request.param, encoding="utf-8") as page_file:
+        return page_file.read()
@@ -0,0 +1,66 @@
+import sqlite3
+
+import pytest
+
+import scrapper
+from crawler_daemon import CrawlerDaemon
+from models import CrawlerOptions
+from thread_state_store import ThreadStateStore
+
+
+@pytest.fixture
+def thread_state_store(tmp_path):
+    thread_state_store = ThreadStateStore(str(tmp_path / "crawler_state.db"))
+    yield thread_state_store
+    thread_state_store.close()
+
+
+def test_crawl_once_shows_only_new_or_changed_threads(
+    reddit_server, listing_page, thread_state_store, monkeypatch
+):
+    monkeypatch.setattr(scrapper.requests_repository.response_cache, "ttl", -1)
+    listing_page = listing_page.replace('<span class="next-button">', "<span>")
+    reddit_server.add_response("/r/cats", listing_page)
+    reddit_server.add_response("/r/cats", listing_page)
+    reddit_server.add_response(
+        "/r/cats", listing_page.replace('data-score="5000"', 'data-score="5100"')
+    )
+    crawler_daemon = CrawlerDaemon(
+        "cats", thread_state_store, options=CrawlerOptions(listing_backend="html")
+    )
+
+    first_crawl = crawler_daemon.crawl_once()
+    unchanged_crawl = crawler_daemon.crawl_once()
+    changed_crawl = crawler_daemon.crawl_once()
+
+    assert len(first_crawl) == 3
+    assert unchanged_crawl == []
+    assert [
+        (reddit_thread.title, reddit_thread.score) for reddit_thread in changed_crawl
+    ] == [("Exactly the threshold — açaí", 5100)]
+    assert len(reddit_server.requests) == 3
+
+
+def test_run_forever_keeps_running_after_a_failed_crawl(
+    thread_state_store, monkeypatch
+):
+    crawl_results = [
+        RuntimeError("parse error"),
+        sqlite3.OperationalError("locked"),
+        [],
+    ]
+    crawler_daemon = CrawlerDaemon("cats", thread_state_store, interval=0)
+
+    def crawl_once():
+        if not crawl_results:
+            raise KeyboardInterrupt
+        crawl_result = crawl_results.pop(0)
+        if isinstance(crawl_result, Exception):
+            raise crawl_result
+        return crawl_result
+
+    monkeypatch.setattr(crawler_daemon, "crawl_once", crawl_once)
+
+    with pytest.raises(KeyboardInterrupt):
+        crawler_daemon.run_forever()
+    assert crawl_results == []
@@ -0,0 +1,68 @@
+import pytest
+
+from html_services import (
+    AVAILABLE_PARSER_BACKENDS,
+    create_html_service,
+    create_streaming_html_service,
+)
+
+EXPECTED_TITLES = [
+    'Tom & Jerry "reunited" — gatos <3',
+    "Score only in the score div",
+    "Exactly the threshold — açaí",
+]
+
+
+def _parse(listing_page, parser_backend, threshold):
+    if not AVAILABLE_PARSER_BACKENDS[parser_backend]:
+        pytest.skip(f"{parser_backend} is not installed")
+    html_service = create_html_service(listing_page, parser_backend)
+    return (
+        html_service.get_reddit_buzz_threads(threshold),
+        html_service.get_next_page_cursor(),
+    )
+
+
+def test_buzz_threads_of_the_listing(listing_page):
+    reddit_threads, next_page_cursor = _parse(listing_page, "html.parser", 5000)
+
+    assert [reddit_thread.title for reddit_thread in reddit_threads] == EXPECTED_TITLES
+    assert [reddit_thread.score for reddit_thread in reddit_threads] == [
+        12034,
+        7500,
+        5000,
+    ]
+    assert [reddit_thread.rank for reddit_thread in reddit_threads] == ["1", "3", "5"]
+    assert next_page_cursor == "t3_a6"
+
+
+@pytest.mark.parametrize("parser_backend", ["selectolax", "lxml", "html.parser"])
+def test_page_without_listing_has_no_threads(no_listing_page, parser_backend):
+    assert _parse(no_listing_page, parser_backend, 1) == ([], None)
+
+
+@pytest.mark.parametrize("parser_backend", ["selectolax", "lxml"])
+@pytest.mark.parametrize("threshold", [5000, 1])
+def test_parser_backends_extract_the_same_threads(
+    saved_page, parser_backend, threshold
+):
+    assert _parse(saved_page, parser_backend, threshold) == _parse(
+        saved_page, "html.parser", threshold
+    )
+
+
+@pytest.mark.parametrize("chunk_size", [1, 97, 16 * 1024])
+@pytest.mark.parametrize("threshold", [5000, 1])
+def test_streaming_service_extracts_the_same_threads(saved_page, chunk_size, threshold):
+    streaming_service = create_streaming_html_service(threshold)
+    if streaming_service is None:
+        pytest.skip("lxml is not installed")
+
+    for chunk_start in range(0, len(saved_page), chunk_size):
+        streaming_service.feed(saved_page[chunk_start : chunk_start + chunk_size])
+    streaming_service.close()
+
+    assert (
+        streaming_service.get_reddit_buzz_threads(threshold),
+        streaming_service.get_next_page_cursor(),
+    ) == _parse(saved_page, "html.parser", threshold)
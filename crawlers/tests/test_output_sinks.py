@@ -0,0 +1,27 @@
+import csv
+
+import pytest
+
+from models import RedditThread
+from output_sinks import OutputSink, create_output_sink
+
+REDDIT_THREAD = RedditThread(
+    "1", 12034, "cats", "Two lines\nof title", "/r/cats/a1/", "/r/cats/a1/"
+)
+
+
+def test_output_sink_cannot_be_created_without_its_methods():
+    with pytest.raises(TypeError):
+        OutputSink("threads.txt")
+
+
+def test_csv_rows_are_read_back_unchanged(tmp_path):
+    filename = tmp_path / "threads.csv"
+
+    with create_output_sink(str(filename), "csv") as output_sink:
+        output_sink.write([REDDIT_THREAD])
+
+    with open(filename, newline="", encoding="utf-8") as csv_file:
+        rows = list(csv.reader(csv_file))
+    assert rows == [list(RedditThread._fields), [str(field) for field in REDDIT_THREAD]]
+    assert b"\r\r\n" not in filename.read_bytes()
@@ -0,0 +1,96 @@
+from threading import Event
+
+import pytest
+
+from query_coalescer import QueryCoalescer
+
+
+class PacedQuery:
+    def __init__(self, number_of_items, error=None):
+        """A query that yields each item only when it is released."""
+        self.number_of_items = number_of_items
+        self.error = error
+        self.releases = [Event() for _ in range(number_of_items + 1)]
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        for item in range(self.number_of_items):
+            assert self.releases[item].wait(5)
+            yield item
+        assert self.releases[self.number_of_items].wait(5)
+        if self.error is not None:
+            raise self.error
+
+    def release_all(self):
+        for release in self.releases:
+            release.set()
+
+
+def test_identical_queries_share_one_execution():
+    query_coalescer = QueryCoalescer()
+    paced_query = PacedQuery(3)
+
+    leader_stream = query_coalescer.stream("cats", paced_query)
+    follower_stream = query_coalescer.stream("cats", paced_query)
+    paced_query.release_all()
+
+    assert list(leader_stream) == [0, 1, 2]
+    assert list(follower_stream) == [0, 1, 2]
+    assert paced_query.calls == 1
+
+
+def test_late_follower_reads_from_the_first_result():
+    query_coalescer = QueryCoalescer()
+    paced_query = PacedQuery(3)
+    leader_stream = query_coalescer.stream("cats", paced_query)
+    paced_query.releases[0].set()
+    paced_query.releases[1].set()
+    assert [next(leader_stream), next(leader_stream)] == [0, 1]
+
+    follower_stream = query_coalescer.stream("cats", paced_query)
+    paced_query.release_all()
+
+    assert list(follower_stream) == [0, 1, 2]
+    assert list(leader_stream) == [2]
+    assert paced_query.calls == 1
+
+
+def test_failed_query_raises_the_error_to_every_reader():
+    query_coalescer = QueryCoalescer()
+    paced_query = PacedQuery(2, error=RuntimeError("reddit is down"))
+
+    leader_stream = query_coalescer.stream("cats", paced_query)
+    follower_stream = query_coalescer.stream("cats", paced_query)
+    paced_query.release_all()
+
+    for shared_stream in (leader_stream, follower_stream):
+        received_items = []
+        with pytest.raises(RuntimeError, match="reddit is down"):
+            for item in shared_stream:
+                received_items.append(item)
+        assert received_items == [0, 1]
+
+
+def test_follower_reads_all_results_when_the_leader_stops_reading():
+    query_coalescer = QueryCoalescer()
+    paced_query = PacedQuery(3)
+    leader_stream = query_coalescer.stream("cats", paced_query)
+    follower_stream = query_coalescer.stream("cats", paced_query)
+    paced_query.releases[0].set()
+    assert next(leader_stream) == 0
+    del leader_stream
+
+    paced_query.release_all()
+
+    assert list(follower_stream) == [0, 1, 2]
+
+
+def test_finished_query_is_executed_again():
+    query_coalescer = QueryCoalescer()
+    paced_query = PacedQuery(1)
+    paced_query.release_all()
+
+    assert list(query_coalescer.stream("cats", paced_query)) == [0]
+    assert list(query_coalescer.stream("cats", paced_query)) == [0]
+    assert paced_query.calls == 2
@@ -0,0 +1,44 @@
+from repositories import RequestsRepository
+
+
+def test_requests_to_the_same_host_reuse_one_connection(local_server):
+    local_server.add_response("/r/cats", "<html></html>")
+    requests_repository = RequestsRepository()
+
+    for _ in range(5):
+        response = requests_repository.make_get_request(
+            f"{local_server.base_address}/r/cats", use_cache=False
+        )
+        assert response == "<html></html>"
+
+    assert len(local_server.requests) == 5
+    assert local_server.connections == 1
+
+
+def test_too_many_requests_pauses_the_host_and_is_tried_again(local_server):
+    local_server.add_response("/r/cats", "", status=429, headers={"Retry-After": "0"})
+    local_server.add_response("/r/cats", "<html></html>")
+    requests_repository = RequestsRepository()
+
+    response = requests_repository.make_get_request(
+        f"{local_server.base_address}/r/cats", use_cache=False
+    )
+
+    assert response == "<html></html>"
+    assert len(local_server.requests) == 2
+    host_bucket = requests_repository.rate_limiter.buckets[
+        local_server.base_address.split("//")[1]
+    ]
+    assert host_bucket.paused_until > 0
+
+
+def test_failed_requests_are_tried_maximum_tries_times(local_server):
+    local_server.add_response("/r/cats", "", status=429, headers={"Retry-After": "0"})
+    requests_repository = RequestsRepository()
+
+    response = requests_repository.make_get_request(
+        f"{local_server.base_address}/r/cats", maximum_tries=3, use_cache=False
+    )
+
+    assert response is None
+    assert len(local_server.requests) == 3
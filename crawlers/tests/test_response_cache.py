@@ -0,0 +1,98 @@
+from time import time
+
+from repositories import RequestsRepository
+from response_cache import ResponseCache
+
+VALIDATORS = {"ETag": '"v1"', "Last-Modified": "Sun, 01 May 2022 18:30:00 GMT"}
+
+
+def _requests_repository(response_cache):
+    requests_repository = RequestsRepository()
+    requests_repository.response_cache = response_cache
+    return requests_repository
+
+
+def test_fresh_response_is_served_without_requests(local_server):
+    local_server.add_response("/r/cats", "<html>v1</html>")
+    requests_repository = _requests_repository(ResponseCache(ttl=60))
+    url = f"{local_server.base_address}/r/cats"
+
+    assert requests_repository.make_get_request(url) == "<html>v1</html>"
+    assert requests_repository.make_get_request(url) == "<html>v1</html>"
+    assert len(local_server.requests) == 1
+
+
+def test_expired_response_is_revalidated_and_refreshed_on_not_modified(
+    local_server,
+):
+    local_server.add_response("/r/cats", "<html>v1</html>", headers=VALIDATORS)
+    local_server.add_response("/r/cats", "", status=304)
+    response_cache = ResponseCache(ttl=-1)
+    requests_repository = _requests_repository(response_cache)
+    url = f"{local_server.base_address}/r/cats"
+
+    requests_repository.make_get_request(url)
+    stored_at = response_cache.get(url).stored_at
+    revalidated_response = requests_repository.make_get_request(url)
+
+    assert revalidated_response == "<html>v1</html>"
+    assert local_server.request_headers[1]["If-None-Match"] == '"v1"'
+    assert (
+        local_server.request_headers[1]["If-Modified-Since"]
+        == VALIDATORS["Last-Modified"]
+    )
+    assert response_cache.get(url).stored_at > stored_at
+    assert response_cache.get(url).etag == '"v1"'
+
+
+def test_expired_response_is_replaced_when_the_page_changed(local_server):
+    local_server.add_response("/r/cats", "<html>v1</html>", headers=VALIDATORS)
+    local_server.add_response("/r/cats", "<html>v2</html>", headers={"ETag": '"v2"'})
+    response_cache = ResponseCache(ttl=-1)
+    requests_repository = _requests_repository(response_cache)
+    url = f"{local_server.base_address}/r/cats"
+
+    requests_repository.make_get_request(url)
+
+    assert requests_repository.make_get_request(url) == "<html>v2</html>"
+    assert response_cache.get(url).etag == '"v2"'
+
+
+def test_least_recently_used_response_is_evicted():
+    response_cache = ResponseCache(maximum_size=2)
+    response_cache.set("/r/a", "a", {})
+    response_cache.set("/r/b", "b", {})
+    response_cache.get("/r/a")
+
+    response_cache.set("/r/c", "c", {})
+
+    assert response_cache.get("/r/b") is None
+    assert response_cache.get("/r/a").text == "a"
+    assert response_cache.get("/r/c").text == "c"
+
+
+def test_responses_older_than_the_maximum_age_are_not_used():
+    response_cache = ResponseCache(maximum_age=60)
+    response_cache.set("/r/a", "a", VALIDATORS)
+    cached_response = response_cache.get("/r/a")
+    response_cache.memory_cache["/r/a"] = cached_response._replace(
+        stored_at=time() - 61
+    )
+
+    assert response_cache.get("/r/a") is None
+
+
+def test_responses_are_kept_in_sqlite_between_executions(local_server, tmp_path):
+    local_server.add_response("/r/cats", "<html>v1</html>", headers=VALIDATORS)
+    url = f"{local_server.base_address}/r/cats"
+    first_response_cache = ResponseCache(ttl=60)
+    first_response_cache.open_database(str(tmp_path / "responses.db"))
+    _requests_repository(first_response_cache).make_get_request(url)
+
+    second_response_cache = ResponseCache(ttl=60)
+    second_response_cache.open_database(str(tmp_path / "responses.db"))
+    second_response = _requests_repository(second_response_cache).make_get_request(url)
+
+    assert second_response == "<html>v1</html>"
+    assert second_response_cache.get(url).etag == '"v1"'
+    assert len(local_server.requests) == 1
@@ -0,0 +1,117 @@
+import json
+
+import pytest
+
+import scrapper
+from models import CrawlerOptions
+
+JSON_LISTING = json.dumps(
+    {
+        "data": {
+            "after": None,
+            "children": [
+                {
+                    "data": {
+                        "score": 6000,
+                        "subreddit": "cats",
+                        "title": "A JSON thread",
+                        "permalink": "/r/cats/comments/j1/a_json_thread/",
+                    }
+                }
+            ],
+        }
+    }
+)
+
+
+def test_json_listing_is_decoded_only_after_a_parsed_threads_cache_miss(
+    reddit_server, monkeypatch
+):
+    reddit_server.add_response("/r/cats/.json", JSON_LISTING)
+    decoded_pages = []
+    json_listing_service = scrapper.JsonListingService
+
+    def decode_json_listing(page, first_rank=1):
+        decoded_pages.append(page)
+        return json_listing_service(page, first_rank)
+
+    monkeypatch.setattr(scrapper, "JsonListingService", decode_json_listing)
+
+    first_crawl = scrapper.crawler_reddit(
+        "cats", CrawlerOptions(listing_backend="json")
+    )
+    second_crawl = scrapper.crawler_reddit(
+        "cats", CrawlerOptions(listing_backend="json")
+    )
+
+    assert first_crawl == second_crawl
+    assert [reddit_thread.title for reddit_thread in first_crawl] == ["A JSON thread"]
+    assert len(decoded_pages) == 1
+
+
+def test_crawl_keeps_the_html_listing_after_an_invalid_json_listing(
+    reddit_server, listing_page
+):
+    last_listing_page = listing_page.replace('<span class="next-button">', "<span>")
+    reddit_server.add_response("/r/cats/.json", "<html>not a JSON listing</html>")
+    reddit_server.add_response("/r/cats", listing_page)
+    reddit_server.add_response("/r/cats/?count=25&after=t3_a6", last_listing_page)
+
+    buzz_threads = scrapper.crawler_reddit(
+        "cats", CrawlerOptions(listing_backend="json", maximum_pages=3)
+    )
+
+    assert len(buzz_threads) == 6
+    assert reddit_server.requests == [
+        "/r/cats/.json",
+        "/r/cats",
+        "/r/cats/?count=25&after=t3_a6",
+    ]
+
+
+def test_threads_without_subreddit_are_attributed_to_the_first_subreddit(
+    reddit_server, listing_page
+):
+    listing_page = listing_page.replace(' data-subreddit="cats"', "")
+    reddit_server.add_response("/r/cats+dogs", listing_page)
+    reddit_server.add_response(
+        "/r/cats+dogs/?count=25&after=t3_a6",
+        listing_page.replace('<span class="next-button">', "<span>"),
+    )
+
+    subreddits_threads = {}
+    for subreddit_position, page_threads in scrapper.iter_crawler_reddit_pages(
+        "cats;dogs", CrawlerOptions(listing_backend="html", maximum_pages=2)
+    ):
+        subreddits_threads.setdefault(subreddit_position, []).extend(page_threads)
+
+    assert [len(subreddits_threads[0]), len(subreddits_threads[1])] == [4, 2]
+
+
+def test_cached_listing_is_not_streamed_to_the_parser_again(
+    reddit_server, listing_page, monkeypatch
+):
+    streaming_html_service = pytest.importorskip("streaming_html_service")
+    reddit_server.add_response(
+        "/r/cats", listing_page.replace('<span class="next-button">', "<span>")
+    )
+    fed_chunks = []
+    feed = streaming_html_service.StreamingHtmlService.feed
+
+    def count_fed_chunks(streaming_service, chunk):
+        fed_chunks.append(chunk)
+        feed(streaming_service, chunk)
+
+    monkeypatch.setattr(
+        streaming_html_service.StreamingHtmlService, "feed", count_fed_chunks
+    )
+    options = CrawlerOptions(listing_backend="html", stream_html=True)
+
+    first_crawl = scrapper.crawler_reddit("cats", options)
+    first_crawl_chunks = len(fed_chunks)
+    second_crawl = scrapper.crawler_reddit("cats", options)
+
+    assert len(first_crawl) == 3
+    assert first_crawl == second_crawl
+    assert first_crawl_chunks > 0
+    assert len(fed_chunks) == first_crawl_chunks
@@ -0,0 +1,96 @@
+from datetime import datetime
+
+import pytest
+
+from models import RedditThread
+from thread_index import ThreadIndex, _parse_datetime
+
+CAT_THREAD = RedditThread(
+    "1", 9000, "cats", "Grumpy cat meets açaí", "/r/cats/c1/", "/r/cats/c1/"
+)
+DOG_THREAD = RedditThread(
+    "2", 7000, "dogs", "Good dog learns a trick", "/r/dogs/d1/", "/r/dogs/d1/"
+)
+BRAZIL_THREAD = RedditThread(
+    "1", 12000, "Brazil", "Cats of Brazil", "/r/Brazil/b1/", "/r/Brazil/b1/"
+)
+
+
+@pytest.fixture
+def thread_index(tmp_path):
+    thread_index = ThreadIndex()
+    thread_index.open_database(str(tmp_path / "threads_index.db"))
+    thread_index.upsert([CAT_THREAD, DOG_THREAD], crawled_at=1000.0)
+    thread_index.upsert([BRAZIL_THREAD], crawled_at=2000.0)
+    yield thread_index
+    thread_index.close()
+
+
+def _titles(reddit_threads):
+    return [reddit_thread.title for reddit_thread in reddit_threads]
+
+
+def test_search_ranks_all_threads_by_score(thread_index):
+    indexed_threads = thread_index.search()
+
+    assert _titles(indexed_threads) == [
+        "Cats of Brazil",
+        "Grumpy cat meets açaí",
+        "Good dog learns a trick",
+    ]
+    assert [reddit_thread.rank for reddit_thread in indexed_threads] == ["1", "2", "3"]
+
+
+def test_search_filters(thread_index):
+    assert _titles(thread_index.search(subreddits="CATS;brazil")) == [
+        "Cats of Brazil",
+        "Grumpy cat meets açaí",
+    ]
+    assert _titles(thread_index.search(minimum_score=8000, limit=1)) == [
+        "Cats of Brazil"
+    ]
+    assert _titles(thread_index.search(since=1500.0)) == ["Cats of Brazil"]
+    assert _titles(thread_index.search(until=1500.0)) == [
+        "Grumpy cat meets açaí",
+        "Good dog learns a trick",
+    ]
+    assert _titles(thread_index.search(title_query="cat*")) == [
+        "Cats of Brazil",
+        "Grumpy cat meets açaí",
+    ]
+    assert _titles(thread_index.search(title_query="acai")) == ["Grumpy cat meets açaí"]
+
+
+def test_upsert_updates_the_thread_and_its_title_index(thread_index):
+    thread_index.upsert(
+        [CAT_THREAD._replace(score=9900, title="Grumpy lion")], crawled_at=3000.0
+    )
+
+    assert _titles(thread_index.search(title_query="grumpy")) == ["Grumpy lion"]
+    assert thread_index.search(title_query="cat") == []
+    assert _titles(thread_index.search(since=2500.0)) == ["Grumpy lion"]
+    assert _titles(thread_index.search(until=1500.0)) == [
+        "Grumpy lion",
+        "Good dog learns a trick",
+    ]
+    assert len(thread_index.search()) == 3
+    thread_index.connection.execute(
+        "INSERT INTO threads_titles (threads_titles) VALUES ('integrity-check')"
+    )
+
+
+def test_closed_index_ignores_upserts_and_finds_nothing():
+    thread_index = ThreadIndex()
+
+    thread_index.upsert([CAT_THREAD])
+
+    assert thread_index.search() == []
+
+
+def test_parse_datetime():
+    assert _parse_datetime("2022-05-01") == datetime(2022, 5, 1).timestamp()
+    assert (
+        _parse_datetime("2022-05-01T18:30") == datetime(2022, 5, 1, 18, 30).timestamp()
+    )
+    with pytest.raises(ValueError):
+        _parse_datetime("May 1st")
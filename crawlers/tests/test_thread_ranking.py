@@ -0,0 +1,54 @@
+from models import RedditThread
+from thread_ranking import TopThreadsRanking
+
+
+def _thread(name, score):
+    return RedditThread("", score, "cats", name, f"/r/cats/{name}/", f"/r/cats/{name}/")
+
+
+def test_top_threads_are_ranked_from_the_highest_score():
+    ranking = TopThreadsRanking(3)
+
+    ranking.push([_thread("a", 6000), _thread("b", 9000)])
+    ranking.push([_thread("c", 5000), _thread("d", 12000), _thread("e", 7000)])
+
+    top_threads = ranking.get_top_threads()
+    assert [reddit_thread.title for reddit_thread in top_threads] == ["d", "b", "e"]
+    assert [reddit_thread.rank for reddit_thread in top_threads] == ["1", "2", "3"]
+
+
+def test_ties_at_the_limit_keep_the_first_ranked_thread():
+    ranking = TopThreadsRanking(2)
+
+    ranking.push([_thread("a", 9000), _thread("b", 6000)])
+    ranking.push([_thread("c", 6000)])
+
+    assert [reddit_thread.title for reddit_thread in ranking.get_top_threads()] == [
+        "a",
+        "b",
+    ]
+
+
+def test_limit_larger_than_the_threads_keeps_all_threads():
+    ranking = TopThreadsRanking(10)
+
+    ranking.push([_thread("a", 6000), _thread("b", 6000), _thread("c", 8000)])
+
+    assert [reddit_thread.title for reddit_thread in ranking.get_top_threads()] == [
+        "c",
+        "a",
+        "b",
+    ]
+
+
+def test_can_be_beaten_before_and_after_the_ranking_is_full():
+    ranking = TopThreadsRanking(2)
+    assert ranking.can_be_beaten(1)
+
+    ranking.push([_thread("a", 6000)])
+    assert ranking.can_be_beaten(1)
+
+    ranking.push([_thread("b", 8000)])
+    assert not ranking.can_be_beaten(5000)
+    assert not ranking.can_be_beaten(6000)
+    assert ranking.can_be_beaten(6001)
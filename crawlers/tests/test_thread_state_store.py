@@ -0,0 +1,44 @@
+from models import RedditThread
+from thread_state_store import ThreadStateStore
+
+OLD_THREAD = RedditThread("1", 9000, "cats", "Old", "/r/cats/old/", "/r/cats/old/")
+NEW_THREAD = RedditThread("1", 6000, "cats", "New", "/r/cats/new/", "/r/cats/new/")
+
+
+def test_prune_deletes_only_the_threads_not_seen_recently(tmp_path):
+    thread_state_store = ThreadStateStore(str(tmp_path / "crawler_state.db"))
+    thread_state_store.update_subreddit("cats", [OLD_THREAD], crawled_at=1000.0)
+    thread_state_store.update_subreddit("cats", [NEW_THREAD], crawled_at=5000.0)
+
+    pruned_threads = thread_state_store.prune(maximum_age=1000.0, now=5500.0)
+
+    assert pruned_threads == 1
+    assert thread_state_store.get_fresh_buzz_threads(["cats"], maximum_age=1e12) == [
+        NEW_THREAD
+    ]
+    thread_state_store.close()
+
+
+def test_update_subreddit_returns_the_new_and_changed_threads(tmp_path):
+    thread_state_store = ThreadStateStore(str(tmp_path / "crawler_state.db"))
+    rescored_thread = OLD_THREAD._replace(score=9500)
+    reranked_thread = NEW_THREAD._replace(rank="2")
+
+    first_crawl = thread_state_store.update_subreddit(
+        "cats", [OLD_THREAD, NEW_THREAD], crawled_at=1000.0
+    )
+    unchanged_crawl = thread_state_store.update_subreddit(
+        "cats", [OLD_THREAD, NEW_THREAD], crawled_at=2000.0
+    )
+    changed_crawl = thread_state_store.update_subreddit(
+        "cats", [rescored_thread, reranked_thread], crawled_at=3000.0
+    )
+    other_subreddit_crawl = thread_state_store.update_subreddit(
+        "dogs", [OLD_THREAD], crawled_at=3000.0
+    )
+
+    assert first_crawl == [OLD_THREAD, NEW_THREAD]
+    assert unchanged_crawl == []
+    assert changed_crawl == [rescored_thread, reranked_thread]
+    assert other_subreddit_crawl == [OLD_THREAD]
+    thread_state_store.close()
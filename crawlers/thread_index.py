@@ -0,0 +1,257 @@
+import argparse
+import sqlite3
+from datetime import datetime
+from threading import Lock
+from time import time
+from typing import Iterable, List
+
+from constants import THREAD_INDEX_FILENAME
+from models import RedditThread
+from repositories import utils_repository
+
+
+class ThreadIndex:
+    def __init__(self) -> None:
+        """Initializes the index of the crawled threads, kept in SQLite (with a FTS5 index of the
+        titles) and keyed by permalink. Nothing is indexed until a database is opened.
+        """
+        self.connection = None
+        self.lock = Lock()
+
+    def open_database(self, filename: str = THREAD_INDEX_FILENAME) -> None:
+        """Use a SQLite file to index the crawled threads.
+
+        Args:
+            filename (str, optional): The SQLite database filename. Defaults to THREAD_INDEX_FILENAME.
+        """
+        with self.lock:
+            self.connection = sqlite3.connect(filename, check_same_thread=False)
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.executescript(
+                "CREATE TABLE IF NOT EXISTS threads ("
+                "permalink TEXT PRIMARY KEY, rank TEXT, score INTEGER, subreddit TEXT, "
+                "title TEXT, comments_link TEXT, thread_link TEXT, "
+                "first_seen REAL, last_seen REAL);"
+                "CREATE INDEX IF NOT EXISTS threads_subreddit "
+                "ON threads (subreddit COLLATE NOCASE);"
+                "CREATE VIRTUAL TABLE IF NOT EXISTS threads_titles USING fts5("
+                "title, content='threads', tokenize='unicode61 remove_diacritics 2');"
+                "CREATE TRIGGER IF NOT EXISTS threads_insert AFTER INSERT ON threads BEGIN "
+                "INSERT INTO threads_titles (rowid, title) VALUES (new.rowid, new.title); END;"
+                "CREATE TRIGGER IF NOT EXISTS threads_update AFTER UPDATE OF title ON threads "
+                "BEGIN INSERT INTO threads_titles (threads_titles, rowid, title) "
+                "VALUES ('delete', old.rowid, old.title); "
+                "INSERT INTO threads_titles (rowid, title) VALUES (new.rowid, new.title); END;"
+                "CREATE TRIGGER IF NOT EXISTS threads_delete AFTER DELETE ON threads BEGIN "
+                "INSERT INTO threads_titles (threads_titles, rowid, title) "
+                "VALUES ('delete', old.rowid, old.title); END;"
+            )
+
+    def upsert(
+        self, reddit_threads: Iterable[RedditThread], crawled_at: float = None
+    ) -> None:
+        """Index crawled threads, updating the ones already indexed (by permalink).
+
+        Args:
+            reddit_threads (Iterable[RedditThread]): The crawled threads.
+            crawled_at (float, optional): The crawl timestamp. Defaults to None (now).
+        """
+        if self.connection is None:
+            return
+        crawled_at = time() if crawled_at is None else crawled_at
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "INSERT INTO threads VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (permalink) DO UPDATE SET rank = excluded.rank, "
+                "score = excluded.score, subreddit = excluded.subreddit, "
+                "title = excluded.title, comments_link = excluded.comments_link, "
+                "thread_link = excluded.thread_link, last_seen = excluded.last_seen",
+                (
+                    (
+                        reddit_thread.thread_link,
+                        *reddit_thread,
+                        crawled_at,
+                        crawled_at,
+                    )
+                    for reddit_thread in reddit_threads
+                ),
+            )
+
+    def search(
+        self,
+        subreddits: str = None,
+        minimum_score: int = None,
+        since: float = None,
+        until: float = None,
+        title_query: str = None,
+        limit: int = None,
+    ) -> List[RedditThread]:
+        """Search the indexed threads, without requests to reddit.
+
+        Args:
+            subreddits (str, optional): The subreddits, separated by ';'. Defaults to None (all).
+            minimum_score (int, optional): The minimum score. Defaults to None.
+            since (float, optional): Only threads crawled after this timestamp. Defaults to None.
+            until (float, optional): Only threads crawled before this timestamp. Defaults to None.
+            title_query (str, optional): A FTS5 query on the titles (eg. 'cat*', 'brazil OR
+            argentina'). Defaults to None.
+            limit (int, optional): Maximum number of threads. Defaults to None (all).
+
+        Raises:
+            sqlite3.OperationalError: If the title query is not a valid FTS5 query.
+
+        Returns:
+            List[RedditThread]: The threads found, from the highest (last seen) score, ranked from "1".
+        """
+        if self.connection is None:
+            return []
+        conditions = []
+        parameters = []
+        if subreddits:
+            list_of_subreddits = utils_repository.split_string(
+                utils_repository.normalize_subreddits(subreddits)
+            )
+            conditions.append(
+                f"subreddit COLLATE NOCASE IN ({', '.join('?' * len(list_of_subreddits))})"
+            )
+            parameters.extend(list_of_subreddits)
+        if minimum_score is not None:
+            conditions.append("score >= ?")
+            parameters.append(minimum_score)
+        if since is not None:
+            conditions.append("last_seen >= ?")
+            parameters.append(since)
+        if until is not None:
+            conditions.append("first_seen <= ?")
+            parameters.append(until)
+        if title_query:
+            conditions.append(
+                "rowid IN (SELECT rowid FROM threads_titles WHERE threads_titles MATCH ?)"
+            )
+            parameters.append(title_query)
+        query = "SELECT rank, score, subreddit, title, comments_link, thread_link FROM threads"
+        if conditions:
+            query = f"{query} WHERE {' AND '.join(conditions)}"
+        query = f"{query} ORDER BY score DESC"
+        if limit:
+            query = f"{query} LIMIT ?"
+            parameters.append(limit)
+        with self.lock:
+            indexed_threads = self.connection.execute(query, parameters).fetchall()
+        return [
+            RedditThread(*indexed_thread)._replace(rank=str(rank))
+            for rank, indexed_thread in enumerate(indexed_threads, 1)
+        ]
+
+    def close(self) -> None:
+        """Close the database."""
+        with self.lock:
+            if self.connection is not None:
+                self.connection.close()
+                self.connection = None
+
+
+thread_index = ThreadIndex()
+
+
+def _parse_datetime(value: str) -> float:
+    """Parse an ISO date (or date and time) to a timestamp.
+
+    Args:
+        value (str): The date, eg. '2022-05-01' or '2022-05-01T18:30'.
+
+    Returns:
+        float: The timestamp.
+    """
+    return datetime.fromisoformat(value).timestamp()
+
+
+def main(
+    subreddits: str = None,
+    minimum_score: int = None,
+    since: float = None,
+    until: float = None,
+    title_query: str = None,
+    limit: int = None,
+    index_filename: str = THREAD_INDEX_FILENAME,
+) -> None:
+    """Search the indexed threads and show them.
+
+    Args:
+        subreddits (str, optional): The subreddits, separated by ';'. Defaults to None (all).
+        minimum_score (int, optional): The minimum score. Defaults to None.
+        since (float, optional): Only threads crawled after this timestamp. Defaults to None.
+        until (float, optional): Only threads crawled before this timestamp. Defaults to None.
+        title_query (str, optional): A FTS5 query on the titles. Defaults to None.
+        limit (int, optional): Maximum number of threads. Defaults to None (all).
+        index_filename (str, optional): The SQLite index file. Defaults to THREAD_INDEX_FILENAME.
+    """
+    thread_index.open_database(index_filename)
+    try:
+        indexed_threads = thread_index.search(
+            subreddits, minimum_score, since, until, title_query, limit
+        )
+    except sqlite3.OperationalError as error:
+        print(f"Invalid title query '{title_query}'. Details: {error}.")
+        return
+    finally:
+        thread_index.close()
+    if not indexed_threads:
+        print("No threads found in the index!")
+        return
+    utils_repository.cli_show_results(indexed_threads)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Idwall challenge - thread index")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    search_parser = subparsers.add_parser(
+        "search", help="Search the crawled threads, without requests to reddit."
+    )
+    search_parser.add_argument(
+        "-r",
+        "--subreddits",
+        default=None,
+        help="Only threads of these subreddits, separeted by ';'.",
+    )
+    search_parser.add_argument(
+        "-m", "--minimum_score", type=int, default=None, help="The minimum score."
+    )
+    search_parser.add_argument(
+        "--since",
+        type=_parse_datetime,
+        default=None,
+        help="Only threads crawled after this ISO date (eg. '2022-05-01T18:30').",
+    )
+    search_parser.add_argument(
+        "--until",
+        type=_parse_datetime,
+        default=None,
+        help="Only threads crawled before this ISO date.",
+    )
+    search_parser.add_argument(
+        "-q",
+        "--query",
+        default=None,
+        help="Full-text search on the titles (FTS5 syntax, eg. 'cat*' or 'brazil OR argentina').",
+    )
+    search_parser.add_argument(
+        "-l", "--limit", type=int, default=None, help="Maximum number of threads."
+    )
+    search_parser.add_argument(
+        "-x",
+        "--index_file",
+        default=THREAD_INDEX_FILENAME,
+        help="SQLite file with the crawled threads index.",
+    )
+    args = parser.parse_args()
+
+    main(
+        args.subreddits,
+        args.minimum_score,
+        args.since,
+        args.until,
+        args.query,
+        args.limit,
+        args.index_file,
+    )
@@ -0,0 +1,66 @@
+import heapq
+from itertools import count
+from threading import Lock
+from typing import Iterable, List, Tuple
+
+from models import RedditThread
+
+
+class TopThreadsRanking:
+    def __init__(self, limit: int) -> None:
+        """Initializes the ranking of the `limit` threads with the highest scores.
+
+        The threads are kept in a bounded min-heap (the worst ranked thread on top), so each
+        thread is ranked in O(log limit) and only `limit` threads are kept. Among threads with
+        the same score, the first ranked one is kept.
+
+        Args:
+            limit (int): Maximum number of threads in the ranking.
+        """
+        self.limit = max(1, limit)
+        self.heap: List[Tuple[int, int, RedditThread]] = []
+        self.arrival_order = count()
+        self.lock = Lock()
+
+    def push(self, reddit_threads: Iterable[RedditThread]) -> None:
+        """Rank threads, dropping the ones beyond the limit.
+
+        Args:
+            reddit_threads (Iterable[RedditThread]): The threads to rank.
+        """
+        with self.lock:
+            for reddit_thread in reddit_threads:
+                heap_entry = (
+                    reddit_thread.score,
+                    -next(self.arrival_order),
+                    reddit_thread,
+                )
+                if len(self.heap) < self.limit:
+                    heapq.heappush(self.heap, heap_entry)
+                else:
+                    heapq.heappushpop(self.heap, heap_entry)
+
+    def can_be_beaten(self, score: int) -> bool:
+        """Check if a thread with a score would enter the ranking.
+
+        Args:
+            score (int): The thread score.
+
+        Returns:
+            bool: True if the ranking is not full or the score is higher than the lowest ranked one.
+        """
+        with self.lock:
+            return len(self.heap) < self.limit or score > self.heap[0][0]
+
+    def get_top_threads(self) -> List[RedditThread]:
+        """Get the ranked threads, from the highest score, with their rank in the ranking.
+
+        Returns:
+            List[RedditThread]: The top threads, ranked from "1".
+        """
+        with self.lock:
+            heap_entries = sorted(self.heap, reverse=True)
+        return [
+            reddit_thread._replace(rank=str(rank))
+            for rank, (_, _, reddit_thread) in enumerate(heap_entries, 1)
+        ]
@@ -0,0 +1,149 @@
+import sqlite3
+from threading import Lock
+from time import time
+from typing import Iterable, List, Optional
+
+from constants import (
+    DAEMON_RESULTS_MAXIMUM_AGE,
+    DAEMON_STATE_FILENAME,
+    DAEMON_STATE_MAXIMUM_AGE,
+)
+from models import RedditThread
+
+
+class ThreadStateStore:
+    def __init__(self, filename: str = DAEMON_STATE_FILENAME) -> None:
+        """Initializes the store with the last seen state of the buzz threads of each subreddit.
+
+        Args:
+            filename (str, optional): The SQLite database filename. Defaults to DAEMON_STATE_FILENAME.
+        """
+        self.connection = sqlite3.connect(filename, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS thread_states ("
+            "query_subreddit TEXT, permalink TEXT, listing_position INTEGER, "
+            "rank TEXT, score INTEGER, subreddit TEXT, title TEXT, "
+            "comments_link TEXT, thread_link TEXT, last_seen REAL, "
+            "PRIMARY KEY (query_subreddit, permalink))"
+        )
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS subreddit_crawls ("
+            "query_subreddit TEXT PRIMARY KEY, crawled_at REAL)"
+        )
+        self.connection.commit()
+        self.lock = Lock()
+
+    def update_subreddit(
+        self, query_subreddit: str, buzz_threads: List[RedditThread], crawled_at: float
+    ) -> List[RedditThread]:
+        """Save the buzz threads found in a subreddit crawl.
+
+        Args:
+            query_subreddit (str): The crawled subreddit (as it was queried).
+            buzz_threads (List[RedditThread]): The buzz threads found, in listing order.
+            crawled_at (float): The crawl timestamp.
+
+        Returns:
+            List[RedditThread]: The threads that are new or whose score or rank changed since the
+            last crawl.
+        """
+        with self.lock:
+            last_states = {
+                permalink: (score, rank)
+                for permalink, score, rank in self.connection.execute(
+                    "SELECT permalink, score, rank FROM thread_states "
+                    "WHERE query_subreddit = ?",
+                    (query_subreddit,),
+                )
+            }
+            changed_threads = [
+                reddit_thread
+                for reddit_thread in buzz_threads
+                if last_states.get(reddit_thread.thread_link)
+                != (reddit_thread.score, reddit_thread.rank)
+            ]
+            with self.connection:
+                self.connection.executemany(
+                    "INSERT OR REPLACE INTO thread_states VALUES "
+                    "(?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        (
+                            query_subreddit,
+                            reddit_thread.thread_link,
+                            listing_position,
+                            *reddit_thread,
+                            crawled_at,
+                        )
+                        for listing_position, reddit_thread in enumerate(buzz_threads)
+                    ),
+                )
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO subreddit_crawls VALUES (?, ?)",
+                    (query_subreddit, crawled_at),
+                )
+        return changed_threads
+
+    def get_fresh_buzz_threads(
+        self,
+        query_subreddits: Iterable[str],
+        maximum_age: float = DAEMON_RESULTS_MAXIMUM_AGE,
+    ) -> Optional[List[RedditThread]]:
+        """Get the buzz threads of the last crawl of the subreddits, if they are recent enough.
+
+        Args:
+            query_subreddits (Iterable[str]): The subreddits (as they were queried).
+            maximum_age (float, optional): Maximum age, in seconds, of the crawls.
+            Defaults to DAEMON_RESULTS_MAXIMUM_AGE.
+
+        Returns:
+            Optional[List[RedditThread]]: The buzz threads, in subreddit and listing order, or None
+            if any subreddit was not crawled recently.
+        """
+        buzz_threads = []
+        with self.lock:
+            for query_subreddit in query_subreddits:
+                crawl = self.connection.execute(
+                    "SELECT crawled_at FROM subreddit_crawls WHERE query_subreddit = ?",
+                    (query_subreddit,),
+                ).fetchone()
+                if crawl is None or time() - crawl[0] > maximum_age:
+                    return None
+                buzz_threads.extend(
+                    RedditThread(*thread_state)
+                    for thread_state in self.connection.execute(
+                        "SELECT rank, score, subreddit, title, comments_link, thread_link "
+                        "FROM thread_states WHERE query_subreddit = ? AND last_seen = ? "
+                        "ORDER BY listing_position",
+                        (query_subreddit, crawl[0]),
+                    )
+                )
+        return buzz_threads
+
+    def prune(
+        self, maximum_age: float = DAEMON_STATE_MAXIMUM_AGE, now: float = None
+    ) -> int:
+        """Delete the threads (and subreddit crawls) not seen for a while, so the store does not
+        grow with every thread ever crawled.
+
+        Args:
+            maximum_age (float, optional): Maximum age, in seconds, of the kept rows.
+            Defaults to DAEMON_STATE_MAXIMUM_AGE.
+            now (float, optional): The current timestamp. Defaults to None (now).
+
+        Returns:
+            int: The number of deleted threads.
+        """
+        oldest_kept = (time() if now is None else now) - maximum_age
+        with self.lock, self.connection:
+            pruned_threads = self.connection.execute(
+                "DELETE FROM thread_states WHERE last_seen < ?", (oldest_kept,)
+            ).rowcount
+            self.connection.execute(
+                "DELETE FROM subreddit_crawls WHERE crawled_at < ?", (oldest_kept,)
+            )
+        return pruned_threads
+
+    def close(self) -> None:
+        """Close the database."""
+        self.connection.close()
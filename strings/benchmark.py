@@ -0,0 +1,346 @@
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+from time import perf_counter
+from typing import List
+
+from compact_layout import IdwallCompactLayout
+from constants import DEFAULT_MAXIMUM_LINE_WIDTH
+from idwall_text_wrap import IdwallTextWrap
+from numpy_justifier import idwall_numpy_justifier
+from repository import idwall_strings_repository
+
+SIZE_UNITS = {"KB": 1024, "MB": 1024**2, "GB": 1024**3}
+WORD_LENGTH_DISTRIBUTIONS = {
+    "short": (range(1, 5), None),
+    "uniform": (range(1, 13), None),
+    "long": (range(8, 21), None),
+    "zipf": (range(1, 21), [1 / length for length in range(1, 21)]),
+}
+OPERATIONS = {
+    "left_allign": ["manual", "python_wrap", "compact", "stream"],
+    "justify": [
+        "manual",
+        "python_wrap",
+        "multiple_passes",
+        "numpy",
+        "compact",
+        "stream",
+    ],
+}
+WORDS_POOL_SIZE = 10000
+WORDS_PER_WRITE = 100000
+
+
+def parse_size(size: str) -> int:
+    """Parse a size like "1KB", "10MB" or "1GB" to bytes.
+
+    Args:
+        size (str): The size, with an optional unit.
+
+    Returns:
+        int: The size in bytes.
+    """
+    size = size.strip().upper()
+    for unit, multiplier in SIZE_UNITS.items():
+        if size.endswith(unit):
+            return int(float(size[: -len(unit)]) * multiplier)
+    return int(size)
+
+
+def create_synthetic_corpus(
+    filename: str, size_in_bytes: int, distribution: str, seed: int = 0
+) -> None:
+    """Write a reproducible synthetic corpus, with random words, to a file.
+
+    The words are sampled from a pool whose word lengths follow the chosen distribution, and
+    written in blocks, so corpora bigger than the memory can be created.
+
+    Args:
+        filename (str): The corpus filename.
+        size_in_bytes (int): Approximated size of the corpus.
+        distribution (str): The word length distribution (a WORD_LENGTH_DISTRIBUTIONS key).
+        seed (int, optional): The random seed. Defaults to 0.
+    """
+    generator = random.Random(seed)
+    word_lengths, weights = WORD_LENGTH_DISTRIBUTIONS[distribution]
+    words_pool = [
+        "".join(generator.choices("abcdefghijklmnopqrstuvwxyz", k=word_length))
+        for word_length in generator.choices(word_lengths, weights, k=WORDS_POOL_SIZE)
+    ]
+    written_bytes = 0
+    with open(filename, "w") as corpus_file:
+        while written_bytes < size_in_bytes:
+            block = " ".join(generator.choices(words_pool, k=WORDS_PER_WRITE)) + "\n"
+            block = block[: size_in_bytes - written_bytes]
+            corpus_file.write(block)
+            written_bytes += len(block)
+
+
+def multiple_passes_justify(input_text: str, maximum_line_width: int) -> List[str]:
+    """Justify a text the way it was done before the single pass wrap.
+
+    The text is splitted to check the words size, splitted again to be wrapped, the words of
+    each line are joined and then every line is splitted again to be justified.
+
+    Args:
+        input_text (str): The text to be justified.
+        maximum_line_width (int): Maximum line width.
+
+    Returns:
+        List[str]: The justified lines.
+    """
+    idwall_strings_repository._check_words_size(input_text, maximum_line_width)
+    wrapped_text = idwall_strings_repository._manually_wrap_text(
+        input_text, maximum_line_width
+    )
+    splitted_lines = [line.split() for line in wrapped_text]
+    return idwall_strings_repository._justify_text_in_list_of_lines(
+        maximum_line_width, splitted_lines
+    )
+
+
+def run_operation(
+    operation: str,
+    mode: str,
+    corpus_filename: str,
+    maximum_line_width: int,
+    output_filename: str,
+) -> None:
+    """Run a wrap/justify operation over a corpus, like the CLI does (but without printing).
+
+    Args:
+        operation (str): left_allign or justify.
+        mode (str): How the text is wrapped/justified (one of the OPERATIONS modes).
+        corpus_filename (str): The corpus filename.
+        maximum_line_width (int): Maximum line width.
+        output_filename (str): The output filename.
+    """
+    idwall_text_wrap = IdwallTextWrap()
+    if mode == "stream":
+        if operation == "left_allign":
+            idwall_text_wrap.left_allign_file(
+                corpus_filename, maximum_line_width, output_filename
+            )
+        else:
+            idwall_text_wrap.justify_file(
+                corpus_filename, maximum_line_width, output_filename
+            )
+        return
+    with open(corpus_filename) as corpus_file:
+        input_text = corpus_file.read()
+    if mode == "compact":
+        compact_layout = IdwallCompactLayout(input_text).wrap(maximum_line_width)
+        if operation == "justify":
+            compact_layout.justify(maximum_line_width)
+        idwall_strings_repository._write_lines_to_file(
+            compact_layout.iterate_lines(), output_filename
+        )
+        return
+    use_python_wrap = mode == "python_wrap"
+    if operation == "left_allign":
+        output_text = idwall_text_wrap._wrap_text(
+            input_text, maximum_line_width, use_python_wrap
+        )
+    elif mode == "multiple_passes":
+        output_text = multiple_passes_justify(input_text, maximum_line_width)
+    else:
+        wrapped_lines = idwall_text_wrap._wrap_text_in_lists_of_words(
+            input_text, maximum_line_width, use_python_wrap
+        )
+        justifier = (
+            idwall_numpy_justifier if mode == "numpy" else idwall_strings_repository
+        )
+        output_text = justifier._justify_text_in_list_of_lines(
+            maximum_line_width, wrapped_lines
+        )
+    idwall_strings_repository._write_to_file(output_text, output_filename)
+
+
+def measure_case(case: dict, trace_allocations: bool) -> dict:
+    """Measure a benchmark case. Runs in a fresh process, so the peak RSS is only of this case.
+
+    Args:
+        case (dict): The case (operation, mode, corpus, size, width and output filename).
+        trace_allocations (bool): Also run the case with tracemalloc, to get the allocations peak.
+
+    Returns:
+        dict: The case with the seconds, throughput (MB/s), peak RSS and allocations peak (bytes).
+    """
+    arguments = (
+        case["operation"],
+        case["mode"],
+        case["corpus_filename"],
+        case["line_width"],
+        case["output_filename"],
+    )
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    start_time = perf_counter()
+    run_operation(*arguments)
+    elapsed_seconds = perf_counter() - start_time
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    allocations_peak = None
+    if trace_allocations:
+        tracemalloc.start()
+        run_operation(*arguments)
+        _, allocations_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return {
+        **{key: value for key, value in case.items() if not key.endswith("filename")},
+        "seconds": elapsed_seconds,
+        "throughput_mb_s": case["size"] / elapsed_seconds / SIZE_UNITS["MB"],
+        "peak_rss_bytes": peak_rss,
+        "peak_rss_increase_bytes": peak_rss - rss_before,
+        "allocations_peak_bytes": allocations_peak,
+    }
+
+
+def get_commit() -> str:
+    """Get the current git commit, to compare results across commits.
+
+    Returns:
+        str: The commit hash or None when it is not a git repository.
+    """
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(
+    sizes: List[int],
+    distributions: List[str],
+    line_widths: List[int],
+    operations: List[str],
+    maximum_in_memory_size: int,
+    trace_allocations: bool,
+    output_filename: str = None,
+) -> None:
+    """Run the benchmark cases and emit the results as JSON.
+
+    Args:
+        sizes (List[int]): Corpora sizes in bytes.
+        distributions (List[str]): Word length distributions of the corpora.
+        line_widths (List[int]): Maximum line widths.
+        operations (List[str]): Operations to measure (left_allign and/or justify).
+        maximum_in_memory_size (int): Biggest corpus measured in modes that load the whole text in memory.
+        trace_allocations (bool): Also measure the allocations peak with tracemalloc (much slower).
+        output_filename (str, optional): File to save the JSON results. Defaults to None (stdout).
+    """
+    results = []
+    spawn_context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as benchmark_directory:
+        for distribution in distributions:
+            for size in sizes:
+                corpus_filename = os.path.join(
+                    benchmark_directory, f"{distribution}-{size}.txt"
+                )
+                create_synthetic_corpus(corpus_filename, size, distribution)
+                for operation in operations:
+                    for mode in OPERATIONS[operation]:
+                        if mode != "stream" and size > maximum_in_memory_size:
+                            continue
+                        for line_width in line_widths:
+                            case = {
+                                "operation": operation,
+                                "mode": mode,
+                                "distribution": distribution,
+                                "size": size,
+                                "line_width": line_width,
+                                "corpus_filename": corpus_filename,
+                                "output_filename": os.path.join(
+                                    benchmark_directory, "output.txt"
+                                ),
+                            }
+                            print(
+                                f"{operation} ({mode}) - {distribution}, {size} bytes, width {line_width}",
+                                file=sys.stderr,
+                            )
+                            with spawn_context.Pool(1) as pool:
+                                results.append(
+                                    pool.apply(measure_case, (case, trace_allocations))
+                                )
+                os.remove(corpus_filename)
+    report = {
+        "commit": get_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    if output_filename:
+        with open(output_filename, "w") as output_file:
+            json.dump(report, output_file, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Idwall strings benchmark")
+    parser.add_argument(
+        "-s",
+        "--sizes",
+        default="1KB,1MB,10MB",
+        help="Comma separated corpora sizes, from 1KB up to 1GB (eg. '1KB,1MB,100MB,1GB').",
+    )
+    parser.add_argument(
+        "-d",
+        "--distributions",
+        default=",".join(WORD_LENGTH_DISTRIBUTIONS),
+        help=f"Comma separated word length distributions ({', '.join(WORD_LENGTH_DISTRIBUTIONS)}).",
+    )
+    parser.add_argument(
+        "-w",
+        "--line_widths",
+        default=f"{DEFAULT_MAXIMUM_LINE_WIDTH},80",
+        help="Comma separated maximum line widths.",
+    )
+    parser.add_argument(
+        "-o",
+        "--operations",
+        default=",".join(OPERATIONS),
+        help="Comma separated operations to measure (left_allign, justify).",
+    )
+    parser.add_argument(
+        "-m",
+        "--maximum_in_memory_size",
+        default="100MB",
+        help="Biggest corpus measured in the modes that load the whole text in memory.",
+    )
+    parser.add_argument(
+        "-a",
+        "--trace_allocations",
+        action="store_true",
+        help="Also measure the allocations peak with tracemalloc (much slower).",
+    )
+    parser.add_argument(
+        "-f",
+        "--output_filename",
+        default=None,
+        help="File to save the JSON results (defaults to stdout).",
+    )
+    args = parser.parse_args()
+
+    main(
+        [parse_size(size) for size in args.sizes.split(",")],
+        args.distributions.split(","),
+        [int(line_width) for line_width in args.line_widths.split(",")],
+        args.operations.split(","),
+        parse_size(args.maximum_in_memory_size),
+        args.trace_allocations,
+        args.output_filename,
+    )
@@ -0,0 +1,146 @@
+import re
+from array import array
+from typing import Iterator, Union
+
+WORD_PATTERN = re.compile(r"\S+")
+ENCODED_WORD_PATTERN = re.compile(rb"\S+")
+MAXIMUM_UNSIGNED_INT = 2**32 - 1
+
+
+class IdwallCompactLayout:
+    def __init__(self, source: Union[str, bytes]) -> None:
+        """Initializes the compact layout of a text.
+
+        The words are kept only as offsets and lengths into the source text, in arrays of unsigned
+        integers, the lines as ranges of those arrays and the justification as whitespace counts,
+        so no string is created per word until the lines are materialized.
+
+        Args:
+            source (Union[str, bytes]): The text (or an ASCII buffer, like a memory mapped file).
+        """
+        self.source = source
+        offsets_typecode = "I" if len(source) <= MAXIMUM_UNSIGNED_INT else "Q"
+        self.word_offsets = array(offsets_typecode)
+        self.word_lengths = array("I")
+        self.line_ends = array("I")
+        self.gaps_after_words = array("I")
+
+    def _find_words(self) -> None:
+        """Find the offsets and lengths of all words of the source."""
+        word_pattern = (
+            WORD_PATTERN if isinstance(self.source, str) else ENCODED_WORD_PATTERN
+        )
+        for word_match in word_pattern.finditer(self.source):
+            word_start, word_end = word_match.span()
+            self.word_offsets.append(word_start)
+            self.word_lengths.append(word_end - word_start)
+
+    def _get_word(self, word_index: int) -> Union[str, bytes]:
+        """Get a word of the source.
+
+        Args:
+            word_index (int): The word index.
+
+        Returns:
+            Union[str, bytes]: The word.
+        """
+        word_start = self.word_offsets[word_index]
+        return self.source[word_start : word_start + self.word_lengths[word_index]]
+
+    def wrap(self, maximum_line_width: int) -> "IdwallCompactLayout":
+        """Find the words and wrap them in lines, like `IdwallStringsRepository._lazily_wrap_words`.
+
+        Args:
+            maximum_line_width (int): Maximum line width.
+
+        Raises:
+            ValueError: If an word with size > maximum line size is found.
+
+        Returns:
+            IdwallCompactLayout: The layout itself.
+        """
+        self._find_words()
+        line_length = 0
+        for word_index, word_length in enumerate(self.word_lengths):
+            if word_length > maximum_line_width:
+                word = self._get_word(word_index)
+                if isinstance(word, bytes):
+                    word = word.decode()
+                raise ValueError(
+                    f"Word {word} (size {word_length}) is greater than maximum line width (size {maximum_line_width})."
+                )
+            if line_length + word_length > maximum_line_width and line_length > 0:
+                self.line_ends.append(word_index)
+                line_length = 0
+            line_length += word_length + 1
+        if line_length > 0:
+            self.line_ends.append(len(self.word_lengths))
+        self.gaps_after_words = array("I", [1]) * len(self.word_lengths)
+        return self
+
+    def justify(self, maximum_line_width: int) -> "IdwallCompactLayout":
+        """Calculate the whitespaces after each word to justify the wrapped lines.
+
+        Must be called after `wrap`; without it, the words are separated by a single whitespace.
+
+        The whitespaces are the same added by `IdwallStringsRepository._justify_list_of_strings`,
+        but kept as counts instead of padded copies of the words.
+
+        Args:
+            maximum_line_width (int): The maximum line width.
+
+        Returns:
+            IdwallCompactLayout: The layout itself.
+        """
+        gaps_after_words = self.gaps_after_words
+        word_lengths = self.word_lengths
+        line_start = 0
+        for line_end in self.line_ends:
+            number_of_gaps = line_end - line_start - 1
+            needed_whitespaces = (
+                maximum_line_width
+                - sum(word_lengths[line_start:line_end])
+                - number_of_gaps
+            )
+            if number_of_gaps == 0:
+                pass
+            elif needed_whitespaces > number_of_gaps:
+                whitespaces_per_word = needed_whitespaces // number_of_gaps
+                gaps_after_words[line_start : line_end - 1] = (
+                    array("I", [1 + whitespaces_per_word]) * number_of_gaps
+                )
+                gaps_after_words[line_end - 2] += whitespaces_per_word
+            elif needed_whitespaces > 0:
+                gaps_after_words[line_start : line_start + needed_whitespaces] = (
+                    array("I", [2]) * needed_whitespaces
+                )
+            line_start = line_end
+        return self
+
+    def iterate_lines(self) -> Iterator[Union[str, bytes]]:
+        """Materialize the lines, one at a time.
+
+        Yields:
+            Iterator[Union[str, bytes]]: The lines (encoded, when the source is a buffer).
+        """
+        source = self.source
+        word_offsets = self.word_offsets
+        word_lengths = self.word_lengths
+        gaps_after_words = self.gaps_after_words
+        empty_string = source[:0]
+        whitespaces = [
+            empty_string.ljust(size)
+            for size in range(max(gaps_after_words, default=0) + 1)
+        ]
+        line_start = 0
+        for line_end in self.line_ends:
+            pieces = []
+            for word_index in range(line_start, line_end):
+                word_start = word_offsets[word_index]
+                pieces.append(
+                    source[word_start : word_start + word_lengths[word_index]]
+                )
+                pieces.append(whitespaces[gaps_after_words[word_index]])
+            pieces.pop()
+            yield empty_string.join(pieces)
+            line_start = line_end
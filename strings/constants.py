@@ -1,4 +1,10 @@
 DEFAULT_MAXIMUM_LINE_WIDTH = 40
+DEFAULT_READ_CHUNK_SIZE = 1024 * 1024
+OUTPUT_BUFFER_SIZE = 1024 * 1024
+DEFAULT_PARAGRAPHS_CHUNK_SIZE = 64
+DOCUMENTS_CACHE_SIZE = 32
+LAYOUTS_CACHE_SIZE = 256
+NUMPY_JUSTIFY_BATCH_SIZE = 4096
 DEFAULT_INPUT_TEXT = (
     "In the beginning God created the heavens and the earth. Now the earth was formless and empty, darkness was "
     "over the surface of the deep, and the Spirit of God was hovering over the waters. And God said, 'Let there "
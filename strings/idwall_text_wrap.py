@@ -1,11 +1,220 @@
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import groupby, islice
 from textwrap import wrap
-from typing import List
+from typing import Iterable, Iterator, List, TextIO, Tuple, Union
 
-from constants import DEFAULT_INPUT_TEXT, DEFAULT_MAXIMUM_LINE_WIDTH
+from compact_layout import IdwallCompactLayout
+from constants import (
+    DEFAULT_INPUT_TEXT,
+    DEFAULT_MAXIMUM_LINE_WIDTH,
+    DEFAULT_PARAGRAPHS_CHUNK_SIZE,
+    NUMPY_JUSTIFY_BATCH_SIZE,
+)
+from layout_cache import idwall_layout_cache
+from numpy_justifier import idwall_numpy_justifier
 from repository import idwall_strings_repository
 
 
+def _format_paragraphs(
+    paragraphs: List[str], maximum_line_width: int, justify: bool
+) -> List[str]:
+    """Wrap (and justify) a chunk of paragraphs. Runs inside the worker processes.
+
+    Args:
+        paragraphs (List[str]): The paragraphs to be formatted.
+        maximum_line_width (int): Maximum line width.
+        justify (bool): Justify the lines instead of only left allign them.
+
+    Returns:
+        List[str]: The formatted lines, with an empty line between the paragraphs.
+    """
+    output_text = []
+    for paragraph in paragraphs:
+        if output_text:
+            output_text.append("")
+        for line in idwall_strings_repository._lazily_wrap_words(
+            paragraph.split(), maximum_line_width
+        ):
+            if justify:
+                output_text.append(
+                    idwall_strings_repository._justify_line(maximum_line_width, line)
+                )
+            else:
+                output_text.append(" ".join(line))
+    return output_text
+
+
 class IdwallTextWrap:
+    @contextmanager
+    def _open_input_file(self, input_filename: str) -> Iterator[TextIO]:
+        """Open the input file, using stdin when the filename is "-".
+
+        Args:
+            input_filename (str): The input filename or "-" for stdin.
+
+        Yields:
+            Iterator[TextIO]: The opened input file.
+        """
+        if input_filename == "-":
+            yield sys.stdin
+        else:
+            with open(input_filename) as input_file:
+                yield input_file
+
+    @contextmanager
+    def _read_words(self, input_file: TextIO) -> Iterator[Iterator[Union[str, bytes]]]:
+        """Lazily read the words of an opened input file, memory mapping it when possible.
+
+        Args:
+            input_file (TextIO): The opened input file (or stdin).
+
+        Yields:
+            Iterator[Iterator[Union[str, bytes]]]: The words of the file (encoded while a
+            memory mapped file is ASCII).
+        """
+        mapped_file = idwall_strings_repository._map_file(input_file)
+        if mapped_file is None:
+            yield idwall_strings_repository._read_words_from_file(input_file)
+            return
+        with mapped_file:
+            yield idwall_strings_repository._read_words_from_mapped_file(
+                mapped_file, input_file.encoding
+            )
+
+    @contextmanager
+    def _open_paragraphs(
+        self, input_text: str, input_filename: str = None
+    ) -> Iterator[Iterable[str]]:
+        """Get the paragraphs of the input file, when informed, or of the input text.
+
+        Args:
+            input_text (str): The input text.
+            input_filename (str, optional): The input filename or "-" for stdin. Defaults to None.
+
+        Yields:
+            Iterator[Iterable[str]]: The paragraphs (read lazily from the input file).
+        """
+        if input_filename:
+            with self._open_input_file(input_filename) as input_file:
+                yield idwall_strings_repository._read_paragraphs_from_file(input_file)
+        else:
+            yield idwall_strings_repository._split_text_in_paragraphs(input_text)
+
+    def _parallel_format_paragraphs(
+        self,
+        paragraphs: Iterable[str],
+        maximum_line_width: int,
+        justify: bool,
+        workers: int = None,
+        chunk_size: int = DEFAULT_PARAGRAPHS_CHUNK_SIZE,
+    ) -> Iterator[str]:
+        """Format chunks of paragraphs in a process pool, yielding the lines in the input order.
+
+        Only a few chunks per worker are kept in flight, so the paragraphs can be read lazily.
+
+        Args:
+            paragraphs (Iterable[str]): The paragraphs to be formatted.
+            maximum_line_width (int): Maximum line width.
+            justify (bool): Justify the lines instead of only left allign them.
+            workers (int, optional): Number of worker processes. Defaults to None (number of CPUs).
+            chunk_size (int, optional): Number of paragraphs sent to a worker at once.
+            Defaults to DEFAULT_PARAGRAPHS_CHUNK_SIZE.
+
+        Yields:
+            Iterator[str]: The formatted lines, with an empty line between the paragraphs.
+        """
+        paragraphs = iter(paragraphs)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            maximum_chunks_in_flight = 2 * (workers or os.cpu_count() or 1)
+            chunks_in_flight = deque()
+            is_first_chunk = True
+            while True:
+                while len(chunks_in_flight) < maximum_chunks_in_flight:
+                    chunk = list(islice(paragraphs, chunk_size))
+                    if not chunk:
+                        break
+                    chunks_in_flight.append(
+                        executor.submit(
+                            _format_paragraphs, chunk, maximum_line_width, justify
+                        )
+                    )
+                if not chunks_in_flight:
+                    break
+                if not is_first_chunk:
+                    yield ""
+                is_first_chunk = False
+                yield from chunks_in_flight.popleft().result()
+
+    def _justify_lines_in_batches(
+        self,
+        wrapped_lines: Iterable[List[Union[str, bytes]]],
+        maximum_line_width: int,
+        batch_size: int = NUMPY_JUSTIFY_BATCH_SIZE,
+    ) -> Iterator[Union[str, bytes]]:
+        """Justify lazily wrapped lines with NumPy, one batch of lines at a time.
+
+        Args:
+            wrapped_lines (Iterable[List[Union[str, bytes]]]): The words of each wrapped line.
+            maximum_line_width (int): The maximum line width.
+            batch_size (int, optional): Number of lines justified at once. Defaults to NUMPY_JUSTIFY_BATCH_SIZE.
+
+        Yields:
+            Iterator[Union[str, bytes]]: The justified lines.
+        """
+        # Encoded lines and text lines (after a non ASCII character) are never in the same batch.
+        for _, lines in groupby(
+            wrapped_lines, key=idwall_strings_repository._is_encoded_line
+        ):
+            while True:
+                batch = list(islice(lines, batch_size))
+                if not batch:
+                    break
+                yield from idwall_numpy_justifier._justify_text_in_list_of_lines(
+                    maximum_line_width, batch
+                )
+
+    def _write_compact_layout(
+        self, compact_layout: IdwallCompactLayout, output_filename: str
+    ) -> None:
+        """Write and print the lines of a compact layout, creating each line only when it is used.
+
+        Args:
+            compact_layout (IdwallCompactLayout): The wrapped (and maybe justified) compact layout.
+            output_filename (str): The output filename.
+        """
+        idwall_strings_repository._write_lines_to_file(
+            compact_layout.iterate_lines(), output_filename
+        )
+        [print(text) for text in compact_layout.iterate_lines()]
+
+    def _wrap_text_in_lists_of_words(
+        self, input_text: str, maximum_line_width: int, use_python_wrap: bool
+    ) -> List[List[str]]:
+        """Wrap an input text, keeping each line as a list of words.
+
+        The manual wrap tokenizes the text only once and checks the words size while wrapping.
+
+        Args:
+            input_text (str): The text to be wrapped.
+            maximum_line_width (int): Maximum line length.
+            use_python_wrap (bool): Use python built-in function to wrap.
+
+        Returns:
+            List[List[str]]: The words of each wrapped line.
+        """
+        if use_python_wrap:
+            idwall_strings_repository._check_words_size(input_text, maximum_line_width)
+            return [line.split() for line in wrap(input_text, maximum_line_width)]
+        return list(
+            idwall_strings_repository._lazily_wrap_words(
+                input_text.split(), maximum_line_width
+            )
+        )
+
     def _wrap_text(
         self, input_text: str, maximum_line_width: int, use_python_wrap: bool
     ) -> List[str]:
@@ -19,14 +228,15 @@ class IdwallTextWrap:
         Returns:
             List[str]: The wrapped text in a list.
         """
-        idwall_strings_repository._check_words_size(input_text, maximum_line_width)
         if use_python_wrap:
-            wrapped_text = wrap(input_text, maximum_line_width)
-        else:
-            wrapped_text = idwall_strings_repository._manually_wrap_text(
-                input_text, maximum_line_width
+            idwall_strings_repository._check_words_size(input_text, maximum_line_width)
+            return wrap(input_text, maximum_line_width)
+        return [
+            " ".join(line)
+            for line in self._wrap_text_in_lists_of_words(
+                input_text, maximum_line_width, use_python_wrap
             )
-        return wrapped_text
+        ]
 
     def left_allign_text(
         self,
@@ -34,6 +244,7 @@ class IdwallTextWrap:
         maximum_line_width: int,
         output_filename: str = "output-part1.txt",
         use_python_wrap: bool = False,
+        use_compact_layout: bool = False,
     ) -> None:
         """Left allign a text.
 
@@ -42,7 +253,13 @@ class IdwallTextWrap:
             maximum_line_width (int, optional): Maximum line width.
             output_filename (str, optional): The filename in wich text will be saved. Defaults to "output-part1.txt".
             use_python_wrap (bool, optional): Use Python built-in method to wrap. Defaults to False.
+            use_compact_layout (bool, optional): Keep the words as offsets into the input text, only creating the
+            lines when they are written (use_python_wrap is ignored). Defaults to False.
         """
+        if use_compact_layout:
+            compact_layout = IdwallCompactLayout(input_text).wrap(maximum_line_width)
+            self._write_compact_layout(compact_layout, output_filename)
+            return
         output_text = self._wrap_text(input_text, maximum_line_width, use_python_wrap)
         idwall_strings_repository._write_to_file(output_text, output_filename)
         [print(text) for text in output_text]
@@ -53,6 +270,8 @@ class IdwallTextWrap:
         maximum_line_width: int = DEFAULT_MAXIMUM_LINE_WIDTH,
         output_filename: str = "output-part2.txt",
         use_python_wrap: bool = False,
+        use_numpy: bool = False,
+        use_compact_layout: bool = False,
     ):
         """Justify a text.
 
@@ -61,11 +280,198 @@ class IdwallTextWrap:
             maximum_line_width (int, optional): The desired line width. Defaults to DEFAULT_MAXIMUM_LINE_WIDTH.
             output_filename (str, optional): The output filename to save the results. Defaults to "output-part2.txt".
             use_python_wrap (bool, optional): Use Python built-in method to wrap. Defaults to False.
+            use_numpy (bool, optional): Justify all lines at once with NumPy (when installed). Defaults to False.
+            use_compact_layout (bool, optional): Keep the words as offsets into the input text and the justification
+            as whitespace counts, only creating the lines when they are written (use_python_wrap and use_numpy are
+            ignored). Defaults to False.
+        """
+        if use_compact_layout:
+            compact_layout = (
+                IdwallCompactLayout(input_text)
+                .wrap(maximum_line_width)
+                .justify(maximum_line_width)
+            )
+            self._write_compact_layout(compact_layout, output_filename)
+            return
+        wrapped_lines = self._wrap_text_in_lists_of_words(
+            input_text, maximum_line_width, use_python_wrap
+        )
+        justifier = idwall_numpy_justifier if use_numpy else idwall_strings_repository
+        output_text = justifier._justify_text_in_list_of_lines(
+            maximum_line_width, wrapped_lines
+        )
+        idwall_strings_repository._write_to_file(output_text, output_filename)
+        [print(text) for text in output_text]
+
+    def optimally_justify_text(
+        self,
+        input_text: str = DEFAULT_INPUT_TEXT,
+        maximum_line_width: int = DEFAULT_MAXIMUM_LINE_WIDTH,
+        output_filename: str = "output-part2.txt",
+    ) -> None:
+        """Justify a text, breaking the lines with the minimum raggedness instead of greedly.
+
+        Args:
+            input_text (str, optional): The input text to be justified. Defaults to DEFAULT_INPUT_TEXT.
+            maximum_line_width (int, optional): The desired line width. Defaults to DEFAULT_MAXIMUM_LINE_WIDTH.
+            output_filename (str, optional): The output filename to save the results. Defaults to "output-part2.txt".
         """
-        wrapped_text = self._wrap_text(input_text, maximum_line_width, use_python_wrap)
-        splitted_lines = [line.split() for line in wrapped_text]
+        wrapped_lines = idwall_strings_repository._optimally_wrap_words(
+            input_text.split(), maximum_line_width
+        )
         output_text = idwall_strings_repository._justify_text_in_list_of_lines(
-            maximum_line_width, splitted_lines
+            maximum_line_width, wrapped_lines
         )
         idwall_strings_repository._write_to_file(output_text, output_filename)
         [print(text) for text in output_text]
+
+    def optimally_justify_file(
+        self,
+        input_filename: str,
+        maximum_line_width: int = DEFAULT_MAXIMUM_LINE_WIDTH,
+        output_filename: str = "output-part2.txt",
+    ) -> None:
+        """Justify the text of a file, breaking the lines with the minimum raggedness.
+
+        The words are read lazily, but all of them are kept until the line breaks are chosen,
+        since the best break of a line depends on the following words. The justified lines are
+        written as they are created and are not printed.
+
+        Args:
+            input_filename (str): The file with the text to be justified ("-" reads from stdin).
+            maximum_line_width (int, optional): The desired line width. Defaults to DEFAULT_MAXIMUM_LINE_WIDTH.
+            output_filename (str, optional): The output filename to save the results. Defaults to "output-part2.txt".
+        """
+        with self._open_input_file(input_filename) as input_file:
+            words = list(idwall_strings_repository._read_words_from_file(input_file))
+        wrapped_lines = idwall_strings_repository._optimally_wrap_words(
+            words, maximum_line_width
+        )
+        output_text = (
+            idwall_strings_repository._justify_line(maximum_line_width, line)
+            for line in wrapped_lines
+        )
+        idwall_strings_repository._write_lines_to_file(output_text, output_filename)
+
+    def batch_justify_text(
+        self, documents: Iterable[Tuple[str, int]]
+    ) -> List[Tuple[str, ...]]:
+        """Justify many documents, each one in a desired line width.
+
+        Each document is tokenized only once, no matter how many widths are requested, and the
+        justified lines of every (document, width) are cached, so repeated requests return
+        without justifying the document again. Nothing is printed or written to files.
+
+        Args:
+            documents (Iterable[Tuple[str, int]]): Pairs of (document text, maximum line width).
+
+        Returns:
+            List[Tuple[str, ...]]: The justified lines of each pair, in the input order.
+        """
+        return [
+            idwall_layout_cache.get_justified_lines(input_text, maximum_line_width)
+            for input_text, maximum_line_width in documents
+        ]
+
+    def left_allign_file(
+        self,
+        input_filename: str,
+        maximum_line_width: int = DEFAULT_MAXIMUM_LINE_WIDTH,
+        output_filename: str = "output-part1.txt",
+    ) -> None:
+        """Left allign the text of a file, streaming it line by line.
+
+        Regular files are memory mapped and wrapped as bytes, without decoding them, until the
+        first chunk with a non ASCII character, from where they are decoded; stdin is read as text.
+        Both are read lazily, in chunks. Each line is written as soon as it is wrapped, so the
+        memory used does not depend on the input size. The lines are not printed.
+
+        Args:
+            input_filename (str): The file with the text to be wrapped ("-" reads from stdin).
+            maximum_line_width (int, optional): Maximum line width. Defaults to DEFAULT_MAXIMUM_LINE_WIDTH.
+            output_filename (str, optional): The filename in wich text will be saved. Defaults to "output-part1.txt".
+        """
+        with self._open_input_file(input_filename) as input_file:
+            with self._read_words(input_file) as words:
+                wrapped_lines = idwall_strings_repository._lazily_wrap_words(
+                    words, maximum_line_width
+                )
+                output_text = (
+                    idwall_strings_repository._join_line(line) for line in wrapped_lines
+                )
+                idwall_strings_repository._write_lines_to_file(
+                    output_text, output_filename
+                )
+
+    def justify_file(
+        self,
+        input_filename: str,
+        maximum_line_width: int = DEFAULT_MAXIMUM_LINE_WIDTH,
+        output_filename: str = "output-part2.txt",
+        use_numpy: bool = False,
+    ) -> None:
+        """Justify the text of a file, streaming it line by line.
+
+        Regular files are memory mapped and wrapped as bytes, without decoding them, until the
+        first chunk with a non ASCII character, from where they are decoded; stdin is read as text.
+        Both are read lazily, in chunks. Each line is justified and written as soon as it is
+        wrapped (or each batch of lines, with NumPy), so the memory used does not depend on the
+        input size. The lines are not printed.
+
+        Args:
+            input_filename (str): The file with the text to be justified ("-" reads from stdin).
+            maximum_line_width (int, optional): The desired line width. Defaults to DEFAULT_MAXIMUM_LINE_WIDTH.
+            output_filename (str, optional): The output filename to save the results. Defaults to "output-part2.txt".
+            use_numpy (bool, optional): Justify batches of lines with NumPy (when installed). Defaults to False.
+        """
+        with self._open_input_file(input_filename) as input_file:
+            with self._read_words(input_file) as words:
+                wrapped_lines = idwall_strings_repository._lazily_wrap_words(
+                    words, maximum_line_width
+                )
+                if use_numpy:
+                    output_text = self._justify_lines_in_batches(
+                        wrapped_lines, maximum_line_width
+                    )
+                else:
+                    output_text = (
+                        idwall_strings_repository._justify_any_line(
+                            maximum_line_width, line
+                        )
+                        for line in wrapped_lines
+                    )
+                idwall_strings_repository._write_lines_to_file(
+                    output_text, output_filename
+                )
+
+    def parallel_format_text(
+        self,
+        input_text: str = DEFAULT_INPUT_TEXT,
+        maximum_line_width: int = DEFAULT_MAXIMUM_LINE_WIDTH,
+        output_filename: str = "output-part1.txt",
+        justify: bool = False,
+        workers: int = None,
+        chunk_size: int = DEFAULT_PARAGRAPHS_CHUNK_SIZE,
+        input_filename: str = None,
+    ) -> None:
+        """Left allign or justify a text, formatting its paragraphs in parallel.
+
+        The paragraphs (separated by blank lines) are wrapped independently, in a process pool,
+        and written in the input order with an empty line between them. The lines are not printed.
+
+        Args:
+            input_text (str, optional): The text to be formatted. Defaults to DEFAULT_INPUT_TEXT.
+            maximum_line_width (int, optional): Maximum line width. Defaults to DEFAULT_MAXIMUM_LINE_WIDTH.
+            output_filename (str, optional): The output filename to save the results. Defaults to "output-part1.txt".
+            justify (bool, optional): Justify the lines instead of only left allign them. Defaults to False.
+            workers (int, optional): Number of worker processes. Defaults to None (number of CPUs).
+            chunk_size (int, optional): Number of paragraphs sent to a worker at once.
+            Defaults to DEFAULT_PARAGRAPHS_CHUNK_SIZE.
+            input_filename (str, optional): File to read the paragraphs from ("-" for stdin). When informed,
+            input_text is ignored. Defaults to None.
+        """
+        with self._open_paragraphs(input_text, input_filename) as paragraphs:
+            output_text = self._parallel_format_paragraphs(
+                paragraphs, maximum_line_width, justify, workers, chunk_size
+            )
+            idwall_strings_repository._write_lines_to_file(output_text, output_filename)
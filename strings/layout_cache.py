@@ -0,0 +1,153 @@
+from bisect import bisect_right
+from collections import OrderedDict
+from hashlib import blake2b
+from itertools import accumulate
+from typing import List, NamedTuple, Tuple
+
+from constants import DOCUMENTS_CACHE_SIZE, LAYOUTS_CACHE_SIZE
+from repository import idwall_strings_repository
+
+
+class TokenizedDocument(NamedTuple):
+    words: List[str]
+    line_lengths_until_word: List[int]
+    longest_word: str
+
+
+class IdwallLayoutCache:
+    def __init__(
+        self,
+        documents_cache_size: int = DOCUMENTS_CACHE_SIZE,
+        layouts_cache_size: int = LAYOUTS_CACHE_SIZE,
+    ) -> None:
+        """Initializes the layout cache.
+
+        Args:
+            documents_cache_size (int, optional): Maximum number of tokenized documents kept.
+            Defaults to DOCUMENTS_CACHE_SIZE.
+            layouts_cache_size (int, optional): Maximum number of (document, width) layouts kept.
+            Defaults to LAYOUTS_CACHE_SIZE.
+        """
+        self.documents_cache_size = documents_cache_size
+        self.layouts_cache_size = layouts_cache_size
+        self.documents = OrderedDict()
+        self.layouts = OrderedDict()
+
+    def _hash_document(self, input_text: str) -> str:
+        """Hash a document, to be used as cache key.
+
+        Args:
+            input_text (str): The document text.
+
+        Returns:
+            str: The document hash.
+        """
+        return blake2b(input_text.encode(), digest_size=16).hexdigest()
+
+    def _tokenize_document(
+        self, document_hash: str, input_text: str
+    ) -> TokenizedDocument:
+        """Tokenize a document and compute the prefix sums of its words length, only once.
+
+        `line_lengths_until_word[k]` is the sum of the lengths of the first k words plus k, so the
+        length of a line with the words i to j - 1 is
+        `line_lengths_until_word[j] - line_lengths_until_word[i] - 1`.
+
+        Args:
+            document_hash (str): The document hash.
+            input_text (str): The document text.
+
+        Returns:
+            TokenizedDocument: The words, the prefix sums and the longest word of the document.
+        """
+        tokenized_document = self.documents.get(document_hash)
+        if tokenized_document is not None:
+            self.documents.move_to_end(document_hash)
+            return tokenized_document
+        words = input_text.split()
+        line_lengths_until_word = list(
+            accumulate((len(word) + 1 for word in words), initial=0)
+        )
+        tokenized_document = TokenizedDocument(
+            words, line_lengths_until_word, max(words, key=len, default="")
+        )
+        self.documents[document_hash] = tokenized_document
+        if len(self.documents) > self.documents_cache_size:
+            self.documents.popitem(last=False)
+        return tokenized_document
+
+    def _justify_tokenized_document(
+        self, tokenized_document: TokenizedDocument, maximum_line_width: int
+    ) -> Tuple[str, ...]:
+        """Wrap and justify a tokenized document, like `IdwallTextWrap.justify_text`.
+
+        Each line break is found with a binary search over the prefix sums.
+
+        Args:
+            tokenized_document (TokenizedDocument): The tokenized document.
+            maximum_line_width (int): Maximum line width.
+
+        Raises:
+            ValueError: If an word with size > maximum line size is found.
+
+        Returns:
+            Tuple[str, ...]: The justified lines.
+        """
+        words, line_lengths_until_word, longest_word = tokenized_document
+        if len(longest_word) > maximum_line_width:
+            raise ValueError(
+                f"Word {longest_word} (size {len(longest_word)}) is greater than maximum line width "
+                f"(size {maximum_line_width})."
+            )
+        output_text = []
+        line_start = 0
+        while line_start < len(words):
+            line_end = (
+                bisect_right(
+                    line_lengths_until_word,
+                    line_lengths_until_word[line_start] + maximum_line_width + 1,
+                    line_start + 1,
+                )
+                - 1
+            )
+            line_length = (
+                line_lengths_until_word[line_end]
+                - line_lengths_until_word[line_start]
+                - 1
+            )
+            justified_line = idwall_strings_repository._justify_list_of_strings(
+                words[line_start:line_end], maximum_line_width - line_length
+            )
+            output_text.append(" ".join(justified_line))
+            line_start = line_end
+        return tuple(output_text)
+
+    def get_justified_lines(
+        self, input_text: str, maximum_line_width: int
+    ) -> Tuple[str, ...]:
+        """Get the justified lines of a document, reusing the cached tokenization and layouts.
+
+        Args:
+            input_text (str): The document text.
+            maximum_line_width (int): Maximum line width.
+
+        Returns:
+            Tuple[str, ...]: The justified lines.
+        """
+        document_hash = self._hash_document(input_text)
+        layout_key = (document_hash, maximum_line_width)
+        justified_lines = self.layouts.get(layout_key)
+        if justified_lines is not None:
+            self.layouts.move_to_end(layout_key)
+            return justified_lines
+        tokenized_document = self._tokenize_document(document_hash, input_text)
+        justified_lines = self._justify_tokenized_document(
+            tokenized_document, maximum_line_width
+        )
+        self.layouts[layout_key] = justified_lines
+        if len(self.layouts) > self.layouts_cache_size:
+            self.layouts.popitem(last=False)
+        return justified_lines
+
+
+idwall_layout_cache = IdwallLayoutCache()
@@ -0,0 +1,105 @@
+from itertools import chain
+from typing import List, Union
+
+from repository import idwall_strings_repository
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class IdwallNumpyJustifier:
+    def _calculate_gaps_after_words(
+        self,
+        maximum_line_width: int,
+        words_per_line: "np.ndarray",
+        word_lengths: "np.ndarray",
+    ) -> "np.ndarray":
+        """Calculate, for all lines at once, the whitespaces between each word and the next one.
+
+        The whitespaces are the same added by `IdwallStringsRepository._justify_list_of_strings`:
+        - lines with a single word are not changed;
+        - if the needed whitespaces are more than the gaps in the line, each word receives
+        needed_whitespaces // gaps whitespaces (the last one before it, as a rjust);
+        - else, each one of the first needed_whitespaces words receives one whitespace.
+
+        Args:
+            maximum_line_width (int): The maximum line width.
+            words_per_line (np.ndarray): The number of words of each line.
+            word_lengths (np.ndarray): The length of each word (of all lines).
+
+        Returns:
+            np.ndarray: The whitespaces after each word (of all lines), with 0 after the last word of
+            each line.
+        """
+        line_starts = np.cumsum(words_per_line) - words_per_line
+        gaps_per_line = words_per_line - 1
+        text_sizes = np.add.reduceat(word_lengths, line_starts) + gaps_per_line
+        needed_whitespaces = maximum_line_width - text_sizes
+
+        has_gaps = gaps_per_line > 0
+        spread_whitespaces = has_gaps & (needed_whitespaces > gaps_per_line)
+        whitespaces_for_all_words = np.where(
+            spread_whitespaces, needed_whitespaces // np.maximum(gaps_per_line, 1), 0
+        )
+        words_with_one_whitespace = np.where(
+            has_gaps & ~spread_whitespaces & (needed_whitespaces > 0),
+            needed_whitespaces,
+            0,
+        )
+        word_index_in_line = np.arange(len(word_lengths)) - np.repeat(
+            line_starts, words_per_line
+        )
+        whitespaces_per_word = np.repeat(whitespaces_for_all_words, words_per_line) + (
+            word_index_in_line < np.repeat(words_with_one_whitespace, words_per_line)
+        )
+
+        gaps_after_words = 1 + whitespaces_per_word
+        is_last_word = word_index_in_line == np.repeat(gaps_per_line, words_per_line)
+        gaps_after_words[:-1] += np.where(is_last_word[1:], whitespaces_per_word[1:], 0)
+        gaps_after_words[is_last_word] = 0
+        return gaps_after_words
+
+    def _justify_text_in_list_of_lines(
+        self, maximum_line_width: int, lines: List[List[Union[str, bytes]]]
+    ) -> List[Union[str, bytes]]:
+        """Justify a text in a list of lines, calculating the whitespaces of all lines with NumPy.
+
+        Produces the same lines as `IdwallStringsRepository._justify_text_in_list_of_lines`, but
+        without padding each word: the words and whitespaces of all lines are joined at once.
+        Falls back to the pure Python justification when NumPy is not installed.
+
+        Args:
+            maximum_line_width (int): The maximum line width.
+            lines (List[List[Union[str, bytes]]]): The words (or encoded ASCII words) of each line.
+
+        Returns:
+            List[Union[str, bytes]]: The justified list of lines.
+        """
+        if np is None or not lines:
+            return idwall_strings_repository._justify_text_in_list_of_lines(
+                maximum_line_width, lines
+            )
+        words = list(chain.from_iterable(lines))
+        words_per_line = np.fromiter(map(len, lines), dtype=np.int64, count=len(lines))
+        word_lengths = np.fromiter(map(len, words), dtype=np.int64, count=len(words))
+        gaps_after_words = self._calculate_gaps_after_words(
+            maximum_line_width, words_per_line, word_lengths
+        )
+
+        empty_string = words[0][:0]
+        line_separator = b"\n" if isinstance(empty_string, bytes) else "\n"
+        whitespaces = [line_separator] + [
+            empty_string.ljust(size)
+            for size in range(1, int(gaps_after_words.max()) + 1)
+        ]
+        pieces = [empty_string] * (2 * len(words))
+        pieces[0::2] = words
+        pieces[1::2] = map(whitespaces.__getitem__, gaps_after_words.tolist())
+        output_text = empty_string.join(pieces).split(line_separator)
+        output_text.pop()
+        return output_text
+
+
+idwall_numpy_justifier = IdwallNumpyJustifier()
@@ -1,4 +1,14 @@
-from typing import List
+import codecs
+import locale
+import mmap
+import os
+import re
+from io import UnsupportedOperation
+from typing import BinaryIO, Iterable, Iterator, List, Optional, TextIO, Union
+
+from constants import DEFAULT_READ_CHUNK_SIZE, OUTPUT_BUFFER_SIZE
+
+NON_ASCII_PATTERN = re.compile(rb"[\x80-\xff]")
 
 
 class IdwallStringsRepository:
@@ -9,8 +19,252 @@ class IdwallStringsRepository:
             input_text (List[str]): The text to be write.
             output_filename (str): The file to be created.
         """
-        with open(output_filename, "w") as out_file:
-            out_file.write("\n".join(input_text))
+        self._write_lines_to_file(input_text, output_filename)
+
+    def _write_lines_to_file(
+        self, lines: Iterable[Union[str, bytes]], output_filename: str
+    ) -> None:
+        """Write lines to file as they are produced, through a buffered writer.
+
+        Lines are not kept in memory nor joined in a single string before being written.
+
+        Args:
+            lines (Iterable[Union[str, bytes]]): The lines to be written. When the first line is
+            encoded, the file is written as bytes and the lines that are not encoded (after a non
+            ASCII character) are encoded as a text file would be.
+            output_filename (str): The file to be created.
+        """
+        lines = iter(lines)
+        first_line = next(lines, "")
+        is_encoded = isinstance(first_line, bytes)
+        encoding = locale.getpreferredencoding(False)
+        with open(
+            output_filename, "wb" if is_encoded else "w", buffering=OUTPUT_BUFFER_SIZE
+        ) as out_file:
+            out_file.write(first_line)
+            line_separator = b"\n" if is_encoded else "\n"
+            for line in lines:
+                out_file.write(line_separator)
+                if is_encoded and isinstance(line, str):
+                    line = line.encode(encoding)
+                out_file.write(line)
+
+    def _map_file(self, input_file: TextIO) -> Optional[mmap.mmap]:
+        """Memory map an input file, when it is a regular file.
+
+        Args:
+            input_file (TextIO): The opened input file.
+
+        Returns:
+            Optional[mmap.mmap]: The read only memory mapped file or None when the file can not be
+            mapped (stdin, pipes or empty files).
+        """
+        try:
+            return mmap.mmap(input_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError, UnsupportedOperation):
+            return None
+
+    def _read_words_from_mapped_file(
+        self,
+        mapped_file: mmap.mmap,
+        encoding: str,
+        chunk_size: int = DEFAULT_READ_CHUNK_SIZE,
+    ) -> Iterator[Union[str, bytes]]:
+        """Lazily read the words of a memory mapped file, one chunk at a time.
+
+        Each chunk is checked for non ASCII characters as it is read: while there are none, the
+        words are yielded encoded, without being decoded. From the first chunk with a non ASCII
+        character on (including the word split before it), the rest of the file is decoded and
+        its words are yielded as text, so the file is read only once.
+
+        Args:
+            mapped_file (mmap.mmap): The memory mapped file.
+            encoding (str): The encoding used to decode the file after a non ASCII character.
+            chunk_size (int, optional): Number of bytes read at once. Defaults to DEFAULT_READ_CHUNK_SIZE.
+
+        Yields:
+            Iterator[Union[str, bytes]]: The words of the file (encoded while the file is ASCII).
+        """
+        remainder = None
+        while True:
+            chunk = mapped_file.read(chunk_size)
+            if not chunk:
+                break
+            if NON_ASCII_PATTERN.search(chunk):
+                mapped_file.seek(-len(chunk) - len(remainder or b""), os.SEEK_CUR)
+                text_file = codecs.getreader(encoding)(mapped_file)
+                yield from self._read_words_from_file(text_file, chunk_size)
+                return
+            words = (remainder + chunk).split() if remainder else chunk.split()
+            if not chunk[-1:].isspace() and words:
+                remainder = words.pop()
+            else:
+                remainder = None
+            yield from words
+        if remainder:
+            yield remainder
+
+    def _read_words_from_file(
+        self,
+        input_file: Union[TextIO, BinaryIO, mmap.mmap],
+        chunk_size: int = DEFAULT_READ_CHUNK_SIZE,
+    ) -> Iterator[Union[str, bytes]]:
+        """Lazily read the words of a file, one chunk at a time.
+
+        A word that is split between two chunks is kept until the next chunk is read. Binary
+        files (and memory mapped files) yield encoded words, which are never decoded.
+
+        Args:
+            input_file (Union[TextIO, BinaryIO, mmap.mmap]): The opened file (or stdin) to read the words from.
+            chunk_size (int, optional): Number of characters read at once. Defaults to DEFAULT_READ_CHUNK_SIZE.
+
+        Yields:
+            Iterator[Union[str, bytes]]: The words of the file.
+        """
+        remainder = None
+        while True:
+            chunk = input_file.read(chunk_size)
+            if not chunk:
+                break
+            words = (remainder + chunk).split() if remainder else chunk.split()
+            if not chunk[-1:].isspace() and words:
+                remainder = words.pop()
+            else:
+                remainder = None
+            yield from words
+        if remainder:
+            yield remainder
+
+    def _split_text_in_paragraphs(self, input_text: str) -> List[str]:
+        """Split a text in paragraphs, separated by blank lines.
+
+        Args:
+            input_text (str): The text to be splitted.
+
+        Returns:
+            List[str]: The paragraphs of the text (empty paragraphs are ignored).
+        """
+        return [
+            paragraph
+            for paragraph in re.split(r"\n\s*\n", input_text)
+            if paragraph.strip()
+        ]
+
+    def _read_paragraphs_from_file(self, input_file: TextIO) -> Iterator[str]:
+        """Lazily read the paragraphs (separated by blank lines) of a file.
+
+        Args:
+            input_file (TextIO): The opened file (or stdin) to read the paragraphs from.
+
+        Yields:
+            Iterator[str]: The paragraphs of the file.
+        """
+        paragraph_lines = []
+        for line in input_file:
+            if line.isspace():
+                if paragraph_lines:
+                    yield "".join(paragraph_lines)
+                    paragraph_lines.clear()
+            else:
+                paragraph_lines.append(line)
+        if paragraph_lines:
+            yield "".join(paragraph_lines)
+
+    def _lazily_wrap_words(
+        self, words: Iterable[Union[str, bytes]], maximum_line_width: int
+    ) -> Iterator[List[Union[str, bytes]]]:
+        """Wrap words in lines, one line at a time.
+
+        Works like `_manually_wrap_text`, but checks the words size while wrapping and
+        yields each line as a list of words as soon as it is complete. When the words stop being
+        encoded (a memory mapped file with a non ASCII character), the encoded words of the
+        current line are decoded, so each line has words of a single type.
+
+        Args:
+            words (Iterable[Union[str, bytes]]): The words (or encoded ASCII words) to be wrapped.
+            maximum_line_width (int): Maximum line width.
+
+        Raises:
+            ValueError: If an word with size > maximum line size is found.
+
+        Yields:
+            Iterator[List[Union[str, bytes]]]: The words of each wrapped line.
+        """
+        line = []
+        line_length = 0
+        for word in words:
+            word_length = len(word)
+            if word_length > maximum_line_width:
+                if isinstance(word, bytes):
+                    word = word.decode()
+                raise ValueError(
+                    f"Word {word} (size {word_length}) is greater than maximum line width (size {maximum_line_width})."
+                )
+            if self._is_encoded_line(line) and isinstance(word, str):
+                line = [encoded_word.decode() for encoded_word in line]
+            if line_length + word_length <= maximum_line_width:
+                line.append(word)
+                line_length += word_length + 1
+            else:
+                yield line
+                line = [word]
+                line_length = word_length + 1
+        if len(line) > 0:
+            yield line
+
+    def _optimally_wrap_words(
+        self, words: List[str], maximum_line_width: int
+    ) -> List[List[str]]:
+        """Wrap words in lines minimizing the raggedness of the text (Knuth-Plass style).
+
+        How it works:
+        - The cost of a line is the square of its remaining whitespaces (the last line costs nothing);
+        - For each word, find the cheapest way to break the text that ends in it, looking back only
+        to the words that fit in a line with it (at most (maximum_line_width + 1) / 2 words), so
+        the wrapping is O(number of words * maximum_line_width);
+        - Follow the chosen line starts back from the last word to build the lines.
+
+        Args:
+            words (List[str]): The words to be wrapped.
+            maximum_line_width (int): Maximum line width.
+
+        Raises:
+            ValueError: If an word with size > maximum line size is found.
+
+        Returns:
+            List[List[str]]: The words of each wrapped line.
+        """
+        word_lengths = []
+        for word in words:
+            word_length = len(word)
+            if word_length > maximum_line_width:
+                raise ValueError(
+                    f"Word {word} (size {word_length}) is greater than maximum line width (size {maximum_line_width})."
+                )
+            word_lengths.append(word_length)
+        number_of_words = len(words)
+        minimum_costs = [0] + [None] * number_of_words
+        line_starts = [0] * (number_of_words + 1)
+        for line_end in range(1, number_of_words + 1):
+            line_length = -1
+            for line_start in range(line_end - 1, -1, -1):
+                line_length += word_lengths[line_start] + 1
+                if line_length > maximum_line_width:
+                    break
+                cost = minimum_costs[line_start]
+                if line_end < number_of_words:
+                    cost += (maximum_line_width - line_length) ** 2
+                if minimum_costs[line_end] is None or cost < minimum_costs[line_end]:
+                    minimum_costs[line_end] = cost
+                    line_starts[line_end] = line_start
+        lines = []
+        line_end = number_of_words
+        while line_end > 0:
+            line_start = line_starts[line_end]
+            lines.append(words[line_start:line_end])
+            line_end = line_start
+        lines.reverse()
+        return lines
 
     def _check_words_size(self, input_text: str, maximum_line_width: int) -> None:
         """Check words size, to ensure it will not be greater than maximum line size.
@@ -114,7 +368,9 @@ class IdwallStringsRepository:
             List[str]: The justified list of strings.
         """
         number_of_strings_in_list = len(list_of_strings)
-        if needed_whitespaces > number_of_strings_in_list - 1:
+        if number_of_strings_in_list == 1:
+            justified_line = list_of_strings
+        elif needed_whitespaces > number_of_strings_in_list - 1:
             needed_whitespaces = int(
                 needed_whitespaces / (number_of_strings_in_list - 1)
             )
@@ -146,26 +402,91 @@ class IdwallStringsRepository:
         needed_whitespaces = maximum_text_length - text_size
         return needed_whitespaces
 
+    def _justify_line(self, maximum_line_width: int, line: List[str]) -> str:
+        """Justify a single line.
+
+        Args:
+            maximum_line_width (int): The maximum line width.
+            line (List[str]): The words of the line.
+
+        Returns:
+            str: The justified line.
+        """
+        needed_whitespaces = self._calculate_needed_whitespaces_to_justify_text(
+            maximum_line_width, line
+        )
+        justified_line = self._justify_list_of_strings(line, needed_whitespaces)
+        return " ".join(justified_line)
+
+    def _justify_encoded_line(
+        self, maximum_line_width: int, line: List[bytes]
+    ) -> bytes:
+        """Justify a single line of encoded (ASCII) words.
+
+        Args:
+            maximum_line_width (int): The maximum line width.
+            line (List[bytes]): The encoded words of the line.
+
+        Returns:
+            bytes: The encoded justified line.
+        """
+        needed_whitespaces = self._calculate_needed_whitespaces_to_justify_text(
+            maximum_line_width, line
+        )
+        justified_line = self._justify_list_of_strings(line, needed_whitespaces)
+        return b" ".join(justified_line)
+
+    def _justify_any_line(
+        self, maximum_line_width: int, line: List[Union[str, bytes]]
+    ) -> Union[str, bytes]:
+        """Justify a single line, of words or of encoded (ASCII) words.
+
+        Args:
+            maximum_line_width (int): The maximum line width.
+            line (List[Union[str, bytes]]): The words (or encoded words) of the line.
+
+        Returns:
+            Union[str, bytes]: The justified line (encoded, when its words are encoded).
+        """
+        if self._is_encoded_line(line):
+            return self._justify_encoded_line(maximum_line_width, line)
+        return self._justify_line(maximum_line_width, line)
+
+    def _join_line(self, line: List[Union[str, bytes]]) -> Union[str, bytes]:
+        """Join the words of a line, with a single whitespace between them.
+
+        Args:
+            line (List[Union[str, bytes]]): The words (or encoded words) of the line.
+
+        Returns:
+            Union[str, bytes]: The line (encoded, when its words are encoded).
+        """
+        return (b" " if self._is_encoded_line(line) else " ").join(line)
+
+    def _is_encoded_line(self, line: List[Union[str, bytes]]) -> bool:
+        """Check if the words of a line are encoded (ASCII) words.
+
+        Args:
+            line (List[Union[str, bytes]]): The words of the line.
+
+        Returns:
+            bool: True when the line has encoded words.
+        """
+        return bool(line) and isinstance(line[0], bytes)
+
     def _justify_text_in_list_of_lines(
-        self, maximum_line_width: int, lines: List[str]
-    ) -> List[str]:
+        self, maximum_line_width: int, lines: List[List[Union[str, bytes]]]
+    ) -> List[Union[str, bytes]]:
         """Justify a text in a list of lines.
 
         Args:
             maximum_line_width (int): The maximum line width.
-            lines (List[str]): Lines of the text.
+            lines (List[List[Union[str, bytes]]]): The words (or encoded ASCII words) of each line.
 
         Returns:
-            List[str]: The justified list of lines.
+            List[Union[str, bytes]]: The justified list of lines.
         """
-        output_text = []
-        for line in lines:
-            needed_whitespaces = self._calculate_needed_whitespaces_to_justify_text(
-                maximum_line_width, line
-            )
-            justified_line = self._justify_list_of_strings(line, needed_whitespaces)
-            output_text.append(" ".join(justified_line))
-        return output_text
+        return [self._justify_any_line(maximum_line_width, line) for line in lines]
 
 
 idwall_strings_repository = IdwallStringsRepository()
@@ -1,7 +1,11 @@
 import argparse
 from sys import exit
 
-from constants import DEFAULT_INPUT_TEXT, DEFAULT_MAXIMUM_LINE_WIDTH
+from constants import (
+    DEFAULT_INPUT_TEXT,
+    DEFAULT_MAXIMUM_LINE_WIDTH,
+    DEFAULT_PARAGRAPHS_CHUNK_SIZE,
+)
 from idwall_text_wrap import IdwallTextWrap
 
 
@@ -11,15 +15,29 @@ def main(
     line_width: int,
     output_filename: str,
     use_python_wrap: bool,
+    input_filename: str = None,
+    workers: int = None,
+    chunk_size: int = DEFAULT_PARAGRAPHS_CHUNK_SIZE,
+    use_numpy: bool = False,
+    use_compact_layout: bool = False,
 ):
     """Executes the strings operations.
 
     Args:
-        operation (str): Type of operation (left_allign or justify).
+        operation (str): Type of operation (left_allign, justify or optimal_justify).
         input_text (str): The input text.
         line_width (int): Maximum line width.
         output_filename (str): The output filename.
         use_python_wrap (bool): Determines the use of built-in python wrap operation.
+        input_filename (str, optional): File to stream the input text from ("-" for stdin). When informed,
+        input_text is ignored. Defaults to None.
+        workers (int, optional): When informed, format the paragraphs in parallel with this number of worker
+        processes. Defaults to None.
+        chunk_size (int, optional): Number of paragraphs sent to each worker at once.
+        Defaults to DEFAULT_PARAGRAPHS_CHUNK_SIZE.
+        use_numpy (bool, optional): Justify the lines with NumPy, when installed. Defaults to False.
+        use_compact_layout (bool, optional): Keep the words as offsets into the input text, creating the lines only
+        when they are written. Defaults to False.
 
     Raises:
         ValueError: Unknown operation found.
@@ -30,19 +48,69 @@ def main(
         if operation == "left_allign":
             if not output_filename:
                 output_filename = "output-part1.txt"
-            idwall_text_wrap.left_allign_text(
-                input_text, line_width, output_filename, use_python_wrap
-            )
+            if workers:
+                idwall_text_wrap.parallel_format_text(
+                    input_text,
+                    line_width,
+                    output_filename,
+                    False,
+                    workers,
+                    chunk_size,
+                    input_filename,
+                )
+            elif input_filename:
+                idwall_text_wrap.left_allign_file(
+                    input_filename, line_width, output_filename
+                )
+            else:
+                idwall_text_wrap.left_allign_text(
+                    input_text,
+                    line_width,
+                    output_filename,
+                    use_python_wrap,
+                    use_compact_layout,
+                )
         elif operation == "justify":
             if not output_filename:
                 output_filename = "output-part2.txt"
-            idwall_text_wrap.justify_text(
-                input_text, line_width, output_filename, use_python_wrap
-            )
+            if workers:
+                idwall_text_wrap.parallel_format_text(
+                    input_text,
+                    line_width,
+                    output_filename,
+                    True,
+                    workers,
+                    chunk_size,
+                    input_filename,
+                )
+            elif input_filename:
+                idwall_text_wrap.justify_file(
+                    input_filename, line_width, output_filename, use_numpy
+                )
+            else:
+                idwall_text_wrap.justify_text(
+                    input_text,
+                    line_width,
+                    output_filename,
+                    use_python_wrap,
+                    use_numpy,
+                    use_compact_layout,
+                )
+        elif operation == "optimal_justify":
+            if not output_filename:
+                output_filename = "output-part2.txt"
+            if input_filename:
+                idwall_text_wrap.optimally_justify_file(
+                    input_filename, line_width, output_filename
+                )
+            else:
+                idwall_text_wrap.optimally_justify_text(
+                    input_text, line_width, output_filename
+                )
         else:
             raise ValueError(
                 f"You tried to execute an unknown operation ({operation}). "
-                "Available operations are 'left_allign' or 'justify'."
+                "Available operations are 'left_allign', 'justify' or 'optimal_justify'."
             )
     except ValueError as exception:
         print(exception)
@@ -51,7 +119,9 @@ def main(
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Idwall challenge")
     parser.add_argument(
-        "operation", type=str, help="The operation to be done: left_allign or justify"
+        "operation",
+        type=str,
+        help="The operation to be done: left_allign, justify or optimal_justify",
     )
     parser.add_argument(
         "-t",
@@ -60,6 +130,13 @@ if __name__ == "__main__":
         default=DEFAULT_INPUT_TEXT,
         help="The text to be wrapped.",
     )
+    parser.add_argument(
+        "-i",
+        "--input_filename",
+        nargs="?",
+        default=None,
+        help="File to stream the text from ('-' reads from stdin). Overrides the input text.",
+    )
     parser.add_argument(
         "-w",
         "--line_width",
@@ -82,17 +159,51 @@ if __name__ == "__main__":
         const=True,
         help="Use python built-in wrap function.",
     )
+    parser.add_argument(
+        "-n",
+        "--workers",
+        nargs="?",
+        default=None,
+        help="Format the paragraphs in parallel, with this number of worker processes.",
+    )
+    parser.add_argument(
+        "-c",
+        "--chunk_size",
+        default=None,
+        help="Number of paragraphs sent to each worker process at once "
+        f"(default: {DEFAULT_PARAGRAPHS_CHUNK_SIZE}).",
+    )
+    parser.add_argument(
+        "-u",
+        "--use_numpy",
+        nargs="?",
+        default=None,
+        const=True,
+        help="Justify the lines with NumPy (falls back to pure Python when it is not installed).",
+    )
+    parser.add_argument(
+        "-l",
+        "--use_compact_layout",
+        nargs="?",
+        default=None,
+        const=True,
+        help="Keep the words as offsets into the text, creating the lines only when they are written.",
+    )
     args = parser.parse_args()
 
-    if args.operation.lower() not in ["left_allign", "justify"]:
+    if args.operation.lower() not in ["left_allign", "justify", "optimal_justify"]:
         print(
-            f"The operation must be: left_allign or justify! Received {args.operation.lower()}"
+            "The operation must be: left_allign, justify or optimal_justify! "
+            f"Received {args.operation.lower()}"
         )
         exit(1)
     # Those errors should never occur, but tested, just in case.
     if args.input_text and not isinstance(args.input_text, str):
         print(f"Input text should be a string! Received {args.input_text}.")
         exit(2)
+    if args.input_filename and not isinstance(args.input_filename, str):
+        print(f"Input filename should be a string! Received {args.input_filename}.")
+        exit(5)
     if args.output_filename and not isinstance(args.output_filename, str):
         print(f"Output filename should be a string! Received {args.output_filename}.")
         exit(3)
@@ -104,10 +215,59 @@ if __name__ == "__main__":
             print(f"Line width should be an integer! Received {args.line_width}.")
             exit(4)
 
+    if args.workers:
+        try:
+            args.workers = int(args.workers)
+        except ValueError:
+            print(f"Number of workers should be an integer! Received {args.workers}.")
+            exit(6)
+    if args.workers and args.operation.lower() == "optimal_justify":
+        parser.error(
+            "optimal_justify chooses the line breaks of the whole text and can not run in "
+            "parallel (-n/--workers)."
+        )
+
+    if args.chunk_size is not None:
+        try:
+            args.chunk_size = int(args.chunk_size)
+        except ValueError:
+            print(f"Chunk size should be an integer! Received {args.chunk_size}.")
+            exit(7)
+        if args.chunk_size < 1:
+            parser.error(f"Chunk size should be positive! Received {args.chunk_size}.")
+
+    # Reject the options that the chosen mode would silently ignore.
+    operation = args.operation.lower()
+    if args.workers:
+        mode = "parallel mode (-n/--workers)"
+    elif args.input_filename:
+        mode = "file streaming (-i/--input_filename)"
+    else:
+        mode = f"the {operation} operation"
+    if args.use_python_wrap and (
+        args.workers or args.input_filename or operation == "optimal_justify"
+    ):
+        parser.error(f"-p/--use_python_wrap is not supported in {mode}.")
+    if args.use_compact_layout and (
+        args.workers or args.input_filename or operation == "optimal_justify"
+    ):
+        parser.error(f"-l/--use_compact_layout is not supported in {mode}.")
+    if args.use_numpy and (args.workers or operation != "justify"):
+        parser.error(f"-u/--use_numpy is not supported in {mode}.")
+    if args.chunk_size is not None and not args.workers:
+        parser.error("-c/--chunk_size is only used in parallel mode (-n/--workers).")
+    if args.chunk_size is None:
+        args.chunk_size = DEFAULT_PARAGRAPHS_CHUNK_SIZE
+
     main(
         args.operation.lower(),
         args.input_text,
         args.line_width,
         args.output_filename,
         args.use_python_wrap,
+        args.input_filename,
+        args.workers,
+        args.chunk_size,
+        args.use_numpy,
+        args.use_compact_layout,
     )
@@ -0,0 +1,72 @@
+import pytest
+
+from compact_layout import IdwallCompactLayout
+from constants import DEFAULT_INPUT_TEXT
+from repository import idwall_strings_repository
+
+
+def _wrap(input_text, maximum_line_width):
+    return list(
+        idwall_strings_repository._lazily_wrap_words(
+            input_text.split(), maximum_line_width
+        )
+    )
+
+
+def _justify(input_text, maximum_line_width):
+    return [
+        idwall_strings_repository._justify_line(maximum_line_width, line)
+        for line in _wrap(input_text, maximum_line_width)
+    ]
+
+
+@pytest.mark.parametrize("maximum_line_width", range(15, 81, 5))
+def test_wrapped_lines_are_the_same_as_the_list_wrap(maximum_line_width):
+    compact_layout = IdwallCompactLayout(DEFAULT_INPUT_TEXT).wrap(maximum_line_width)
+
+    assert list(compact_layout.iterate_lines()) == [
+        " ".join(line) for line in _wrap(DEFAULT_INPUT_TEXT, maximum_line_width)
+    ]
+
+
+@pytest.mark.parametrize("maximum_line_width", range(15, 81, 5))
+def test_justified_lines_are_the_same_as_the_list_justify(maximum_line_width):
+    compact_layout = (
+        IdwallCompactLayout(DEFAULT_INPUT_TEXT)
+        .wrap(maximum_line_width)
+        .justify(maximum_line_width)
+    )
+
+    assert list(compact_layout.iterate_lines()) == _justify(
+        DEFAULT_INPUT_TEXT, maximum_line_width
+    )
+
+
+def test_encoded_source_gives_encoded_lines():
+    compact_layout = (
+        IdwallCompactLayout(DEFAULT_INPUT_TEXT.encode()).wrap(40).justify(40)
+    )
+
+    assert list(compact_layout.iterate_lines()) == [
+        line.encode() for line in _justify(DEFAULT_INPUT_TEXT, 40)
+    ]
+
+
+def test_words_are_kept_as_offsets_into_the_source():
+    compact_layout = IdwallCompactLayout("  ab\n\ncde   f ").wrap(6)
+
+    assert list(compact_layout.word_offsets) == [2, 6, 12]
+    assert list(compact_layout.word_lengths) == [2, 3, 1]
+    assert list(compact_layout.line_ends) == [2, 3]
+    assert list(compact_layout.iterate_lines()) == ["ab cde", "f"]
+
+
+def test_word_wider_than_the_line_is_rejected():
+    with pytest.raises(ValueError, match="abcdef"):
+        IdwallCompactLayout(b"abc abcdef").wrap(5)
+
+
+def test_blank_source_gives_no_lines():
+    compact_layout = IdwallCompactLayout(" \n ").wrap(40).justify(40)
+
+    assert list(compact_layout.iterate_lines()) == []
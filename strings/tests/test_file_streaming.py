@@ -0,0 +1,96 @@
+import mmap
+
+import pytest
+
+from constants import DEFAULT_INPUT_TEXT
+from idwall_text_wrap import IdwallTextWrap
+from repository import idwall_strings_repository
+
+NON_ASCII_TEXT = DEFAULT_INPUT_TEXT.replace("waters", "águas").replace("light", "luz ☀")
+
+
+def _decode(words):
+    return [word.decode() if isinstance(word, bytes) else word for word in words]
+
+
+def _justify(input_text, maximum_line_width):
+    return "\n".join(
+        idwall_strings_repository._justify_line(maximum_line_width, line)
+        for line in idwall_strings_repository._lazily_wrap_words(
+            input_text.split(), maximum_line_width
+        )
+    )
+
+
+@pytest.fixture
+def mapped_file(tmp_path):
+    def map_text(input_text):
+        input_path = tmp_path / "input.txt"
+        input_path.write_text(input_text, encoding="utf-8")
+        with open(input_path, encoding="utf-8") as input_file:
+            return idwall_strings_repository._map_file(input_file)
+
+    return map_text
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 1024 * 1024])
+def test_ascii_file_words_are_read_encoded(mapped_file, chunk_size):
+    with mapped_file(DEFAULT_INPUT_TEXT) as ascii_file:
+        words = list(
+            idwall_strings_repository._read_words_from_mapped_file(
+                ascii_file, "utf-8", chunk_size
+            )
+        )
+
+    assert all(isinstance(word, bytes) for word in words)
+    assert _decode(words) == DEFAULT_INPUT_TEXT.split()
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64, 1024 * 1024])
+def test_non_ascii_chunk_switches_to_decoded_words(mapped_file, chunk_size):
+    with mapped_file(NON_ASCII_TEXT) as non_ascii_file:
+        words = list(
+            idwall_strings_repository._read_words_from_mapped_file(
+                non_ascii_file, "utf-8", chunk_size
+            )
+        )
+
+    assert _decode(words) == NON_ASCII_TEXT.split()
+    first_decoded_word = next(
+        index for index, word in enumerate(words) if isinstance(word, str)
+    )
+    assert all(isinstance(word, str) for word in words[first_decoded_word:])
+    if chunk_size < NON_ASCII_TEXT.index("águas"):
+        assert first_decoded_word > 0
+
+
+def test_encoded_line_is_decoded_when_the_words_stop_being_encoded():
+    words = [b"abc", b"de", "fgé", "h"]
+
+    lines = list(idwall_strings_repository._lazily_wrap_words(words, 10))
+
+    assert lines == [["abc", "de", "fgé"], ["h"]]
+
+
+def test_written_file_mixes_encoded_and_decoded_lines(tmp_path):
+    output_path = tmp_path / "output.txt"
+
+    idwall_strings_repository._write_lines_to_file(
+        [b"abc de", "fgé h"], str(output_path)
+    )
+
+    assert output_path.read_text() == "abc de\nfgé h"
+
+
+@pytest.mark.parametrize("use_numpy", [False, True])
+@pytest.mark.parametrize("input_text", [DEFAULT_INPUT_TEXT, NON_ASCII_TEXT])
+def test_justified_file_is_the_same_as_the_justified_text(
+    tmp_path, input_text, use_numpy
+):
+    input_path = tmp_path / "input.txt"
+    input_path.write_text(input_text)
+    output_path = tmp_path / "output.txt"
+
+    IdwallTextWrap().justify_file(str(input_path), 40, str(output_path), use_numpy)
+
+    assert output_path.read_text() == _justify(input_text, 40)
@@ -0,0 +1,89 @@
+import pytest
+
+from constants import DEFAULT_INPUT_TEXT
+from layout_cache import IdwallLayoutCache
+from repository import idwall_strings_repository
+
+
+def _justify(input_text, maximum_line_width):
+    return tuple(
+        idwall_strings_repository._justify_line(maximum_line_width, line)
+        for line in idwall_strings_repository._lazily_wrap_words(
+            input_text.split(), maximum_line_width
+        )
+    )
+
+
+@pytest.fixture
+def layout_cache(monkeypatch):
+    layout_cache = IdwallLayoutCache(documents_cache_size=2, layouts_cache_size=2)
+    layout_cache.layouts_computed = 0
+    justify_tokenized_document = layout_cache._justify_tokenized_document
+
+    def counting_justify_tokenized_document(*args):
+        layout_cache.layouts_computed += 1
+        return justify_tokenized_document(*args)
+
+    monkeypatch.setattr(
+        layout_cache, "_justify_tokenized_document", counting_justify_tokenized_document
+    )
+    return layout_cache
+
+
+@pytest.mark.parametrize("maximum_line_width", [15, 40, 80])
+def test_justified_lines_are_the_same_as_the_justify_operation(maximum_line_width):
+    assert IdwallLayoutCache().get_justified_lines(
+        DEFAULT_INPUT_TEXT, maximum_line_width
+    ) == _justify(DEFAULT_INPUT_TEXT, maximum_line_width)
+
+
+def test_same_document_and_width_is_a_cache_hit(layout_cache):
+    justified_lines = layout_cache.get_justified_lines(DEFAULT_INPUT_TEXT, 40)
+
+    assert layout_cache.get_justified_lines(DEFAULT_INPUT_TEXT, 40) is justified_lines
+    assert layout_cache.layouts_computed == 1
+
+
+def test_new_width_reuses_the_tokenized_document(layout_cache):
+    layout_cache.get_justified_lines(DEFAULT_INPUT_TEXT, 40)
+    tokenized_document = next(iter(layout_cache.documents.values()))
+
+    justified_lines = layout_cache.get_justified_lines(DEFAULT_INPUT_TEXT, 30)
+
+    assert justified_lines == _justify(DEFAULT_INPUT_TEXT, 30)
+    assert layout_cache.layouts_computed == 2
+    assert list(layout_cache.documents.values()) == [tokenized_document]
+
+
+def test_least_recently_used_layout_is_evicted(layout_cache):
+    layout_cache.get_justified_lines("first document", 20)
+    layout_cache.get_justified_lines("second document", 20)
+    layout_cache.get_justified_lines("first document", 20)
+    layout_cache.get_justified_lines("third document", 20)
+    assert layout_cache.layouts_computed == 3
+
+    layout_cache.get_justified_lines("first document", 20)
+    assert layout_cache.layouts_computed == 3
+    layout_cache.get_justified_lines("second document", 20)
+    assert layout_cache.layouts_computed == 4
+    assert len(layout_cache.layouts) == 2
+
+
+def test_least_recently_used_document_is_evicted(layout_cache):
+    for input_text in ["first document", "second document", "third document"]:
+        layout_cache.get_justified_lines(input_text, 20)
+
+    assert [
+        tokenized_document.words
+        for tokenized_document in layout_cache.documents.values()
+    ] == [
+        ["second", "document"],
+        ["third", "document"],
+    ]
+
+
+def test_word_wider_than_the_line_is_rejected_and_not_cached(layout_cache):
+    with pytest.raises(ValueError, match="document"):
+        layout_cache.get_justified_lines("first document", 5)
+
+    assert len(layout_cache.layouts) == 0
@@ -0,0 +1,78 @@
+import pytest
+
+import numpy_justifier
+from constants import DEFAULT_INPUT_TEXT
+from numpy_justifier import idwall_numpy_justifier
+from repository import idwall_strings_repository
+
+
+def _wrap(input_text, maximum_line_width):
+    return list(
+        idwall_strings_repository._lazily_wrap_words(
+            input_text.split(), maximum_line_width
+        )
+    )
+
+
+def _encode(lines):
+    return [[word.encode() for word in line] for line in lines]
+
+
+def _justify_each_line(justify_line, maximum_line_width, lines):
+    # The pure Python justification pads the words of each line in place.
+    return [justify_line(maximum_line_width, list(line)) for line in lines]
+
+
+@pytest.fixture(params=["numpy", "without numpy"])
+def numpy_availability(request, monkeypatch):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(numpy_justifier, "np", None)
+    return request.param
+
+
+@pytest.mark.parametrize("maximum_line_width", range(15, 81, 5))
+def test_justified_lines_are_the_same_as_justify_line(
+    numpy_availability, maximum_line_width
+):
+    lines = _wrap(DEFAULT_INPUT_TEXT, maximum_line_width)
+    expected_lines = _justify_each_line(
+        idwall_strings_repository._justify_line, maximum_line_width, lines
+    )
+
+    assert (
+        idwall_numpy_justifier._justify_text_in_list_of_lines(maximum_line_width, lines)
+        == expected_lines
+    )
+
+
+@pytest.mark.parametrize("maximum_line_width", [15, 40, 80])
+def test_encoded_lines_are_the_same_as_justify_encoded_line(
+    numpy_availability, maximum_line_width
+):
+    lines = _encode(_wrap(DEFAULT_INPUT_TEXT, maximum_line_width))
+    expected_lines = _justify_each_line(
+        idwall_strings_repository._justify_encoded_line, maximum_line_width, lines
+    )
+
+    assert (
+        idwall_numpy_justifier._justify_text_in_list_of_lines(maximum_line_width, lines)
+        == expected_lines
+    )
+
+
+def test_short_lines_are_the_same_as_justify_line(numpy_availability):
+    lines = [["abcde"], ["ab", "cd"], ["a", "b"], ["abc"], ["a", "b", "c", "d"]]
+    expected_lines = _justify_each_line(
+        idwall_strings_repository._justify_line, 9, lines
+    )
+
+    assert (
+        idwall_numpy_justifier._justify_text_in_list_of_lines(9, lines)
+        == expected_lines
+    )
+
+
+def test_no_lines_give_no_justified_lines(numpy_availability):
+    assert idwall_numpy_justifier._justify_text_in_list_of_lines(40, []) == []
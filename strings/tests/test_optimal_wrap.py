@@ -0,0 +1,59 @@
+import pytest
+
+from constants import DEFAULT_INPUT_TEXT
+from repository import idwall_strings_repository
+
+
+def _badness(lines, maximum_line_width):
+    return sum((maximum_line_width - len(" ".join(line))) ** 2 for line in lines[:-1])
+
+
+@pytest.mark.parametrize("maximum_line_width", [10, 20, 40, 80])
+def test_no_line_is_wider_than_the_maximum_width(maximum_line_width):
+    words = DEFAULT_INPUT_TEXT.split()
+
+    lines = idwall_strings_repository._optimally_wrap_words(words, maximum_line_width)
+
+    assert all(len(" ".join(line)) <= maximum_line_width for line in lines)
+    assert [word for line in lines for word in line] == words
+
+
+def test_optimal_wrap_is_less_ragged_than_the_greedy_wrap():
+    words = "aaa bb cc ddddd".split()
+
+    greedy_lines = list(idwall_strings_repository._lazily_wrap_words(words, 6))
+    optimal_lines = idwall_strings_repository._optimally_wrap_words(words, 6)
+
+    assert greedy_lines == [["aaa", "bb"], ["cc"], ["ddddd"]]
+    assert optimal_lines == [["aaa"], ["bb", "cc"], ["ddddd"]]
+    assert _badness(optimal_lines, 6) == 10 < _badness(greedy_lines, 6) == 16
+
+
+def test_optimal_wrap_is_never_more_ragged_than_the_greedy_wrap():
+    words = DEFAULT_INPUT_TEXT.split()
+
+    for maximum_line_width in range(15, 81):
+        greedy_lines = list(
+            idwall_strings_repository._lazily_wrap_words(words, maximum_line_width)
+        )
+        optimal_lines = idwall_strings_repository._optimally_wrap_words(
+            words, maximum_line_width
+        )
+        assert _badness(optimal_lines, maximum_line_width) <= _badness(
+            greedy_lines, maximum_line_width
+        )
+
+
+def test_words_as_wide_as_the_line_take_a_whole_line():
+    lines = idwall_strings_repository._optimally_wrap_words(["abcde", "a", "bcdef"], 5)
+
+    assert lines == [["abcde"], ["a"], ["bcdef"]]
+
+
+def test_word_wider_than_the_line_is_rejected():
+    with pytest.raises(ValueError, match="abcdef"):
+        idwall_strings_repository._optimally_wrap_words(["abc", "abcdef"], 5)
+
+
+def test_no_words_give_no_lines():
+    assert idwall_strings_repository._optimally_wrap_words([], 40) == []